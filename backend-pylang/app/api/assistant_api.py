@@ -4,7 +4,7 @@ Main chatbot interaction endpoint with Easymart Assistant integration.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.core.schemas import MessageRequest, MessageResponse, ErrorResponse
 from app.core.dependencies import get_session_id
 from app.core.exceptions import EasymartException
@@ -15,9 +15,15 @@ from app.core.followups import get_followup_generator
 from app.modules.assistant import get_assistant_handler, AssistantRequest
 from app.modules.assistant.session_store import get_session_store
 from datetime import datetime
+import json
 import time
 import logging
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/assistant", tags=["Assistant"])
@@ -47,7 +53,6 @@ async def handle_message(
     start_time = time.time()
     analytics = get_analytics()
     error_recovery = get_error_recovery()
-    followup_gen = get_followup_generator()
     
     try:
         # Get assistant handler
@@ -63,91 +68,7 @@ async def handle_message(
         # Handle message
         assistant_response = await handler.handle_message(assistant_request)
         
-        # Calculate response time
-        response_time_ms = (time.time() - start_time) * 1000
-        
-        # Extract intent from metadata
-        intent = assistant_response.metadata.get("intent", "general_query")
-        
-        # Get session for cart count
-        session_store = get_session_store()
-        session = session_store.get_or_create_session(assistant_response.session_id)
-        cart_count = len(session.cart_items) if session.cart_items else 0
-        
-        # Generate follow-up chips based on context
-        products_count = len(assistant_response.products) if assistant_response.products else 0
-        followup_chips = followup_gen.generate_followups(
-            intent=intent,
-            products_count=products_count,
-            cart_count=cart_count,
-            context={"query": request.message}
-        )
-        
-        # Track analytics
-        analytics.track_request(
-            session_id=request.session_id,
-            intent=intent,
-            query=request.message,
-            response_time_ms=response_time_ms,
-            products_returned=products_count,
-            success=True
-        )
-        
-        # Build suggested actions based on intent
-        suggested_actions = _get_suggested_actions(intent, assistant_response.products)
-        
-        # Check if there was a cart action
-        cart_action = session.metadata.get("last_cart_action")
-        
-        # Store cart action in metadata
-        response_metadata = {
-            "processing_time_ms": round(response_time_ms, 2),
-            "timestamp": datetime.utcnow().isoformat(),
-            "function_calls": assistant_response.metadata.get("function_calls_made", 0),
-        }
-        
-        # Map cart action to actions field for frontend
-        actions = []
-        if cart_action:
-            actions.append(cart_action)
-            # Track cart action
-            if cart_action.get("type") == "add_to_cart":
-                analytics.track_cart_action("add", cart_action.get("data", {}).get("product_id", ""))
-            session.metadata.pop("last_cart_action", None)
-        
-        # Debug: Log products being returned
-        logger.info(f"[API] Assistant response has {len(assistant_response.products) if assistant_response.products else 0} products")
-        if assistant_response.products:
-            logger.info(f"[API] Product names: {[p.get('name', 'UNNAMED') for p in assistant_response.products[:3]]}")
-        
-        # Build product list for response
-        products_list = [
-            {
-                "id": p.get("id") if isinstance(p, dict) else None,
-                "name": p.get("name") if isinstance(p, dict) else "Product",
-                "price": p.get("price") if isinstance(p, dict) else 0.0,
-                "description": p.get("description", "") if isinstance(p, dict) else "",
-                "image_url": p.get("image_url") if isinstance(p, dict) else None,
-                "url": (p.get("product_url") or f"/products/{p.get('id')}") if isinstance(p, dict) else "#"
-            }
-            for p in assistant_response.products
-            if p is not None # Filter out None products
-        ] if assistant_response.products else []
-        
-        logger.info(f"[API] Returning {len(products_list)} products in response")
-        if products_list:
-            logger.info(f"[API] First product: id={products_list[0]['id']}, name={products_list[0]['name']}")
-        
-        return MessageResponse(
-            session_id=assistant_response.session_id,
-            message=assistant_response.message,
-            intent=intent,
-            products=products_list if products_list else None,
-            actions=actions if actions else None,
-            suggested_actions=suggested_actions,
-            followup_chips=followup_chips,
-            metadata=response_metadata
-        )
+        return _build_message_response(request, assistant_response, start_time)
         
     except EasymartException as e:
         # Track error
@@ -184,6 +105,141 @@ async def handle_message(
         )
 
 
+@router.post("/message/stream")
+async def handle_message_stream(
+    request: MessageRequest,
+    raw_request: Request,
+    _: None = Depends(check_rate_limit)  # Rate limiting
+):
+    """
+    Streaming variant of /message (server-sent events).
+    
+    Emits `delta` events with reply text as the final LLM turn generates it, then one
+    `done` event carrying the full MessageResponse. The `done` message is authoritative:
+    post-processing (fallback products, bundle notes) can amend the streamed text.
+    """
+    start_time = time.time()
+    handler = get_assistant_handler()
+    assistant_request = AssistantRequest(
+        message=request.message,
+        session_id=request.session_id,
+        user_id=request.context.get("user_id") if request.context else None
+    )
+    
+    async def events():
+        try:
+            async for item in handler.handle_message_stream(assistant_request):
+                if isinstance(item, str):
+                    yield _sse("delta", {"content": item})
+                else:
+                    response = _build_message_response(request, item, start_time)
+                    yield _sse("done", response.model_dump())
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}", exc_info=True)
+            get_analytics().track_error("internal_error", str(e))
+            yield _sse("error", {"message": "An unexpected error occurred processing your message"})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _sse(event: str, data: dict) -> str:
+    # The "done" event carries the full product list; orjson keeps it off the hot path
+    payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode() if orjson is not None else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _build_message_response(request: MessageRequest, assistant_response, start_time: float) -> MessageResponse:
+    """Map an AssistantResponse to the API response: follow-up chips, actions, analytics"""
+    analytics = get_analytics()
+    followup_gen = get_followup_generator()
+    
+    # Calculate response time
+    response_time_ms = (time.time() - start_time) * 1000
+    
+    # Extract intent from metadata
+    intent = assistant_response.metadata.get("intent", "general_query")
+    
+    # Get session for cart count
+    session_store = get_session_store()
+    session = session_store.get_or_create_session(assistant_response.session_id)
+    cart_count = len(session.cart_items) if session.cart_items else 0
+    
+    # Generate follow-up chips based on context
+    products_count = len(assistant_response.products) if assistant_response.products else 0
+    followup_chips = followup_gen.generate_followups(
+        intent=intent,
+        products_count=products_count,
+        cart_count=cart_count,
+        context={"query": request.message}
+    )
+    
+    # Track analytics
+    analytics.track_request(
+        session_id=request.session_id,
+        intent=intent,
+        query=request.message,
+        response_time_ms=response_time_ms,
+        products_returned=products_count,
+        success=True
+    )
+    
+    # Build suggested actions based on intent
+    suggested_actions = _get_suggested_actions(intent, assistant_response.products)
+    
+    # Check if there was a cart action
+    cart_action = session.metadata.get("last_cart_action")
+    
+    # Store cart action in metadata
+    response_metadata = {
+        "processing_time_ms": round(response_time_ms, 2),
+        "timestamp": datetime.utcnow().isoformat(),
+        "function_calls": assistant_response.metadata.get("function_calls_made", 0),
+    }
+    
+    # Map cart action to actions field for frontend
+    actions = []
+    if cart_action:
+        actions.append(cart_action)
+        # Track cart action
+        if cart_action.get("type") == "add_to_cart":
+            analytics.track_cart_action("add", cart_action.get("data", {}).get("product_id", ""))
+        session.metadata.pop("last_cart_action", None)
+    
+    # Debug: Log products being returned
+    logger.debug("[API] Assistant response has %d products", len(assistant_response.products or []))
+    if assistant_response.products and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[API] Product names: %s", [p.get('name', 'UNNAMED') for p in assistant_response.products[:3]])
+    
+    # Build product list for response
+    products_list = [
+        {
+            "id": p.get("id") if isinstance(p, dict) else None,
+            "name": p.get("name") if isinstance(p, dict) else "Product",
+            "price": p.get("price") if isinstance(p, dict) else 0.0,
+            "description": p.get("description", "") if isinstance(p, dict) else "",
+            "image_url": p.get("image_url") if isinstance(p, dict) else None,
+            "url": (p.get("product_url") or f"/products/{p.get('id')}") if isinstance(p, dict) else "#"
+        }
+        for p in assistant_response.products
+        if p is not None # Filter out None products
+    ] if assistant_response.products else []
+    
+    logger.debug("[API] Returning %d products in response", len(products_list))
+    if products_list:
+        logger.debug("[API] First product: id=%s, name=%s", products_list[0]['id'], products_list[0]['name'])
+    
+    return MessageResponse(
+        session_id=assistant_response.session_id,
+        message=assistant_response.message,
+        intent=intent,
+        products=products_list if products_list else None,
+        actions=actions if actions else None,
+        suggested_actions=suggested_actions,
+        followup_chips=followup_chips,
+        metadata=response_metadata
+    )
+
+
 def _get_suggested_actions(intent: str, products: list) -> list:
     """
     Get suggested actions based on intent and context.
@@ -248,7 +304,7 @@ async def get_session(session_id: str):
         return {
             "session_id": session.session_id,
             "status": "active",
-            "message_count": len(session.messages),
+            "message_count": session.message_count,
             "cart_items": len(session.cart_items),
             "last_activity": session.last_activity.isoformat(),
             "created_at": session.created_at.isoformat()
@@ -315,10 +371,18 @@ async def get_analytics_dashboard():
     """
     try:
         analytics = get_analytics()
-        return analytics.get_dashboard_metrics()
+        metrics = analytics.get_dashboard_metrics()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting analytics: {str(e)}")
 
+    # Intent cache stats only from an already-built handler; building one here needs the LLM config
+    try:
+        if get_assistant_handler.cache_info().currsize:
+            metrics["intent_cache"] = get_assistant_handler().intent_detector.cache_stats()
+    except Exception as e:
+        logger.warning("Intent cache stats unavailable: %s", e)
+    return metrics
+
 
 @router.post("/catalog/sync")
 async def sync_catalog(request: Request):
@@ -356,7 +420,7 @@ async def update_cart_endpoint(request: Request):
         action = body.get("action", "add")  # add, remove, set
         session_id = body.get("session_id")
         
-        logger.info(f"Cart request: product_id={product_id}, quantity={quantity}, action={action}, session_id={session_id}")
+        logger.info("Cart request: product_id=%s, quantity=%s, action=%s, session_id=%s", product_id, quantity, action, session_id)
         
         if not product_id and action not in ["view", "clear"]:
             raise ValueError(f"product_id is required for action: {action}")
@@ -378,7 +442,7 @@ async def update_cart_endpoint(request: Request):
             skip_sync=True
         )
         
-        logger.info(f"Cart update result success: {result.get('success')}")
+        logger.info("Cart update result success: %s", result.get('success'))
         
         if not result.get("success"):
             return JSONResponse(
@@ -403,7 +467,7 @@ async def get_cart_endpoint(session_id: str):
     Direct session store query for efficient cart retrieval.
     """
     try:
-        logger.info(f"Getting cart for session: {session_id}")
+        logger.debug("Getting cart for session: %s", session_id)
         
         # Get the tools instance
         from app.modules.assistant.tools import get_assistant_tools
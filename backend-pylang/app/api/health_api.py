@@ -2,7 +2,8 @@
 Health check API endpoints.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
 from datetime import datetime
 from app.core.schemas import HealthResponse
 from app.core.config import get_settings, Settings
@@ -69,3 +70,12 @@ async def health_check(settings: Settings = Depends(get_settings)):
 async def ping():
     """Simple ping endpoint"""
     return {"status": "pong", "timestamp": datetime.utcnow()}
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """Readiness probe: 503 until the startup warmup has finished"""
+    ready = getattr(request.app.state, "ready", None)
+    if ready is not None and not ready.is_set():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
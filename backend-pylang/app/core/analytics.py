@@ -8,10 +8,31 @@ from datetime import datetime, timedelta
 import logging
 from collections import defaultdict
 import json
+import re
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Query categories in priority order, each keyword list as one compiled substring alternation
+_QUERY_CATEGORY_RES = tuple(
+    (category, re.compile("|".join(re.escape(kw) for kw in keywords)))
+    for category, keywords in {
+        "chair_search": ["chair", "seat", "stool", "office chair", "gaming chair"],
+        "desk_search": ["desk", "workstation", "office desk", "standing desk"],
+        "table_search": ["table", "dining table", "coffee table"],
+        "sofa_search": ["sofa", "couch", "lounge", "sectional"],
+        "bed_search": ["bed", "mattress", "bedroom"],
+        "storage_search": ["storage", "cabinet", "shelf", "locker", "wardrobe"],
+        "price_query": ["under", "budget", "cheap", "expensive", "price", "affordable"],
+        "color_query": ["black", "white", "blue", "red", "grey", "color", "brown"],
+        "spec_query": ["dimension", "size", "weight", "material", "specs", "specifications"],
+        "stock_query": ["stock", "available", "inventory", "in stock"],
+        "cart_action": ["cart", "add", "remove", "buy", "purchase", "checkout"],
+        "comparison": ["compare", "difference", "vs", "versus", "better"],
+        "policy_query": ["return", "shipping", "delivery", "warranty", "policy"],
+    }.items()
+)
+
 
 class ConversationAnalytics:
     """Track and analyze conversation metrics"""
@@ -75,7 +96,7 @@ class ConversationAnalytics:
             self.conversion_funnel["products_viewed"] += 1
             self.metrics[today]["products_shown"] += products_returned
         
-        logger.debug(f"[ANALYTICS] Tracked: intent={intent}, products={products_returned}, time={response_time_ms:.0f}ms")
+        logger.debug("[ANALYTICS] Tracked: intent=%s, products=%s, time=%.0fms", intent, products_returned, response_time_ms)
     
     def track_cart_action(self, action: str, product_id: str, quantity: int = 1):
         """Track cart-related actions"""
@@ -90,7 +111,7 @@ class ConversationAnalytics:
             self.conversion_funnel["checkouts_initiated"] += 1
             self.metrics[today]["checkouts"] += 1
         
-        logger.debug(f"[ANALYTICS] Cart action: {action}, product={product_id}, qty={quantity}")
+        logger.debug("[ANALYTICS] Cart action: %s, product=%s, qty=%s", action, product_id, quantity)
     
     def track_error(self, error_type: str, details: str = ""):
         """Track errors for monitoring"""
@@ -105,7 +126,7 @@ class ConversationAnalytics:
         if total_today > 10 and errors_today / total_today > 0.1:
             logger.warning(f"[ANALYTICS] ⚠️ High error rate: {errors_today}/{total_today} ({errors_today/total_today*100:.1f}%)")
         
-        logger.info(f"[ANALYTICS] Error tracked: {error_type} - {details[:100]}")
+        logger.info("[ANALYTICS] Error tracked: %s - %s", error_type, details[:100])
     
     def track_session_start(self, session_id: str):
         """Track new session"""
@@ -150,24 +171,8 @@ class ConversationAnalytics:
         """Categorize query for analytics (privacy-preserving)"""
         query_lower = query.lower()
         
-        categories = {
-            "chair_search": ["chair", "seat", "stool", "office chair", "gaming chair"],
-            "desk_search": ["desk", "workstation", "office desk", "standing desk"],
-            "table_search": ["table", "dining table", "coffee table"],
-            "sofa_search": ["sofa", "couch", "lounge", "sectional"],
-            "bed_search": ["bed", "mattress", "bedroom"],
-            "storage_search": ["storage", "cabinet", "shelf", "locker", "wardrobe"],
-            "price_query": ["under", "budget", "cheap", "expensive", "price", "affordable"],
-            "color_query": ["black", "white", "blue", "red", "grey", "color", "brown"],
-            "spec_query": ["dimension", "size", "weight", "material", "specs", "specifications"],
-            "stock_query": ["stock", "available", "inventory", "in stock"],
-            "cart_action": ["cart", "add", "remove", "buy", "purchase", "checkout"],
-            "comparison": ["compare", "difference", "vs", "versus", "better"],
-            "policy_query": ["return", "shipping", "delivery", "warranty", "policy"],
-        }
-        
-        for category, keywords in categories.items():
-            if any(kw in query_lower for kw in keywords):
+        for category, keywords_re in _QUERY_CATEGORY_RES:
+            if keywords_re.search(query_lower):
                 return category
         
         return "general"
@@ -4,6 +4,7 @@ Loads environment variables and provides centralized config access.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
 from pydantic_settings import BaseSettings
@@ -47,11 +48,20 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = Field(default="gpt-4.1", description="OpenAI model name")
     OPENAI_BASE_URL: Optional[str] = Field(default=None, description="OpenAI API base URL (optional)")
     OPENAI_TIMEOUT: float = Field(default=30.0, description="OpenAI API timeout in seconds")
+
+    # Self-hosted OpenAI-compatible server (vLLM / TGI); takes over from OpenAI when set
+    VLLM_BASE_URL: Optional[str] = Field(default=None, description="vLLM/TGI OpenAI-compatible base URL, e.g. http://localhost:8000/v1")
+    VLLM_MODEL: str = Field(default="mistralai/Mistral-7B-Instruct-v0.2", description="Model name served by the vLLM/TGI server")
+    VLLM_API_KEY: str = Field(default="EMPTY", description="API key for the vLLM/TGI server (--api-key), if it requires one")
     
     # LLM Configuration (shared defaults)
     LLM_MODEL: str = Field(default="gpt-4", description="LLM model name (legacy)")
     LLM_TEMPERATURE: float = Field(default=0.7, description="LLM temperature")
     LLM_MAX_TOKENS: int = Field(default=512, description="LLM max tokens")
+    ASSISTANT_MAX_CONCURRENCY: int = Field(default=8, description="Maximum LLM calls in flight per worker")
+    DIRECT_PRODUCT_SEARCH: bool = Field(default=True, description="Run search_products from extracted entities instead of a tool-choosing LLM call on product-search turns")
+    TEMPLATED_SEARCH_REPLY: bool = Field(default=True, description="Answer specific direct searches with a templated intro instead of a final LLM call")
+    GREETING_FAST_PATH: bool = Field(default=True, description="Answer bare greetings with the welcome message instead of an LLM call")
     
     # Timeout configurations (seconds) - CRITICAL FOR PRODUCTION
     LLM_TIMEOUT: float = Field(default=30.0, description="Maximum time for LLM to respond")
@@ -84,17 +94,26 @@ class Settings(BaseSettings):
     SEARCH_MMR_LAMBDA: float = Field(default=0.7, description="MMR lambda parameter (0-1): Relevance vs Diversity")
     SEARCH_MMR_FETCH_K: int = Field(default=50, description="Fetch K candidates before MMR")
     SEARCH_RRF_K: int = Field(default=60, description="RRF constant k (typically 60)")
+    USE_HYPERSCAN: bool = Field(default=False, description="Use Hyperscan for message classification and keyword scans when installed")
 
     # Catalog sync
     CATALOG_SYNC_ENABLED: bool = Field(default=False, description="Enable scheduled catalog sync")
     CATALOG_SYNC_INTERVAL_MINUTES: int = Field(default=60, description="Catalog sync interval in minutes")
     CATALOG_SYNC_ALLOW_CSV_FALLBACK: bool = Field(default=False, description="Allow CSV fallback during scheduled sync")
+    AUTO_INDEX_ON_STARTUP: bool = Field(default=False, description="Rebuild the catalog index in the background at startup")
+    INDEX_BATCH_SIZE: int = Field(default=1000, description="Documents embedded and upserted per vector index batch")
 
     # Bundle confirmation
     BUNDLE_CONFIRM_THRESHOLD: float = Field(default=1000.0, description="Require confirmation above this bundle total")
+
+    # Response cache (first-turn product searches and store info)
+    RESPONSE_CACHE_SIZE: int = Field(default=256, description="Cached assistant responses (0 disables)")
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(default=900.0, description="Seconds before a cached response expires")
+    RESPONSE_CACHE_SIMILARITY: float = Field(default=0.95, description="Cosine similarity for near-duplicate hits on store-info intents (0 = exact matches only)")
     
     # Session Management
     SESSION_TIMEOUT_MINUTES: int = Field(default=30, description="Session timeout in minutes")
+    HISTORY_TOKEN_BUDGET: int = Field(default=2048, description="Approximate tokens of conversation history sent to the LLM per turn")
     REDIS_URL: Optional[str] = Field(default=None, description="Redis connection URL for sessions")
     
     # Logging
@@ -111,6 +130,11 @@ class Settings(BaseSettings):
 settings = Settings()
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings"""
+    """
+    Get application settings.
+    Always the module-level singleton: env/.env is parsed once at import, never per call,
+    so tests that mutate get_settings() see the same object as `settings` importers.
+    """
     return settings
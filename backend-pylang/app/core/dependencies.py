@@ -2,7 +2,7 @@
 FastAPI dependency injection functions.
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from typing import Optional
 from app.core.config import get_settings, Settings
 from app.modules.catalog_index.catalog import CatalogIndexer
@@ -49,3 +49,13 @@ def get_session_id(session_id: str) -> str:
             detail="Invalid session ID"
         )
     return session_id
+
+
+async def require_app_ready(request: Request) -> None:
+    """
+    Wait for the startup warmup (catalog + assistant) before serving a request.
+    No-op when the app was started without the warmup (e.g. tests).
+    """
+    ready = getattr(request.app.state, "ready", None)
+    if ready is not None:
+        await ready.wait()
@@ -87,7 +87,7 @@ class ErrorRecovery:
             if context.get("intent"):
                 response["intent"] = context["intent"]
         
-        logger.info(f"[ERROR_RECOVERY] Handled {error_type}, returning recovery response")
+        logger.info("[ERROR_RECOVERY] Handled %s, returning recovery response", error_type)
         
         return response
     
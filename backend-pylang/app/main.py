@@ -2,20 +2,117 @@
 FastAPI application entry point.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 load_dotenv()
 from app.core.config import get_settings
-from app.modules.observability.logging_config import setup_logging
+from app.core.dependencies import require_app_ready
+from app.modules.observability.logging_config import setup_logging, get_logger
 from app.api import health_router, assistant_router, salesforce_router
 
 settings = get_settings()
 
 # Initialize logging
 setup_logging()
+logger = get_logger("app.main")
+
+
+def _load_catalog() -> None:
+    """Blocking catalog warmup: embedding model + index check"""
+    from app.modules.catalog_index.catalog import CatalogIndexer
+    from app.modules.catalog_index.indexing.advanced_hybrid_search import get_global_encoder
+
+    # PRELOAD embedding model at startup (takes ~3-5 seconds, but only ONCE)
+    logger.info("[Embeddings] Preloading sentence transformer model...")
+    get_global_encoder()
+    logger.info("[Embeddings] Model loaded and cached")
+
+    try:
+        indexer = CatalogIndexer()
+        product_count = indexer.get_product_count()
+        if product_count > 0:
+            logger.info("[Catalog] Ready with %d products indexed", product_count)
+        else:
+            logger.warning("[Catalog] No products indexed. Run: python -m app.modules.catalog_index.load_catalog")
+    except Exception as e:
+        logger.error("[Catalog] Error checking catalog: %s", e)
+
+
+def _load_assistant():
+    """Blocking assistant warmup: build the handler (LLM client, tools, detectors)"""
+    from app.modules.assistant import get_assistant_handler
+
+    logger.info("[Assistant] Initializing handler and LLM client...")
+    handler = get_assistant_handler()
+    logger.info("[Assistant] Handler ready")
+    return handler
+
+
+async def _warmup(app: FastAPI) -> None:
+    """Run the startup warmup stages concurrently off the event loop, then signal readiness"""
+    catalog, handler = await asyncio.gather(
+        asyncio.to_thread(_load_catalog),
+        asyncio.to_thread(_load_assistant),
+        return_exceptions=True,
+    )
+    if isinstance(catalog, Exception):
+        logger.error("[Catalog] Warmup failed: %s", catalog)
+    if isinstance(handler, Exception):
+        logger.error("[Assistant] Warmup failed: %s", handler)
+    else:
+        app.state.assistant_handler = handler
+    # Always release waiting requests; anything that failed loads lazily
+    app.state.ready.set()
+
+    if not isinstance(handler, Exception):
+        # After readiness so a slow network never holds traffic back; on the serving
+        # loop because the async HTTP pool is bound to it
+        await handler.warmup()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(
+        "[%s] Starting up: version=%s env=%s debug=%s host=%s:%s",
+        settings.APP_NAME, settings.APP_VERSION, settings.ENVIRONMENT,
+        settings.DEBUG, settings.HOST, settings.PORT,
+    )
+
+    from app.modules.catalog_index.sync import get_catalog_sync_service
+
+    # Warm the catalog and assistant in the background so the server accepts traffic
+    # immediately; assistant routes wait on this event and /health/ready reports it
+    app.state.ready = asyncio.Event()
+    background_tasks = [asyncio.create_task(_warmup(app))]
+
+    if settings.CATALOG_SYNC_ENABLED:
+        sync_service = get_catalog_sync_service()
+        background_tasks.append(asyncio.create_task(sync_service.run_loop()))
+        logger.info("[CatalogSync] Enabled (interval: %d minutes)", settings.CATALOG_SYNC_INTERVAL_MINUTES)
+    elif settings.AUTO_INDEX_ON_STARTUP:
+        # One-off background index build; the sync loop above already starts with one
+        background_tasks.append(asyncio.create_task(get_catalog_sync_service().run_once()))
+        logger.info("[Catalog] Auto-indexing on startup")
+
+    logger.info("[%s] Ready", settings.APP_NAME)
+    yield
+
+    logger.info("[%s] Shutting down...", settings.APP_NAME)
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    handler = getattr(app.state, "assistant_handler", None)
+    if handler is not None:
+        await handler.close()
+
+    from app.modules.assistant.session_store import flush_session_store
+    await flush_session_store()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -23,7 +120,8 @@ app = FastAPI(
     description="Easymart AI Assistant Backend (LangChain) - Hybrid Search + Tool Calling",
     debug=settings.DEBUG,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(GZipMiddleware, minimum_size=1000)
@@ -37,7 +135,7 @@ app.add_middleware(
 )
 
 app.include_router(health_router)
-app.include_router(assistant_router)
+app.include_router(assistant_router, dependencies=[Depends(require_app_ready)])
 app.include_router(salesforce_router)
 
 
@@ -52,46 +150,6 @@ async def root():
     }
 
 
-@app.on_event("startup")
-async def startup_event():
-    print(f"[{settings.APP_NAME}] Starting up...")
-    print(f"  Version: {settings.APP_VERSION}")
-    print(f"  Environment: {settings.ENVIRONMENT}")
-    print(f"  Debug: {settings.DEBUG}")
-    print(f"  Host: {settings.HOST}:{settings.PORT}")
-
-    from app.modules.catalog_index.catalog import CatalogIndexer
-    from app.modules.catalog_index.sync import get_catalog_sync_service
-    from app.modules.catalog_index.indexing.advanced_hybrid_search import get_global_encoder
-    
-    # PRELOAD embedding model at startup (takes ~3-5 seconds, but only ONCE)
-    print("[Embeddings] Preloading sentence transformer model...")
-    get_global_encoder()
-    print("[Embeddings] Model loaded and cached!")
-    
-    try:
-        indexer = CatalogIndexer()
-        product_count = indexer.get_product_count()
-        if product_count > 0:
-            print(f"[Catalog] Ready with {product_count} products indexed")
-        else:
-            print("[Catalog] No products indexed. Run: python -m app.modules.catalog_index.load_catalog")
-    except Exception as e:
-        print(f"[Catalog] Error checking catalog: {e}")
-
-    if settings.CATALOG_SYNC_ENABLED:
-        sync_service = get_catalog_sync_service()
-        asyncio.create_task(sync_service.run_loop())
-        print(f"[CatalogSync] Enabled (interval: {settings.CATALOG_SYNC_INTERVAL_MINUTES} minutes)")
-
-    print(f"[{settings.APP_NAME}] Ready!")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    print(f"[{settings.APP_NAME}] Shutting down...")
-
-
 if __name__ == "__main__":
     import uvicorn
 
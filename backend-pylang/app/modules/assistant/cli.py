@@ -1,12 +1,19 @@
+"""
+Interactive terminal client for the Easymart assistant.
+
+Run from the backend-pylang directory:
+    python -m app.modules.assistant.cli
+    python -m app.modules.assistant.cli --batch messages.txt --concurrency 8
+"""
+
+import argparse
 import asyncio
-import sys
 import os
+import sys
+import time
 import uuid
 from typing import Optional
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
-
 from app.modules.assistant.handler import get_assistant_handler, AssistantRequest
 from app.core.config import settings
 
@@ -18,7 +25,97 @@ RED = "\033[91m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
 
-async def main():
+# Bytes read from stdin but not yet consumed as a line (pasted input can hold several)
+_stdin_buffer = bytearray()
+
+
+async def _read_input(prompt: str) -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+    Waits on the fd with loop.add_reader rather than a worker thread, so Ctrl-C
+    exits immediately instead of waiting for a pending input() to return.
+    """
+    print(prompt, end="", flush=True)
+    loop = asyncio.get_running_loop()
+    fd = sys.stdin.fileno()
+    
+    while b"\n" not in _stdin_buffer:
+        readable = loop.create_future()
+        try:
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        except (NotImplementedError, OSError):
+            # No fd readers on this loop (Windows proactor) or stdin is a regular
+            # file that can't be polled: fall back to a plain blocking read
+            return input()
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            if _stdin_buffer:
+                break  # last line without a trailing newline
+            raise EOFError
+        _stdin_buffer.extend(chunk)
+    
+    line, _, rest = bytes(_stdin_buffer).partition(b"\n")
+    _stdin_buffer[:] = rest
+    return line.decode(errors="replace").rstrip("\r")
+
+
+async def run_batch(handler, path: str, concurrency: int, shared_session: bool = False) -> None:
+    """
+    Send every non-empty line of a file through the handler concurrently and
+    report per-request latency and overall throughput.
+
+    Each line runs in its own session, like independent users; with shared_session
+    all lines share one conversation (their turns interleave in its history).
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if not lines:
+        print(f"{YELLOW}No messages in {path}{RESET}")
+        return
+    
+    batch_id = f"cli-batch-{uuid.uuid4().hex[:8]}"
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    
+    async def one(index: int, message: str) -> None:
+        nonlocal errors
+        session_id = batch_id if shared_session else f"{batch_id}-{index}"
+        async with sem:
+            started = time.perf_counter()
+            try:
+                response = await handler.handle_message(AssistantRequest(message=message, session_id=session_id))
+                # handle_message recovers from its own failures and reports them as an error intent
+                if response.metadata.get("intent") == "error":
+                    errors += 1
+                    print(f"{RED}Error for {message!r}: {response.metadata.get('error')}{RESET}")
+            except Exception as e:
+                errors += 1
+                print(f"{RED}Error for {message!r}: {e}{RESET}")
+            latencies.append(time.perf_counter() - started)
+    
+    mode = "one shared session" if shared_session else "one session per message"
+    print(f"Sending {len(lines)} messages (concurrency={concurrency}, {mode})...")
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index, line) for index, line in enumerate(lines)))
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print("-" * 30)
+    print(f"Requests:   {len(lines)} ({errors} failed)")
+    print(f"Wall time:  {elapsed:.2f}s")
+    print(f"Throughput: {len(lines) / elapsed:.2f} req/s")
+    print(f"Latency:    avg {sum(latencies) / len(latencies) * 1000:.0f}ms, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.0f}ms, p95 {p95 * 1000:.0f}ms")
+
+
+async def main(batch: Optional[str] = None, concurrency: int = 4, shared_session: bool = False):
     print(f"{BOLD}{BLUE}=== Easymart Assistant CLI ==={RESET}")
     print("Type 'quit' or 'exit' to stop.")
     print("-" * 30)
@@ -34,6 +131,10 @@ async def main():
     except Exception as e:
         print(f"{RED}Failed to initialize assistant: {e}{RESET}")
         return
+    
+    if batch:
+        await run_batch(handler, batch, concurrency, shared_session)
+        return
 
     # Create session
     session_id = f"cli-{uuid.uuid4().hex[:8]}"
@@ -42,7 +143,7 @@ async def main():
 
     while True:
         try:
-            user_input = input(f"{BOLD}You: {RESET}").strip()
+            user_input = (await _read_input(f"{BOLD}You: {RESET}")).strip()
             
             if user_input.lower() in ["quit", "exit"]:
                 print("Goodbye!")
@@ -86,11 +187,32 @@ async def main():
                 
             print("-" * 30)
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\nGoodbye!")
             break
         except Exception as e:
             print(f"\n{RED}Error: {e}{RESET}")
 
+
+def main_sync():
+    """Synchronous entry point for console scripts"""
+    parser = argparse.ArgumentParser(description="Easymart assistant CLI")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="send each line of FILE concurrently and print throughput")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="maximum in-flight requests in batch mode (default: 4)")
+    parser.add_argument("--shared-session", action="store_true",
+                        help="batch mode: send every line in one session instead of one session per line")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    
+    try:
+        asyncio.run(main(args.batch, args.concurrency, args.shared_session))
+    except KeyboardInterrupt:
+        # asyncio.run cancels main() on Ctrl-C and re-raises here
+        print("\nGoodbye!")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    main_sync()
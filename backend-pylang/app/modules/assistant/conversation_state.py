@@ -5,15 +5,86 @@ Manages conversation state and determines message intent for context refinement.
 This is the root fix for context refinement issues - a proper state machine.
 """
 
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, List, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+from itertools import chain
 import re
+import sys
 
+from app.core.config import get_settings
 from ..observability.logging_config import get_logger
 
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None
+
 logger = get_logger(__name__)
 
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_PRICE_RE = re.compile(r'(under|below|less than|max|maximum|cheaper than)\s*\$?(\d+)')
+_PREFIX_RE = re.compile(r'^(for|in|with|under|over)\s+')
+# Product-question cues fused into one alternation: a single scan per message
+_PRODUCT_Q_RE = re.compile(
+    r'(?:option|number|product)\s*\d+'
+    r'|tell me (?:about|more)'
+    r'|what (?:is|are) (?:the|this|that)'
+    r'|(?:does|is) (?:this|it|that)'
+    r'|show me (?:option|product|number)'
+    r'|(?:available|comes?) in'
+)
+
+# New-search cues, matched as whole words ("i want"/"i need" are covered by want/need)
+_SEARCH_VERBS = frozenset({'find', 'show', 'search', 'need', 'want'})
+_SEARCH_PHRASE_RE = re.compile(r'\b(?:looking for|get me)\b')
+_PRODUCT_TYPE_WORDS = frozenset({'equipment', 'gear', 'supplies', 'accessories', 'products', 'items'})
+_NON_REFINEMENT_WORDS = _PRODUCT_TYPE_WORDS | {'furniture'}
+
+# Refinement vocabulary, interned so attribute values are shared across sessions
+_COLORS = tuple(map(sys.intern, (
+    'red', 'blue', 'green', 'black', 'white', 'grey', 'gray', 'brown',
+    'beige', 'navy', 'pink', 'yellow', 'orange', 'purple',
+)))
+_MATERIALS = tuple(map(sys.intern, (
+    'wooden', 'wood', 'metal', 'plastic', 'leather', 'fabric',
+    'glass', 'steel', 'oak', 'pine', 'marble',
+)))
+_STYLES = tuple(map(sys.intern, (
+    'modern', 'contemporary', 'traditional', 'rustic', 'minimalist',
+    'industrial', 'vintage', 'classic',
+)))
+_ROOMS = tuple(map(sys.intern, ('office', 'bedroom', 'living room', 'kitchen', 'dining', 'kids')))
+
+
+def _word_alternation(words: Iterable[str], plurals: bool = False) -> "re.Pattern[str]":
+    """Compile words/phrases into one word-bounded alternation (longest first)"""
+    alternatives = sorted(set(words), key=len, reverse=True)
+    suffix = r'(?:s|es)?' if plurals else ''
+    return re.compile(r'\b(' + '|'.join(map(re.escape, alternatives)) + r')' + suffix + r'\b')
+
+
+def _plural_forms(words: Iterable[str]) -> Dict[str, str]:
+    """Map each word and its simple plural forms back to the word (first listed wins)"""
+    forms: Dict[str, str] = {}
+    for word in words:
+        for form in (word, word + 's', word + 'es'):
+            forms.setdefault(form, word)
+    return forms
+
+
+# Refinement token -> (SearchContext attribute field, stored value), resolved in one pass over the words
+_TOKEN_TO_ATTR: Dict[str, Tuple[str, str]] = {
+    **{color: ('color', color) for color in _COLORS},
+    **{material: ('material', material) for material in _MATERIALS},
+    **{style: ('style', style) for style in _STYLES},
+    # "wooden" is stored as "wood", the value the substring scan used to end on
+    'wooden': ('material', sys.intern('wood')),
+}
+# Rooms include a multi-word phrase ("living room"), so they go through one alternation
+_ROOM_RE = _word_alternation(_ROOMS)
+
 
 class ConversationPhase(Enum):
     INITIAL = "initial"
@@ -23,70 +94,65 @@ class ConversationPhase(Enum):
     GENERAL_QUESTION = "general_question"
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchContext:
     """Tracks the current search context"""
     base_query: str  # Original search: "chairs"
-    refinements: List[str] = field(default_factory=list)  # ["modern", "wooden", "under $500"]
     category: Optional[str] = None  # "chairs"
-    attributes: Dict[str, str] = field(default_factory=dict)  # {"style": "modern", "material": "wooden"}
+    color: Optional[str] = None  # "black"
+    material: Optional[str] = None  # "wood"
+    style: Optional[str] = None  # "modern"
     price_constraint: Optional[str] = None  # "under $500"
     room: Optional[str] = None  # "office"
+    # Insertion-ordered set of refinements: {"modern": None, "under $500": None}
+    _refinements: Dict[str, None] = field(default_factory=dict)
+    
+    @property
+    def refinements(self) -> List[str]:
+        """Refinements in the order they were added"""
+        return list(self._refinements)
+    
+    @property
+    def attributes(self) -> Dict[str, str]:
+        """Parsed attributes that are set, e.g. {"style": "modern", "material": "wood"}"""
+        return {
+            name: value
+            for name, value in (('color', self.color), ('material', self.material), ('style', self.style))
+            if value is not None
+        }
     
     def get_full_query(self) -> str:
         """Construct the complete search query"""
-        parts = [self.base_query]
-        
-        # Add refinements in order
-        for refinement in self.refinements:
-            if refinement not in parts:
-                parts.append(refinement)
-        
-        return " ".join(parts)
+        # Refinements are already unique; only skip a repeat of the base query
+        return " ".join([self.base_query, *(r for r in self._refinements if r != self.base_query)])
     
     def add_refinement(self, refinement: str) -> None:
         """Add a new refinement to the context"""
-        if refinement not in self.refinements:
-            self.refinements.append(refinement)
-            
-            # Parse and update attributes
-            self._parse_refinement(refinement)
+        if refinement in self._refinements:
+            return
+        self._refinements[refinement] = None
+        
+        # Parse and update attributes
+        self._parse_refinement(refinement)
     
     def _parse_refinement(self, refinement: str) -> None:
         """Extract structured attributes from refinement"""
         refinement_lower = refinement.lower()
         
-        # Color
-        colors = ['red', 'blue', 'green', 'black', 'white', 'grey', 'gray', 'brown', 
-                  'beige', 'navy', 'pink', 'yellow', 'orange', 'purple']
-        for color in colors:
-            if color in refinement_lower:
-                self.attributes['color'] = color
-        
-        # Material
-        materials = ['wooden', 'wood', 'metal', 'plastic', 'leather', 'fabric', 
-                     'glass', 'steel', 'oak', 'pine', 'marble']
-        for material in materials:
-            if material in refinement_lower:
-                self.attributes['material'] = material
-        
-        # Style
-        styles = ['modern', 'contemporary', 'traditional', 'rustic', 'minimalist', 
-                  'industrial', 'vintage', 'classic']
-        for style in styles:
-            if style in refinement_lower:
-                self.attributes['style'] = style
+        # Color / material / style (a later mention overrides an earlier one)
+        for token in _WORD_RE.findall(refinement_lower):
+            attr = _TOKEN_TO_ATTR.get(token)
+            if attr:
+                setattr(self, *attr)
         
         # Room
-        rooms = ['office', 'bedroom', 'living room', 'kitchen', 'dining', 'kids']
-        for room in rooms:
-            if room in refinement_lower:
-                self.room = room
+        for match in _ROOM_RE.finditer(refinement_lower):
+            self.room = sys.intern(match.group(1))
         
         # Price
-        price_match = re.search(r'(under|below|less than|max|maximum|cheaper than)\s*\$?(\d+)', refinement_lower)
+        price_match = _PRICE_RE.search(refinement_lower)
         if price_match:
-            self.price_constraint = f"under ${price_match.group(2)}"
+            self.price_constraint = sys.intern(f"under ${price_match.group(2)}")
 
 
 class ConversationStateManager:
@@ -140,10 +206,19 @@ class ConversationStateManager:
                      'lightweight', 'compact', 'professional', 'training', 'sparring']
     }
     
+    # Precompiled matchers built once from the keyword tables above
+    _CATEGORY_FORMS = _plural_forms(c for c in CATEGORIES if ' ' not in c)
+    _CATEGORY_RANK = {category: rank for rank, category in enumerate(CATEGORIES)}
+    _CATEGORY_PHRASE_RE = _word_alternation((c for c in CATEGORIES if ' ' in c), plurals=True)
+    _REFINEMENT_RE = _word_alternation(chain.from_iterable(REFINEMENT_KEYWORDS.values()))
+    
     def __init__(self):
         self.current_phase = ConversationPhase.INITIAL
         self.search_context: Optional[SearchContext] = None
         self.last_product_id: Optional[str] = None
+        # Last (message, phase, has_context) analysed and its result, for retried turns
+        self._last_key: Optional[Tuple[str, ConversationPhase, bool]] = None
+        self._last_result: Optional[Dict] = None
     
     def analyze_message(self, message: str, conversation_history: List[Dict]) -> Dict:
         """
@@ -157,14 +232,43 @@ class ConversationStateManager:
                 'context': Optional[SearchContext]
             }
         """
+        # A retried turn arrives in the same state; replaying it would only redo the same work
+        key = (message, self.current_phase, self.search_context is not None)
+        if key == self._last_key and self._last_result is not None:
+            logger.debug("[STATE] Repeated message, reusing last analysis")
+            return dict(self._last_result)
+        
+        result = self._analyze_message(message)
+        self._last_key, self._last_result = key, result
+        return dict(result)
+    
+    def _analyze_message(self, message: str) -> Dict:
+        """Classify a message and update phase/context (see analyze_message)"""
         message_lower = message.lower().strip()
         
         logger.info(f"[STATE] Analyzing message: '{message}'")
         logger.info(f"[STATE] Current phase: {self.current_phase}")
         logger.info(f"[STATE] Has search context: {self.search_context is not None}")
         
+        # Acks, punctuation and keep-alives carry no search signal
+        if len(message_lower) < 3 or not any(c.isalpha() for c in message_lower):
+            logger.info(f"[STATE] Detected as GENERAL question (trivial message)")
+            self.current_phase = ConversationPhase.GENERAL_QUESTION
+            return {
+                'phase': ConversationPhase.GENERAL_QUESTION,
+                'intent': 'general',
+                'processed_message': message,
+                'context': None
+            }
+        
+        # Tokenize once for all the keyword checks below
+        tokens = _WORD_RE.findall(message_lower)
+        
+        # One multi-pattern pass when Hyperscan is enabled (None otherwise)
+        hits = _scan_message(message_lower)
+        
         # Check for product-specific questions
-        if self._is_product_question(message_lower):
+        if self._is_product_question(message_lower, hits):
             logger.info(f"[STATE] Detected as PRODUCT_QUESTION")
             return {
                 'phase': ConversationPhase.PRODUCT_DETAIL,
@@ -174,7 +278,7 @@ class ConversationStateManager:
             }
         
         # Check if it's a refinement
-        if self._is_refinement(message_lower):
+        if self._is_refinement(message_lower, tokens, hits):
             if self.search_context:
                 # Add refinement to existing context
                 self.search_context.add_refinement(message)
@@ -202,16 +306,12 @@ class ConversationStateManager:
                 }
         
         # Check if it's a new search
-        if self._is_new_search(message_lower):
+        if self._is_new_search(message_lower, tokens):
             # Create new search context
-            category = self._extract_category(message_lower)
+            category = self._extract_category(message_lower, tokens)
             self.search_context = SearchContext(
                 base_query=message,
-                refinements=[],
                 category=category,
-                attributes={},
-                price_constraint=None,
-                room=None
             )
             self.current_phase = ConversationPhase.SEARCHING
             
@@ -235,87 +335,133 @@ class ConversationStateManager:
             'context': None
         }
     
-    def _is_refinement(self, message: str) -> bool:
+    def _has_category(self, message: str, tokens: List[str]) -> bool:
+        """Check for a product category on word boundaries"""
+        if not self._CATEGORY_FORMS.keys().isdisjoint(tokens):
+            return True
+        return self._CATEGORY_PHRASE_RE.search(message) is not None
+    
+    def _is_refinement(self, message: str, tokens: List[str], hits: Optional[int] = None) -> bool:
         """Check if message is a refinement (NOT a new search)"""
-        words = message.split()
-        
         # IMPORTANT: If message contains a product category, it's a NEW SEARCH not a refinement
         # This prevents "gym equipment" from being treated as a refinement
-        if any(category in message for category in self.CATEGORIES):
+        if self._has_category(message, tokens):
             logger.info(f"[STATE] Not a refinement - contains category keyword")
             return False
         
         # Also check for search intent keywords - these indicate new search
-        search_keywords = ['find', 'show', 'search', 'looking for', 'need', 'want', 'get me', 'i want', 'i need']
-        if any(keyword in message for keyword in search_keywords):
+        if self._has_search_intent(message, tokens):
             logger.info(f"[STATE] Not a refinement - contains search intent keyword")
             return False
         
         # Also check for product type words - these indicate new search
-        product_words = ['equipment', 'gear', 'supplies', 'accessories', 'products', 'items', 'furniture']
-        if any(word in message for word in product_words):
+        if not _NON_REFINEMENT_WORDS.isdisjoint(tokens):
             logger.info(f"[STATE] Not a refinement - contains product type word")
             return False
         
         # Very short messages with refinement keywords (but NOT category keywords)
-        if len(words) <= 5:
-            for keywords in self.REFINEMENT_KEYWORDS.values():
-                if any(keyword in message for keyword in keywords):
-                    logger.info(f"[STATE] Refinement match: keyword found in '{message}'")
-                    return True
+        if len(tokens) <= 5:
+            if _hit(hits, _HIT_REFINEMENT, self._REFINEMENT_RE, message):
+                logger.info(f"[STATE] Refinement match: keyword found in '{message}'")
+                return True
             
             # Price constraints
-            if re.search(r'(under|below|less than|max|maximum)\s*\$?\d+', message):
+            if _hit(hits, _HIT_PRICE, _PRICE_RE, message):
                 logger.info(f"[STATE] Refinement match: price constraint in '{message}'")
                 return True
             
             # Common refinement prefixes
-            if re.match(r'^(for|in|with|under|over)\s+', message):
+            if _PREFIX_RE.match(message):
                 logger.info(f"[STATE] Refinement match: prefix pattern in '{message}'")
                 return True
         
         return False
     
-    def _is_new_search(self, message: str) -> bool:
+    def _is_new_search(self, message: str, tokens: List[str]) -> bool:
         """Check if message is a new product search"""
         # Contains a product category
-        if any(category in message for category in self.CATEGORIES):
+        if self._has_category(message, tokens):
             return True
         
         # Search intent keywords with category-like words
-        search_keywords = ['find', 'show', 'search', 'looking for', 'need', 'want', 'get me', 'i want', 'i need']
-        if any(keyword in message for keyword in search_keywords):
+        if self._has_search_intent(message, tokens):
             return True
         
         # Check for product type words (nouns that suggest products)
-        product_words = ['equipment', 'gear', 'supplies', 'accessories', 'products', 'items']
-        if any(word in message for word in product_words):
+        return not _PRODUCT_TYPE_WORDS.isdisjoint(tokens)
+    
+    def _has_search_intent(self, message: str, tokens: List[str]) -> bool:
+        """Check for search verbs on word boundaries ("showing" is not "show")"""
+        if not _SEARCH_VERBS.isdisjoint(tokens):
             return True
-        
-        return False
+        return _SEARCH_PHRASE_RE.search(message) is not None
     
-    def _is_product_question(self, message: str) -> bool:
+    def _is_product_question(self, message: str, hits: Optional[int] = None) -> bool:
         """Check if asking about specific product"""
-        product_question_patterns = [
-            r'(option|number|product)\s*\d+',
-            r'tell me (about|more)',
-            r'what (is|are) (the|this|that)',
-            r'(does|is) (this|it|that)',
-            r'show me (option|product|number)',
-            r'(available|comes?) in'
-        ]
-        
-        return any(re.search(pattern, message) for pattern in product_question_patterns)
+        return _hit(hits, _HIT_PRODUCT_Q, _PRODUCT_Q_RE, message)
     
-    def _extract_category(self, message: str) -> Optional[str]:
-        """Extract product category from message"""
-        for category in self.CATEGORIES:
-            if category in message:
-                return category.rstrip('s')  # Singular form
-        return None
+    def _extract_category(self, message: str, tokens: List[str]) -> Optional[str]:
+        """Extract product category from message (earliest in CATEGORIES wins)"""
+        matches = [self._CATEGORY_FORMS[token] for token in tokens if token in self._CATEGORY_FORMS]
+        matches.extend(match.group(1) for match in self._CATEGORY_PHRASE_RE.finditer(message))
+        if not matches:
+            return None
+        return min(matches, key=self._CATEGORY_RANK.__getitem__).rstrip('s')  # Singular form
     
     def reset_context(self):
         """Reset search context"""
         self.search_context = None
         self.current_phase = ConversationPhase.INITIAL
+        self._last_key = self._last_result = None
         logger.info(f"[STATE] Context reset")
+
+
+# Hyperscan match ids double as bit flags in the scan result
+_HIT_PRODUCT_Q, _HIT_REFINEMENT, _HIT_PRICE = 1, 2, 4
+
+
+@lru_cache(maxsize=1)
+def _hyperscan_db():
+    """Compile the classifier patterns into one Hyperscan database (None if disabled/unavailable)"""
+    if hyperscan is None or not get_settings().USE_HYPERSCAN:
+        return None
+    patterns = (
+        (_HIT_PRODUCT_Q, _PRODUCT_Q_RE),
+        (_HIT_REFINEMENT, ConversationStateManager._REFINEMENT_RE),
+        (_HIT_PRICE, _PRICE_RE),
+    )
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[pattern.pattern.encode() for _, pattern in patterns],
+            ids=[hit for hit, _ in patterns],
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns),
+        )
+    except Exception as e:
+        logger.warning(f"[STATE] Hyperscan compile failed, using re: {e}")
+        return None
+    logger.info("[STATE] Hyperscan classifier enabled")
+    return db
+
+
+def _scan_message(message: str) -> Optional[int]:
+    """Bitmask of the _HIT_* patterns found in message, or None when Hyperscan is off"""
+    db = _hyperscan_db()
+    if db is None:
+        return None
+    hits = 0
+    
+    def on_match(match_id, start, end, flags, context):
+        nonlocal hits
+        hits |= match_id
+    
+    db.scan(message.encode(), match_event_handler=on_match)
+    return hits
+
+
+def _hit(hits: Optional[int], flag: int, pattern: "re.Pattern[str]", message: str) -> bool:
+    """Read a pattern result from a Hyperscan bitmask, or search with re if there is none"""
+    if hits is not None:
+        return bool(hits & flag)
+    return pattern.search(message) is not None
@@ -1,68 +1,372 @@
 """
 Filter validation module for enforcing multi-filter requirements and detecting contradictions.
 """
-from typing import Dict, Any, Optional, Tuple, List
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 import re
 
+from app.core.config import get_settings
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None
+
+# Word tokens; a term matches r'\bterm\b' exactly when it is one of these tokens
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _dfa_scanner(flags_by_keyword: Dict[str, int], all_flags: int) -> Callable[[str], int]:
+    """
+    Dependency-free Aho-Corasick: the keyword trie with its failure links folded
+    into a complete DFA, stored as flat array tables indexed by
+    state * n_classes + byte class. Bytes that occur in no keyword share class 0,
+    which keeps the table small; keywords are ASCII, so scanning UTF-8 bytes
+    finds exactly the substring matches of the text.
+    """
+    keywords = [keyword.encode() for keyword in flags_by_keyword]
+    alphabet = sorted({byte for keyword in keywords for byte in keyword})
+    byte_classes = bytearray(256)
+    for index, byte in enumerate(alphabet, 1):
+        byte_classes[byte] = index
+    classes = bytes(byte_classes)
+    n_classes = len(alphabet) + 1
+    
+    # Trie over byte classes
+    children: List[Dict[int, int]] = [{}]
+    output = [0]
+    for keyword, flag in zip(keywords, flags_by_keyword.values()):
+        state = 0
+        for cls in keyword.translate(classes):
+            child = children[state].get(cls)
+            if child is None:
+                child = len(children)
+                children[state][cls] = child
+                children.append({})
+                output.append(0)
+            state = child
+        output[state] |= flag
+    
+    # Breadth-first: every missing transition follows the (shallower, complete) failure state
+    delta = array('i', [0]) * (len(children) * n_classes)
+    fail = [0] * len(children)
+    queue = deque()
+    for cls, child in children[0].items():
+        delta[cls] = child
+        queue.append(child)
+    while queue:
+        state = queue.popleft()
+        output[state] |= output[fail[state]]
+        row, fail_row = state * n_classes, fail[state] * n_classes
+        for cls in range(n_classes):
+            child = children[state].get(cls)
+            if child is None:
+                delta[row + cls] = delta[fail_row + cls]
+            else:
+                delta[row + cls] = child
+                fail[child] = delta[fail_row + cls]
+                queue.append(child)
+    outputs = array('Q', output)
+    
+    def scan_dfa(text: str) -> int:
+        state = found = 0
+        for cls in text.encode().translate(classes):
+            state = delta[state * n_classes + cls]
+            if outputs[state]:
+                found |= outputs[state]
+                if found == all_flags:
+                    break
+        return found
+    
+    return scan_dfa
+
+
+# Every pattern in this module is \w+ or an alternation of escaped literals (no nested
+# quantifiers), so the stdlib engine already runs in time linear in the query. re2 was
+# measured ~10x slower per call on chat-length input (binding overhead) and its \w is
+# ASCII-only, so it is deliberately not used here.
+
+
+def _keyword_flags(groups: Dict[int, Iterable[str]]) -> Dict[str, int]:
+    """Map each keyword to the OR of the flags of the groups containing it"""
+    flags_by_keyword: Dict[str, int] = {}
+    for flag, keywords in groups.items():
+        for keyword in keywords:
+            flags_by_keyword[keyword] = flags_by_keyword.get(keyword, 0) | flag
+    return flags_by_keyword
+
+
+def _keyword_scanner(groups: Dict[int, Iterable[str]]) -> Callable[[str], int]:
+    """
+    Build a scanner returning the OR of the group flags whose keywords occur in
+    the text as substrings, in a single pass over the text. Uses a Hyperscan
+    database when USE_HYPERSCAN is set and the package is installed, then a
+    pyahocorasick automaton, then the pure-Python DFA below.
+    """
+    flags_by_keyword = _keyword_flags(groups)
+    all_flags = 0
+    for flag in groups:
+        all_flags |= flag
+    
+    if hyperscan is not None and get_settings().USE_HYPERSCAN:
+        keywords = list(flags_by_keyword)
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[re.escape(keyword).encode() for keyword in keywords],
+            ids=list(range(len(keywords))),
+            elements=len(keywords),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(keywords),
+        )
+        
+        def scan_hyperscan(text: str) -> int:
+            found = 0
+            
+            def on_match(match_id, start, end, flags, context):
+                nonlocal found
+                found |= flags_by_keyword[keywords[match_id]]
+            
+            db.scan(text.encode(), match_event_handler=on_match)
+            return found
+        
+        return scan_hyperscan
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, flag in flags_by_keyword.items():
+            automaton.add_word(keyword, flag)
+        automaton.make_automaton()
+        
+        def scan_automaton(text: str) -> int:
+            found = 0
+            for _, flag in automaton.iter(text):
+                found |= flag
+                if found == all_flags:
+                    break
+            return found
+        
+        return scan_automaton
+    
+    return _dfa_scanner(flags_by_keyword, all_flags)
+
+
+# Filter weight mappings - determines how much each filter contributes to total
+FILTER_WEIGHTS = {
+    'category': 1.0,
+    'subcategory': 1.0,  # MMA, Boxing, Dumbbells, etc.
+    'product_type': 1.0,  # gloves, bag, bench, etc.
+    'color': 1.0,
+    'material': 1.0,
+    'style': 1.0,
+    'room_type': 0.8,
+    'descriptor': 0.8,  # horizontal, vertical, adjustable, etc.
+    'price_max': 0.5,
+    'age_group': 0.5,
+}
+
+# One bit per filter that can contribute weight, so present filters pack into an int
+_FILTER_BITS = {
+    name: 1 << bit
+    for bit, name in enumerate(('specific_query', 'category', 'product_type', *FILTER_WEIGHTS))
+}
+# Filter names in FILTER_WEIGHTS order (keeps cache keys and weight sums deterministic)
+_FILTER_ORDER = {name: index for index, name in enumerate(FILTER_WEIGHTS)}
+_ATTRIBUTE_MASK = _FILTER_BITS['color'] | _FILTER_BITS['material'] | _FILTER_BITS['style'] | _FILTER_BITS['descriptor']
+_CONTEXT_MASK = _FILTER_BITS['room_type'] | _FILTER_BITS['age_group']
+
+# Subjective terms have lower weight (semantic matching only)
+SUBJECTIVE_TERM_WEIGHT = 0.3
+
+# Minimum total weight required to proceed with search
+# Set to 1.0 - a single clear product type is enough
+MIN_FILTER_WEIGHT = 1.0
+
+# Incompatible filter pairs that create contradictions
+INCOMPATIBLE_PAIRS = [
+    ('cheap', 'luxury'),
+    ('cheap', 'expensive'),
+    ('cheap', 'premium'),
+    ('affordable', 'luxury'),
+    ('budget', 'premium'),
+    ('small', 'large'),
+    ('compact', 'spacious'),
+    ('minimalist', 'ornate'),
+    ('simple', 'ornate'),
+    ('modern', 'classic'),
+    ('modern', 'vintage'),
+    ('contemporary', 'traditional'),
+]
+
+# Words ignored when judging whether a query is specific enough on its own
+STOPWORDS = frozenset({
+    'show', 'me', 'find', 'search', 'for', 'the', 'a', 'an', 'i', 'want',
+    'need', 'looking', 'am', 'get', 'some', 'any', 'please', 'can', 'you',
+    'do', 'have', 'with', 'in', 'on', 'at', 'to', 'of', 'and', 'or'
+})
+
+# Product category keywords (count as 1.0 weight), matched as substrings of the query
+CATEGORY_KEYWORDS = frozenset({
+    # Sports & Fitness - Cardio
+    'fitness', 'gym', 'exercise', 'workout', 'training', 'cardio',
+    'treadmill', 'treadmills', 'exercise bike', 'rowing', 'rower', 'elliptical',
+    # Sports & Fitness - Weights
+    'weightlifting', 'weight lifting', 'weights', 'dumbbell', 'dumbbells',
+    'kettlebell', 'kettlebells', 'barbell', 'barbells', 'weight plates', 'olympic',
+    # Sports & Fitness - Boxing/MMA
+    'mma', 'boxing', 'muay thai', 'kickboxing', 'martial arts', 'karate',
+    'taekwondo', 'judo', 'jiu jitsu', 'bjj', 'sparring', 'punching',
+    # Sports & Fitness - General
+    'trampoline', 'air track', 'gymnastics', 'yoga', 'pilates',
+    'massage', 'relaxation', 'foam roller', 'recovery', 'stretching',
+    'rugby', 'basketball', 'sports',
+    # Pet Products
+    'dog', 'cat', 'pet', 'puppy', 'kitten', 'bird', 'aquarium', 'fish tank',
+    # Electric Scooters  
+    'scooter', 'e-scooter', 'escooter', 'electric scooter',
+    # Furniture - Office/Home
+    'office', 'gaming', 'ergonomic', 'furniture', 'desk', 'chair', 'table',
+    'sofa', 'bed', 'mattress', 'cabinet', 'shelf', 'bookcase',
+    'workstation', 'standing desk', 'sit stand', 'motorised', 'motorized',
+    'living room', 'dining room', 'bathroom', 'bedroom', 'kitchen',
+    # Storage & Organization
+    'storage', 'locker', 'filing', 'cupboard', 'divider', 'pedestal',
+    # Accessories
+    'monitor arm', 'lamp', 'trolley', 'utility', 'accessory', 'accessories'
+})
+
+# Product type keywords (count as 1.0 weight), matched as substrings of the query
+PRODUCT_TYPE_KEYWORDS = frozenset({
+    # Boxing/MMA
+    'gloves', 'bag', 'bags', 'pads', 'shield', 'shields', 'ring', 'rings',
+    'uniform', 'belt', 'helmet', 'guard', 'guards', 'wraps', 'protector',
+    # Gym Equipment
+    'bench', 'benches', 'rack', 'racks', 'mat', 'mats', 'plates', 'sets',
+    'machine', 'machines', 'equipment', 'gear', 'roller', 'ball', 'bands',
+    # Pet Products
+    'kennel', 'kennels', 'cage', 'cages', 'crate', 'tree', 'tower',
+    'bed', 'beds', 'bowl', 'bowls', 'collar', 'leash', 'toy', 'toys',
+    'pump', 'filter', 'litter', 'carrier',
+    # Electric Scooters
+    'scooter', 'scooters', 'wheel', 'wheels', 'battery',
+    # Furniture
+    'chair', 'chairs', 'table', 'tables', 'desk', 'desks', 'sofa', 'sofas',
+    'cabinet', 'cabinets', 'shelf', 'shelves', 'stool', 'stools',
+    'ottoman', 'recliner', 'bookcase', 'bookcases',
+    # Additional furniture types from catalog
+    'locker', 'lockers', 'bar stool', 'bar stools', 'filing cabinet',
+    'cupboard', 'cupboards', 'divider', 'dividers', 'pedestal', 'pedestals',
+    'monitor arm', 'lamp', 'lamps', 'trolley', 'trolleys', 'frame', 'frames',
+    # Descriptive product terms
+    'standing', 'adjustable', 'electric', 'motorised', 'motorized',
+    'executive', 'mesh', 'leather', 'corner', 'l-shape', 'l shape'
+})
+
+# Subjective terms, matched as whole words
+SUBJECTIVE_TERMS = frozenset({
+    'cheap', 'affordable', 'budget', 'expensive', 'premium', 'luxury',
+    'small', 'compact', 'large', 'spacious', 'tiny', 'huge',
+    'cozy', 'comfortable', 'sturdy', 'elegant', 'stylish',
+    'horizontal', 'vertical', 'adjustable', 'stackable', 'foldable',
+    # Sports/fitness specific
+    'leather', 'padded', 'heavy', 'light', 'professional', 'training', 'sparring'
+})
+
+# Every term in INCOMPATIBLE_PAIRS, matched as whole words
+_CONTRADICTION_TERMS = frozenset(term for pair in INCOMPATIBLE_PAIRS for term in pair)
+
+# Bypass phrases that allow user to skip clarification
+BYPASS_PHRASES = [
+    'show me anything',
+    'just search',
+    'you choose',
+    'surprise me',
+    'whatever',
+    "don't care",
+    'any will do',
+    'any is fine',
+    'anything',
+    'just show me',
+]
+
+# Whole-message bypasses: any phrase on its own plus short affirmatives during clarification
+_EXACT_BYPASS = frozenset(BYPASS_PHRASES) | {'ok', 'okay', 'yes', 'sure', 'fine', 'go ahead'}
+# Substring scan: a phrase containing a shorter phrase ("show me anything") can never add a match
+_BYPASS_RE = re.compile('|'.join(
+    re.escape(phrase) for phrase in BYPASS_PHRASES
+    if not any(other != phrase and other in phrase for other in BYPASS_PHRASES)
+))
+_MIN_BYPASS_LEN = min(map(len, BYPASS_PHRASES))
+
+# get_filter_summary: (entity key, display template) in display order
+_SUMMARY_TEMPLATES = (
+    ('category', '{}'),
+    ('color', '{} color'),
+    ('material', '{} material'),
+    ('style', '{} style'),
+    ('room_type', 'for {}'),
+    ('age_group', 'for {}'),
+    ('price_max', 'under ${}'),
+)
+
+
+# Keyword group flags for category / product-type detection
+_KEYWORD_CATEGORY, _KEYWORD_PRODUCT_TYPE = 1, 2
+_ALL_KEYWORD_GROUPS = _KEYWORD_CATEGORY | _KEYWORD_PRODUCT_TYPE
+_KEYWORD_GROUPS = {
+    _KEYWORD_CATEGORY: CATEGORY_KEYWORDS,
+    _KEYWORD_PRODUCT_TYPE: PRODUCT_TYPE_KEYWORDS,
+}
+# Whole-word keyword -> group flags, so one lookup per token covers both groups
+_TOKEN_KEYWORD_FLAGS = _keyword_flags(_KEYWORD_GROUPS)
+_scan_keywords = _keyword_scanner(_KEYWORD_GROUPS)
+
 
 class FilterValidator:
     """Validates filter combinations and enforces minimum filter requirements."""
     
-    # Filter weight mappings - determines how much each filter contributes to total
-    FILTER_WEIGHTS = {
-        'category': 1.0,
-        'subcategory': 1.0,  # MMA, Boxing, Dumbbells, etc.
-        'product_type': 1.0,  # gloves, bag, bench, etc.
-        'color': 1.0,
-        'material': 1.0,
-        'style': 1.0,
-        'room_type': 0.8,
-        'descriptor': 0.8,  # horizontal, vertical, adjustable, etc.
-        'price_max': 0.5,
-        'age_group': 0.5,
-    }
-    
-    # Subjective terms have lower weight (semantic matching only)
-    SUBJECTIVE_TERM_WEIGHT = 0.3
-    
-    # Minimum total weight required to proceed with search
-    # Set to 1.0 - a single clear product type is enough
-    MIN_FILTER_WEIGHT = 1.0
-    
-    # Incompatible filter pairs that create contradictions
-    INCOMPATIBLE_PAIRS = [
-        ('cheap', 'luxury'),
-        ('cheap', 'expensive'),
-        ('cheap', 'premium'),
-        ('affordable', 'luxury'),
-        ('budget', 'premium'),
-        ('small', 'large'),
-        ('compact', 'spacious'),
-        ('minimalist', 'ornate'),
-        ('simple', 'ornate'),
-        ('modern', 'classic'),
-        ('modern', 'vintage'),
-        ('contemporary', 'traditional'),
-    ]
-    
-    # Bypass phrases that allow user to skip clarification
-    BYPASS_PHRASES = [
-        'show me anything',
-        'just search',
-        'you choose',
-        'surprise me',
-        'whatever',
-        "don't care",
-        'any will do',
-        'any is fine',
-        'anything',
-        'just show me',
-    ]
+    # Tuning tables live at module level (plain global reads on the hot path);
+    # re-exported here as part of the validator's public interface
+    FILTER_WEIGHTS = FILTER_WEIGHTS
+    SUBJECTIVE_TERM_WEIGHT = SUBJECTIVE_TERM_WEIGHT
+    MIN_FILTER_WEIGHT = MIN_FILTER_WEIGHT
+    INCOMPATIBLE_PAIRS = INCOMPATIBLE_PAIRS
+    STOPWORDS = STOPWORDS
+    CATEGORY_KEYWORDS = CATEGORY_KEYWORDS
+    PRODUCT_TYPE_KEYWORDS = PRODUCT_TYPE_KEYWORDS
+    SUBJECTIVE_TERMS = SUBJECTIVE_TERMS
+    BYPASS_PHRASES = BYPASS_PHRASES
     
     def __init__(self):
         """Initialize the filter validator."""
         pass
     
+    def validate_all(
+        self,
+        entities: Dict[str, Any],
+        query: str = ""
+    ) -> Tuple[Tuple[bool, float, str], Optional[Tuple[str, str, str]]]:
+        """
+        Run the filter-count and contradiction checks together, lowering the query once.
+        
+        Args:
+            entities: Extracted entities dictionary
+            query: Original user query
+            
+        Returns:
+            Tuple of (validate_filter_count result, detect_contradictions result)
+        """
+        query_lower = query.lower() if query else ""
+        return (
+            self._validate_filter_count_lowered(entities, query_lower),
+            self._detect_contradictions_lowered(entities, query_lower),
+        )
+    
     def validate_filter_count(
         self, 
         entities: Dict[str, Any],
@@ -81,112 +385,33 @@ class FilterValidator:
             - total_weight: Calculated weight score
             - message: Helpful message indicating what's needed
         """
-        total_weight = 0.0
-        present_filters = []
-        
-        # Special case: Check for CLEAR product queries that don't need clarification
-        # Examples: "mma gloves", "boxing bag", "dog kennel", "electric scooter"
-        query_lower = query.lower() if query else ""
-        
-        # Check for specific product name queries (3+ content words = specific enough)
-        # Remove common stopwords and check remaining word count
-        stopwords = {'show', 'me', 'find', 'search', 'for', 'the', 'a', 'an', 'i', 'want', 
-                     'need', 'looking', 'am', 'get', 'some', 'any', 'please', 'can', 'you',
-                     'do', 'have', 'with', 'in', 'on', 'at', 'to', 'of', 'and', 'or'}
-        query_words = [w for w in query_lower.split() if w not in stopwords and len(w) > 1]
-        if len(query_words) >= 3:
-            # Specific enough query like "three tiers utility trolley" or "standing desk motorised"
-            total_weight += 1.5
-            present_filters.append('specific_query')
-        
-        # Product category keywords (count as 1.0 weight each)
-        category_keywords = [
-            # Sports & Fitness - Cardio
-            'fitness', 'gym', 'exercise', 'workout', 'training', 'cardio',
-            'treadmill', 'treadmills', 'exercise bike', 'rowing', 'rower', 'elliptical',
-            # Sports & Fitness - Weights
-            'weightlifting', 'weight lifting', 'weights', 'dumbbell', 'dumbbells',
-            'kettlebell', 'kettlebells', 'barbell', 'barbells', 'weight plates', 'olympic',
-            # Sports & Fitness - Boxing/MMA
-            'mma', 'boxing', 'muay thai', 'kickboxing', 'martial arts', 'karate',
-            'taekwondo', 'judo', 'jiu jitsu', 'bjj', 'sparring', 'punching',
-            # Sports & Fitness - General
-            'trampoline', 'air track', 'gymnastics', 'yoga', 'pilates',
-            'massage', 'relaxation', 'foam roller', 'recovery', 'stretching',
-            'rugby', 'basketball', 'sports',
-            # Pet Products
-            'dog', 'cat', 'pet', 'puppy', 'kitten', 'bird', 'aquarium', 'fish tank',
-            # Electric Scooters  
-            'scooter', 'e-scooter', 'escooter', 'electric scooter',
-            # Furniture - Office/Home
-            'office', 'gaming', 'ergonomic', 'furniture', 'desk', 'chair', 'table',
-            'sofa', 'bed', 'mattress', 'cabinet', 'shelf', 'bookcase',
-            'workstation', 'standing desk', 'sit stand', 'motorised', 'motorized',
-            'living room', 'dining room', 'bathroom', 'bedroom', 'kitchen',
-            # Storage & Organization
-            'storage', 'locker', 'filing', 'cupboard', 'divider', 'pedestal',
-            # Accessories
-            'monitor arm', 'lamp', 'trolley', 'utility', 'accessory', 'accessories'
-        ]
-        
-        # Product type keywords (count as 1.0 weight each)
-        product_type_keywords = [
-            # Boxing/MMA
-            'gloves', 'bag', 'bags', 'pads', 'shield', 'shields', 'ring', 'rings',
-            'uniform', 'belt', 'helmet', 'guard', 'guards', 'wraps', 'protector',
-            # Gym Equipment
-            'bench', 'benches', 'rack', 'racks', 'mat', 'mats', 'plates', 'sets',
-            'machine', 'machines', 'equipment', 'gear', 'roller', 'ball', 'bands',
-            # Pet Products
-            'kennel', 'kennels', 'cage', 'cages', 'crate', 'tree', 'tower',
-            'bed', 'beds', 'bowl', 'bowls', 'collar', 'leash', 'toy', 'toys',
-            'pump', 'filter', 'litter', 'carrier',
-            # Electric Scooters
-            'scooter', 'scooters', 'wheel', 'wheels', 'battery',
-            # Furniture
-            'chair', 'chairs', 'table', 'tables', 'desk', 'desks', 'sofa', 'sofas',
-            'cabinet', 'cabinets', 'shelf', 'shelves', 'stool', 'stools',
-            'ottoman', 'recliner', 'bookcase', 'bookcases',
-            # Additional furniture types from catalog
-            'locker', 'lockers', 'bar stool', 'bar stools', 'filing cabinet',
-            'cupboard', 'cupboards', 'divider', 'dividers', 'pedestal', 'pedestals',
-            'monitor arm', 'lamp', 'lamps', 'trolley', 'trolleys', 'frame', 'frames',
-            # Descriptive product terms
-            'standing', 'adjustable', 'electric', 'motorised', 'motorized',
-            'executive', 'mesh', 'leather', 'corner', 'l-shape', 'l shape'
-        ]
-        
-        # Check for category keywords
-        has_category = any(keyword in query_lower for keyword in category_keywords)
-        if has_category:
-            total_weight += 1.0
-            present_filters.append('category')
-        
-        # Check for product type keywords
-        has_product_type = any(keyword in query_lower for keyword in product_type_keywords)
-        if has_product_type:
-            total_weight += 1.0
-            present_filters.append('product_type')
-        
-        # Calculate weight from structured entities
-        for filter_name, weight in self.FILTER_WEIGHTS.items():
-            if entities.get(filter_name):
-                total_weight += weight
-                present_filters.append(filter_name)
-        
-        # Add weight for subjective terms in query
-        subjective_count = self._count_subjective_terms(query)
-        total_weight += subjective_count * self.SUBJECTIVE_TERM_WEIGHT
+        return self._validate_filter_count_lowered(entities, query.lower() if query else "")
+    
+    def _validate_filter_count_lowered(self, entities: Dict[str, Any], query_lower: str) -> Tuple[bool, float, str]:
+        """validate_filter_count for an already-lowercased query"""
+        # Only the query text and which structured filters are set affect the score
+        present = _FILTER_ORDER.keys() & entities.keys()
+        entity_filters = tuple(sorted(
+            (name for name in present if entities[name]), key=_FILTER_ORDER.__getitem__
+        ))
+        
+        # Structured entities alone are often enough (NLU found a category); the
+        # query scans could only add weight, so skip them
+        entity_weight = sum(FILTER_WEIGHTS[name] for name in entity_filters)
+        if entity_weight >= MIN_FILTER_WEIGHT:
+            return True, entity_weight, f"Sufficient filters provided (weight: {entity_weight:.1f})"
+        
+        total_weight, filter_mask = _score_filters(query_lower, entity_filters)
         
         # Check if minimum threshold met
-        is_valid = total_weight >= self.MIN_FILTER_WEIGHT
+        is_valid = total_weight >= MIN_FILTER_WEIGHT
         
         # Generate helpful message
         if is_valid:
             message = f"Sufficient filters provided (weight: {total_weight:.1f})"
         else:
-            needed_weight = self.MIN_FILTER_WEIGHT - total_weight
-            message = self._generate_filter_suggestion(present_filters, needed_weight)
+            needed_weight = MIN_FILTER_WEIGHT - total_weight
+            message = _filter_suggestion(filter_mask, needed_weight >= 0.5)
         
         return is_valid, total_weight, message
     
@@ -195,57 +420,11 @@ class FilterValidator:
         if not query:
             return 0
         
-        query_lower = query.lower()
-        subjective_terms = [
-            'cheap', 'affordable', 'budget', 'expensive', 'premium', 'luxury',
-            'small', 'compact', 'large', 'spacious', 'tiny', 'huge',
-            'cozy', 'comfortable', 'sturdy', 'elegant', 'stylish',
-            'horizontal', 'vertical', 'adjustable', 'stackable', 'foldable',
-            # Sports/fitness specific
-            'leather', 'padded', 'heavy', 'light', 'professional', 'training', 'sparring'
-        ]
-        
-        count = 0
-        for term in subjective_terms:
-            if re.search(r'\b' + term + r'\b', query_lower):
-                count += 1
+        # Distinct terms only: "cheap cheap" counts once
+        count = len(SUBJECTIVE_TERMS.intersection(_TOKEN_RE.findall(query.lower())))
         
         return min(count, 3)  # Cap at 3 to avoid over-counting
     
-    def _generate_filter_suggestion(
-        self, 
-        present_filters: List[str],
-        needed_weight: float
-    ) -> str:
-        """Generate a helpful suggestion for what filters are needed."""
-        if not present_filters:
-            return "Is there anything specific you have in mind? (For example: size, color, material, price range, or any other preference)"
-        
-        # Determine what type of filter is present
-        has_category = 'category' in present_filters
-        has_attribute = any(f in present_filters for f in ['color', 'material', 'style', 'descriptor'])
-        has_context = any(f in present_filters for f in ['room_type', 'age_group'])
-        has_price = 'price_max' in present_filters
-        
-        suggestions = []
-        
-        if has_category and not has_attribute:
-            suggestions.append("color, material, or style")
-        elif has_attribute and not has_category:
-            suggestions.append("furniture type (chair, table, desk, etc.)")
-        
-        if not has_context:
-            suggestions.append("room or purpose (office, bedroom, for kids, gym, school, etc.)")
-        
-        if not has_price and needed_weight >= 0.5:
-            suggestions.append("price range")
-        
-        if suggestions:
-            suggestion_text = ", ".join(suggestions[:2])  # Limit to 2 suggestions
-            return f"Is there anything specific you have in mind? (For example: {suggestion_text}, or any other preference)"
-        
-        return "Can you please tell me more about what you want?"
-    
     def detect_contradictions(
         self, 
         entities: Dict[str, Any],
@@ -261,22 +440,26 @@ class FilterValidator:
         Returns:
             Tuple of (term1, term2, clarification_message) if contradiction found, else None
         """
+        return self._detect_contradictions_lowered(entities, query.lower())
+    
+    def _detect_contradictions_lowered(
+        self,
+        entities: Dict[str, Any],
+        query_lower: str
+    ) -> Optional[Tuple[str, str, str]]:
+        """detect_contradictions for an already-lowercased query"""
         # Combine all filter values and query into searchable text
-        search_text = query.lower()
-        for key, value in entities.items():
-            if value and isinstance(value, str):
-                search_text += f" {value.lower()}"
+        parts = [query_lower]
+        parts.extend(value.lower() for value in entities.values() if value and isinstance(value, str))
+        search_text = " ".join(parts)
         
-        # Check for incompatible pairs
-        for term1, term2 in self.INCOMPATIBLE_PAIRS:
-            has_term1 = re.search(r'\b' + term1 + r'\b', search_text)
-            has_term2 = re.search(r'\b' + term2 + r'\b', search_text)
-            
-            if has_term1 and has_term2:
-                message = self._generate_contradiction_message(term1, term2)
-                return (term1, term2, message)
+        pair = _find_contradiction(search_text)
+        if pair is None:
+            return None
         
-        return None
+        term1, term2 = pair
+        message = self._generate_contradiction_message(term1, term2)
+        return (term1, term2, message)
     
     def _generate_contradiction_message(self, term1: str, term2: str) -> str:
         """Generate a clarification message for contradictory terms."""
@@ -306,19 +489,7 @@ class FilterValidator:
         Returns:
             True if message contains bypass phrase
         """
-        message_lower = message.lower().strip()
-        
-        # Check exact matches
-        for phrase in self.BYPASS_PHRASES:
-            if phrase in message_lower:
-                return True
-        
-        # Check very short affirmative responses during clarification
-        short_responses = ['ok', 'okay', 'yes', 'sure', 'fine', 'go ahead']
-        if message_lower in short_responses:
-            return True
-        
-        return False
+        return _is_bypass(message.lower().strip())
     
     def get_filter_summary(self, entities: Dict[str, Any]) -> str:
         """
@@ -330,30 +501,119 @@ class FilterValidator:
         Returns:
             String summary of filters
         """
-        filters = []
-        
-        if entities.get('category'):
-            filters.append(entities['category'])
-        
-        if entities.get('color'):
-            filters.append(f"{entities['color']} color")
-        
-        if entities.get('material'):
-            filters.append(f"{entities['material']} material")
-        
-        if entities.get('style'):
-            filters.append(f"{entities['style']} style")
-        
-        if entities.get('room_type'):
-            filters.append(f"for {entities['room_type']}")
-        
-        if entities.get('age_group'):
-            filters.append(f"for {entities['age_group']}")
-        
-        if entities.get('price_max'):
-            filters.append(f"under ${entities['price_max']}")
-        
-        if not filters:
-            return "no specific filters"
-        
-        return ", ".join(filters)
+        filters = [template.format(entities[key]) for key, template in _SUMMARY_TEMPLATES if entities.get(key)]
+        return ", ".join(filters) if filters else "no specific filters"
+
+
+# Cached cores of the validator checks. Chat turns repeat short queries a lot (a
+# clarification reply often echoes the previous query), so repeats skip the scans;
+# the user-facing messages are cheap and built outside the cache.
+
+@lru_cache(maxsize=2048)
+def _score_filters(query_lower: str, entity_filters: Tuple[str, ...]) -> Tuple[float, int]:
+    """Total filter weight and a _FILTER_BITS mask of the filters that contributed"""
+    bits = _FILTER_BITS
+    total_weight = 0.0
+    filter_mask = 0
+    
+    # Tokenize once for the keyword checks below
+    tokens = set(_TOKEN_RE.findall(query_lower))
+    
+    # Special case: Check for CLEAR product queries that don't need clarification
+    # Examples: "mma gloves", "boxing bag", "dog kennel", "electric scooter"
+    # Check for specific product name queries (3+ content words = specific enough)
+    # Remove common stopwords and check remaining word count
+    query_words = [w for w in query_lower.split() if w not in STOPWORDS and len(w) > 1]
+    if len(query_words) >= 3:
+        # Specific enough query like "three tiers utility trolley" or "standing desk motorised"
+        total_weight += 1.5
+        filter_mask |= bits['specific_query']
+    
+    # Category / product type keywords: whole-word hits first, then one substring
+    # pass for phrases, plurals and compounds ("exercise bike", "dogs", "armchair")
+    found = 0
+    for token in tokens:
+        found |= _TOKEN_KEYWORD_FLAGS.get(token, 0)
+    if found != _ALL_KEYWORD_GROUPS:
+        found |= _scan_keywords(query_lower)
+    
+    if found & _KEYWORD_CATEGORY:
+        total_weight += 1.0
+        filter_mask |= bits['category']
+    
+    # Check for product type keywords
+    if found & _KEYWORD_PRODUCT_TYPE:
+        total_weight += 1.0
+        filter_mask |= bits['product_type']
+    
+    # Calculate weight from structured entities
+    for filter_name in entity_filters:
+        total_weight += FILTER_WEIGHTS[filter_name]
+        filter_mask |= bits[filter_name]
+    
+    # Add weight for subjective terms in query
+    subjective_count = min(len(SUBJECTIVE_TERMS.intersection(tokens)), 3)
+    total_weight += subjective_count * SUBJECTIVE_TERM_WEIGHT
+    
+    return total_weight, filter_mask
+
+
+@lru_cache(maxsize=2048)
+def _find_contradiction(search_text: str) -> Optional[Tuple[str, str]]:
+    """First INCOMPATIBLE_PAIRS pair with both terms in the text, if any"""
+    # Collect the pair terms present in one pass, then check pairs in priority order
+    found = _CONTRADICTION_TERMS.intersection(_TOKEN_RE.findall(search_text))
+    if len(found) < 2:
+        return None
+    
+    for term1, term2 in INCOMPATIBLE_PAIRS:
+        if term1 in found and term2 in found:
+            return term1, term2
+    
+    return None
+
+
+@lru_cache(maxsize=2048)
+def _is_bypass(message_lower: str) -> bool:
+    """Whether a normalized message asks to skip clarification"""
+    # Most clarification replies are one of the exact phrases ("ok", "anything")
+    if message_lower in _EXACT_BYPASS:
+        return True
+    
+    # Too short to contain any bypass phrase
+    if len(message_lower) < _MIN_BYPASS_LEN:
+        return False
+    
+    return _BYPASS_RE.search(message_lower) is not None
+
+
+@lru_cache(maxsize=64)
+def _filter_suggestion(filter_mask: int, needs_price: bool) -> str:
+    """Generate a helpful suggestion for what filters are needed (filter_mask: OR of _FILTER_BITS)"""
+    if not filter_mask:
+        return "Is there anything specific you have in mind? (For example: size, color, material, price range, or any other preference)"
+    
+    # Determine what type of filter is present
+    has_category = filter_mask & _FILTER_BITS['category']
+    has_attribute = filter_mask & _ATTRIBUTE_MASK
+    has_context = filter_mask & _CONTEXT_MASK
+    has_price = filter_mask & _FILTER_BITS['price_max']
+    
+    suggestions = []
+    
+    if has_category and not has_attribute:
+        suggestions.append("color, material, or style")
+    elif has_attribute and not has_category:
+        suggestions.append("furniture type (chair, table, desk, etc.)")
+    
+    if not has_context:
+        suggestions.append("room or purpose (office, bedroom, for kids, gym, school, etc.)")
+    
+    if not has_price and needs_price:
+        suggestions.append("price range")
+    
+    if suggestions:
+        suggestion_text = ", ".join(suggestions[:2])  # Limit to 2 suggestions
+        return f"Is there anything specific you have in mind? (For example: {suggestion_text}, or any other preference)"
+    
+    return "Can you please tell me more about what you want?"
@@ -2,15 +2,18 @@
 LangChain-based Easymart Assistant Handler
 """
 
+import asyncio
+import logging
 import time
 import re
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Union
 
 from pydantic import BaseModel
 import json
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage
 
 from app.core.config import get_settings
 from app.core.analytics import get_analytics
@@ -21,9 +24,146 @@ from app.modules.assistant.intents import IntentType
 from app.modules.assistant.session_store import SessionStore, get_session_store
 from app.modules.assistant.filter_validator import FilterValidator
 from app.modules.assistant.prompts import get_system_prompt, get_greeting_message
-from app.modules.assistant.tools import get_langchain_tools, CURRENT_SESSION_ID, get_assistant_tools
+from app.modules.assistant.tools import get_langchain_tools, CURRENT_SESSION_ID, get_assistant_tools, base_product_name
 from app.modules.assistant.bundle_planner import parse_bundle_request
 from app.modules.assistant.intelligent_context import get_intelligent_context_handler
+from app.modules.assistant.response_cache import get_response_cache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Tools that write session state (shown products, cart, bundle metadata); a round
+# containing any of these runs its calls one at a time so the last write wins as before
+SESSION_WRITING_TOOLS = frozenset({
+    "search_products",
+    "update_cart",
+    "find_similar_products",
+    "build_bundle",
+    "build_cheapest_bundle",
+})
+
+# Tools whose repeated identical calls are not no-ops (each call changes the cart again)
+NON_IDEMPOTENT_TOOLS = frozenset({"update_cart"})
+
+# Intents whose opening-turn answer depends only on the message (no cart or reference state)
+CACHEABLE_INTENTS = frozenset({
+    IntentType.PRODUCT_SEARCH.value,
+    IntentType.RETURN_POLICY.value,
+    IntentType.SHIPPING_INFO.value,
+    IntentType.PAYMENT_OPTIONS.value,
+    IntentType.WARRANTY_INFO.value,
+    IntentType.PROMOTIONS.value,
+    IntentType.CONTACT_INFO.value,
+    IntentType.STORE_HOURS.value,
+    IntentType.STORE_LOCATION.value,
+})
+
+# Session metadata the turn's tools write (search_products, build_bundle); cached with the reply
+_CACHED_SESSION_KEYS = ("last_search_filters", "last_bundle_request", "last_bundle_items", "last_bundle_total")
+
+
+# Product fields only the UI uses (cards render images and links; the prompt forbids them in text)
+_UI_ONLY_PRODUCT_FIELDS = frozenset({
+    "image_url",
+    "images",
+    "product_url",
+    "handle",
+    "barcode",
+    "score",
+    "inventory_managed",
+    "status",
+})
+
+
+def _prompt_view(result):
+    """Tool result as the model sees it: product dicts without UI-only fields"""
+    if not isinstance(result, dict) or not isinstance(result.get("products"), list):
+        return result
+    products = [
+        {k: v for k, v in p.items() if k not in _UI_ONLY_PRODUCT_FIELDS} if isinstance(p, dict) else p
+        for p in result["products"]
+    ]
+    return {**result, "products": products}
+
+
+def _dump_tool_result(result) -> str:
+    """Tool result as compact JSON for the LLM: orjson when installed, stdlib otherwise"""
+    result = _prompt_view(result)
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False)
+
+
+def _phrase_re(phrases) -> "re.Pattern[str]":
+    """One precompiled alternation answering 'does the text contain any of these phrases'"""
+    return re.compile("|".join(map(re.escape, phrases)))
+
+
+# Phrase checks run on every message: one scan each instead of a substring loop per phrase
+_MORE_OPTIONS_RE = _phrase_re([
+    "more option", "more options", "other option", "other options",
+    "different option", "different options", "more choices", "another option",
+    "another one", "show more", "more like this"
+])
+_SMALL_SPACE_RE = _phrase_re(["small space", "limited space", "tight space", "small room", "compact space"])
+_TABLE_WORD_RE = _phrase_re(["table", "desk"])
+_BUDGET_RE = _phrase_re(["under", "budget", "max", "maximum"])
+_ITEM_WORD_RE = _phrase_re(["chair", "table", "desk", "sofa", "bed"])
+_ADD_BUNDLE_RE = _phrase_re([
+    "add this bundle to cart",
+    "add bundle to cart",
+    "add the bundle to cart",
+    "add this bundle",
+    "add the bundle",
+    "add bundle",
+    "add all to cart",
+    "add all items",
+    # Handle common typos
+    "add this bundell",
+    "add this bundel",
+    "add the bundell",
+    "add the bundel",
+    "add bundell",
+    "add bundel",
+])
+_YES_RE = _phrase_re(["yes", "yep", "yeah", "confirm", "ok", "okay", "please do", "go ahead"])
+_NO_REPLIES = frozenset(["no", "nope", "don't", "do not", "cancel", "stop"])
+# Entities that make a search specific enough to show results without a clarifying question
+_SPECIFIC_SEARCH_ENTITIES = ("color", "material", "style", "price_max", "size", "descriptor")
+_SHOW_RESULTS_RE = _phrase_re(["show me", "just show", "show options", "see options", "show all"])
+
+_SPACE_DIMENSIONS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:cm)?\s*(?:x|by)\s*(\d+(?:\.\d+)?)\s*cm')
+
+# Product references like "option 1", "first one", "add 2 and 3" (in priority order)
+_PRODUCT_REFERENCE_PATTERNS = tuple(
+    (re.compile(pattern, re.IGNORECASE), ref_type)
+    for pattern, ref_type in [
+        # "option 1", "item 2", "product 3"
+        (r'\b(?:option|choice|item|product|number)\s+(\d+)', 'index'),
+        # "first one", "second chair"
+        (r'\b(first|second|third|fourth|fifth)\s+(?:one|option|choice|item|chair|table|desk|product)?', 'index'),
+        # "1st one", "2nd option"
+        (r'\b(1st|2nd|3rd|4th|5th)\s+(?:one|option|choice|item|chair|table|desk|product)?', 'index'),
+        # "the 2nd one"
+        (r'\b(?:the\s+)?(\d+)(?:st|nd|rd|th)\s+(?:one|option|chair|table|desk|product)?', 'index'),
+        # Standalone numbers in cart/add context: "add 2 and 3", "2 and 3 to cart"
+        # Match numbers that appear to be product references (not prices or quantities)
+        (r'\badd\s+(\d+)\b(?!\s*(?:to|x|items?|of))', 'index'),
+        (r'\b(\d+)\s+(?:and|,)\s*(\d+)\s+(?:option|to\s+cart|to\s+my\s+cart)', 'multi_index'),
+        # "2 option" (number before option)
+        (r'\b(\d+)\s+option', 'index'),
+    ]
+)
+
+_BUNDLE_REFINE_RE = _phrase_re([
+    "make it", "prefer", "instead", "change to", "switch to",
+    "in red", "in blue", "in black", "in white", "red", "blue", "black", "white",
+    "more options", "another bundle", "different bundle", "new bundle"
+])
 
 
 class AssistantRequest(BaseModel):
@@ -49,41 +189,85 @@ class EasymartAssistantHandler:
         self.filter_validator = FilterValidator()
         self.tools = get_langchain_tools()
         self.system_prompt = get_system_prompt()
+        # Built once: message models are never mutated after construction, so turns can share it
+        self._system_message = SystemMessage(content=self.system_prompt)
         self.intelligent_context = get_intelligent_context_handler()
+        self.response_cache = get_response_cache()
+        # Validated once; get_greeting copies it with the caller's session_id and fresh containers
+        self._greeting_template = AssistantResponse(
+            message=get_greeting_message(),
+            session_id="",
+            metadata={"type": "greeting"}
+        )
+
+        if self.settings.VLLM_BASE_URL:
+            # Self-hosted vLLM/TGI: continuous batching across sessions, and prefix caching
+            # reuses the shared system prompt's KV cache because it always leads the messages
+            self._llm_api_key = self.settings.VLLM_API_KEY
+            model = self.settings.VLLM_MODEL
+            base_url = self.settings.VLLM_BASE_URL
+        else:
+            self._llm_api_key = self.settings.OPENAI_API_KEY
+            model = self.settings.OPENAI_MODEL or self.settings.LLM_MODEL
+            base_url = self.settings.OPENAI_BASE_URL
 
         self.llm = ChatOpenAI(
-            api_key=self.settings.OPENAI_API_KEY,
-            model=self.settings.OPENAI_MODEL or self.settings.LLM_MODEL,
-            base_url=self.settings.OPENAI_BASE_URL,
+            api_key=self._llm_api_key,
+            model=model,
+            base_url=base_url,
             temperature=self.settings.LLM_TEMPERATURE,
             timeout=self.settings.OPENAI_TIMEOUT,
             max_tokens=self.settings.LLM_MAX_TOKENS,
         )
         self.tool_llm = self.llm.bind_tools(self.tools)
         self.tool_map = {tool.name: tool for tool in self.tools}
-
-    async def handle_message(self, request: AssistantRequest) -> AssistantResponse:
+        # Bounds concurrent LLM round-trips across all conversations on this worker
+        self._llm_semaphore = asyncio.Semaphore(max(1, self.settings.ASSISTANT_MAX_CONCURRENCY))
+
+    async def handle_message(
+        self,
+        request: AssistantRequest,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> AssistantResponse:
         analytics = get_analytics()
         error_recovery = get_error_recovery()
 
         start_time = time.time()
-        session = self.session_store.get_or_create_session(
-            session_id=request.session_id,
-            user_id=request.user_id
-        )
+        session = await self._get_session(request.session_id, request.user_id)
+        # Rewrites (context recovery, references, clarifications) stay local; the request is left as received
+        user_message = request.message
 
-        if self._is_bundle_confirm_message(request.message):
+        # Bare greetings are the most common opener: answer with the welcome message, no LLM call
+        if self.settings.GREETING_FAST_PATH and self.intent_detector.is_bare_greeting(user_message):
+            # A greeting starts over: drop any unanswered clarification so the next turn isn't read as its answer
+            session.clear_pending_clarification()
+            session.add_message("user", user_message)
+            session.add_message("assistant", self._greeting_template.message)
+            return self._greeting_template.model_copy(update={
+                "session_id": session.session_id,
+                "products": [],
+                "actions": [],
+                "cart_summary": self._build_cart_summary(session),
+                "metadata": {
+                    "intent": IntentType.GREETING.value,
+                    "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "function_calls_made": 0
+                }
+            })
+
+        if self._is_bundle_confirm_message(user_message):
             response = await self._handle_bundle_confirmation(session)
             if response:
                 return response
 
-        if self._is_add_bundle_request(request.message):
+        if self._is_add_bundle_request(user_message):
             bundle_total = session.metadata.get("last_bundle_total")
             if bundle_total and bundle_total >= self.settings.BUNDLE_CONFIRM_THRESHOLD:
                 session.set_pending_clarification(
                     vague_type="bundle_confirm",
                     partial_entities={"total": bundle_total},
-                    original_query=request.message
+                    original_query=user_message
                 )
                 response_text = f"This bundle totals about ${bundle_total:.2f}. Would you like me to add it to your cart?"
                 session.add_message("assistant", response_text)
@@ -99,34 +283,26 @@ class EasymartAssistantHandler:
             if response:
                 return response
 
-        self._maybe_apply_bundle_context(session, request)
-        self._update_shopping_brief(session, request.message)
+        user_message = self._maybe_apply_bundle_context(session, user_message)
+        self._update_shopping_brief(session, user_message)
         
         # INTELLIGENT CONTEXT RECOVERY: Use LLM to understand if this is a follow-up query
-        request.message = await self._intelligent_context_recovery(session, request.message)
+        user_message = await self._intelligent_context_recovery(session, user_message)
         
         # RESOLVE PRODUCT REFERENCES (option 1, first one, etc.)
-        resolved_message = self._resolve_product_references(session, request.message)
-        if resolved_message != request.message:
-            request.message = resolved_message
+        user_message = self._resolve_product_references(session, user_message)
 
         last_bundle = session.metadata.get("last_bundle_request")
         if last_bundle:
-            message_lower = request.message.lower().strip()
-            refinement_phrases = [
-                "more option", "more options", "other option", "other options",
-                "different option", "different options", "more choices", "another option",
-                "another one", "show more", "more like this"
-            ]
-            if any(phrase in message_lower for phrase in refinement_phrases):
-                request.message = f"{last_bundle.get('request', '')} {request.message}"
+            if _MORE_OPTIONS_RE.search(user_message.lower()):
+                user_message = f"{last_bundle.get('request', '')} {user_message}"
 
         # Space-aware clarification
-        if self._needs_space_dimensions(request.message):
+        if self._needs_space_dimensions(user_message):
             session.set_pending_clarification(
                 vague_type="space_required",
-                partial_entities={"original_query": request.message},
-                original_query=request.message
+                partial_entities={"original_query": user_message},
+                original_query=user_message
             )
             response_text = "What is the available space? Please share length and width in cm (e.g., 120 x 60 cm)."
             session.add_message("assistant", response_text)
@@ -139,12 +315,12 @@ class EasymartAssistantHandler:
             )
 
         # Vague query handling
-        vague = self.intent_detector.detect_vague_patterns(request.message)
+        vague = self.intent_detector.detect_vague_patterns(user_message)
         if vague:
             session.set_pending_clarification(
                 vague_type=vague["vague_type"],
                 partial_entities=vague.get("partial_entities", {}),
-                original_query=request.message
+                original_query=user_message
             )
             response_text = (
                 "I can help with furniture, fitness gear, scooters, and pet products. "
@@ -163,9 +339,9 @@ class EasymartAssistantHandler:
         pending = session.get_pending_clarification()
         if pending:
             if pending.get("vague_type") == "space_required":
-                dims = self._extract_space_dimensions(request.message)
+                dims = self._extract_space_dimensions(user_message)
                 if dims:
-                    request.message = f"{pending.get('original_query', '')} {dims['length']} x {dims['width']} cm"
+                    user_message = f"{pending.get('original_query', '')} {dims['length']} x {dims['width']} cm"
                     session.clear_pending_clarification()
                 else:
                     response_text = "Please share the space length and width in cm (e.g., 120 x 60 cm)."
@@ -181,11 +357,11 @@ class EasymartAssistantHandler:
             if pending.get("vague_type") == "filter_clarification":
                 original_query = pending.get("original_query", "")
                 if original_query:
-                    request.message = f"{original_query} {request.message}".strip()
+                    user_message = f"{original_query} {user_message}".strip()
                 session.clear_pending_clarification()
 
             if pending.get("vague_type") == "bundle_confirm":
-                if self._is_confirmation_response(request.message):
+                if self._is_confirmation_response(user_message):
                     session.clear_pending_clarification()
                     response = await self._handle_bundle_add(session)
                     if response:
@@ -204,15 +380,15 @@ class EasymartAssistantHandler:
 
             merged = self.intent_detector.merge_clarification_response(
                 pending.get("partial_entities", {}),
-                request.message,
+                user_message,
                 pending.get("vague_type", "")
             )
-            request.message = merged.get("query", request.message)
+            user_message = merged.get("query", user_message)
             session.clear_pending_clarification()
 
         # Off-topic guard
         intent = self.intent_detector.detect(
-            request.message,
+            user_message,
             current_product=session.current_product,
             last_shown_products=session.last_shown_products
         ).value
@@ -231,19 +407,19 @@ class EasymartAssistantHandler:
             )
 
         # Force bundle handling for multi-item requests
-        bundle_items, _ = parse_bundle_request(request.message)
+        bundle_items, _ = parse_bundle_request(user_message)
         if len(bundle_items) >= 2:
-            request.message = f"Please use build_bundle. {request.message}"
+            user_message = f"Please use build_bundle. {user_message}"
 
         # Clarify if filters are too weak for product search
         if intent == "product_search":
-            entities = self.intent_detector.extract_entities(request.message, IntentType.PRODUCT_SEARCH)
-            is_valid, _, message = self.filter_validator.validate_filter_count(entities, request.message)
-            if not is_valid and not self.filter_validator.is_bypass_phrase(request.message):
+            entities = self.intent_detector.extract_entities(user_message, IntentType.PRODUCT_SEARCH)
+            is_valid, _, message = self.filter_validator.validate_filter_count(entities, user_message)
+            if not is_valid and not self.filter_validator.is_bypass_phrase(user_message):
                 session.set_pending_clarification(
                     vague_type="filter_clarification",
                     partial_entities=entities,
-                    original_query=request.message
+                    original_query=user_message
                 )
                 session.add_message("assistant", message)
                 return AssistantResponse(
@@ -256,7 +432,7 @@ class EasymartAssistantHandler:
 
         if self.settings.TEST_MODE:
             response_text = "Test mode is enabled. How can I help you shop today?"
-            session.add_message("user", request.message)
+            session.add_message("user", user_message)
             session.add_message("assistant", response_text)
             return AssistantResponse(
                 session_id=session.session_id,
@@ -267,11 +443,27 @@ class EasymartAssistantHandler:
                 metadata={"intent": intent, "test_mode": True}
             )
 
+        cache_intent = self._cache_intent_for(session, intent)
+        if cache_intent:
+            cached = await self.response_cache.get(cache_intent, user_message)
+            if cached:
+                return self._replay_cached_response(session, user_message, cached, start_time)
+
         try:
-            history = session.to_langchain_messages(limit=10)
+            history = session.to_langchain_messages(limit=10, token_budget=self.settings.HISTORY_TOKEN_BUDGET)
+            seed_calls = None
+            reply_template = None
+            if (intent == "product_search" and self.settings.DIRECT_PRODUCT_SEARCH
+                    and len(bundle_items) < 2 and not entities.get("space_length")):
+                seed_calls = [self._direct_search_call(user_message, entities)]
+                # Broad one-word searches still go to the model, which offers to narrow them down
+                if self.settings.TEMPLATED_SEARCH_REPLY and self._is_specific_search(user_message, entities):
+                    reply_template = self._templated_search_reply
             token = CURRENT_SESSION_ID.set(session.session_id)
             try:
-                response_text, tool_steps = await self._run_tool_loop(request.message, history)
+                response_text, tool_steps = await self._run_tool_loop(
+                    user_message, history, seed_calls, on_token, reply_template
+                )
             finally:
                 CURRENT_SESSION_ID.reset(token)
 
@@ -283,25 +475,25 @@ class EasymartAssistantHandler:
             if bundle_feedback:
                 response_text = f"{response_text}\n\n{bundle_feedback}".strip()
 
-            session.add_message("user", request.message)
+            session.add_message("user", user_message)
             session.add_message("assistant", response_text)
 
             # INTELLIGENT CLARIFICATION DETECTION: Use LLM to understand if response is asking for clarification
             clarification_analysis = await self.intelligent_context.analyze_response_type(
-                response_text, request.message
+                response_text, user_message
             )
             
             if clarification_analysis["is_clarification"] and not clarification_analysis["is_showing_products"]:
                 # Don't extract or show products for clarification responses
                 products = []
                 # Save shopping context for follow-up recovery
-                self._save_shopping_context(session, request.message)
+                self._save_shopping_context(session, user_message)
             else:
                 products = self._extract_products(tool_steps, session)
                 # Clear shopping context when we have a successful non-clarification response
                 self._clear_shopping_context(session)
                 if intent == "product_search" and not products:
-                    fallback_products = await self._fallback_search(request.message, session)
+                    fallback_products = await self._fallback_search(user_message, session)
                     if fallback_products:
                         products = fallback_products
                         lower_text = response_text.lower()
@@ -314,7 +506,7 @@ class EasymartAssistantHandler:
 
             response_time_ms = (time.time() - start_time) * 1000
 
-            return AssistantResponse(
+            response = AssistantResponse(
                 session_id=session.session_id,
                 message=response_text,
                 products=products if products else [],
@@ -328,10 +520,21 @@ class EasymartAssistantHandler:
                 }
             )
 
+            # Only complete answers are reused: no clarification questions or empty searches
+            is_complete = not clarification_analysis["is_clarification"] and (products or intent != "product_search")
+            if cache_intent and is_complete:
+                entry = response.model_dump()
+                entry["session_metadata"] = {
+                    key: session.metadata[key] for key in _CACHED_SESSION_KEYS if key in session.metadata
+                }
+                await self.response_cache.put(cache_intent, user_message, entry)
+
+            return response
+
         except EasymartException as e:
             analytics.track_error("easymart_exception", str(e))
-            print(f"[ERROR] EasymartException: {e}")
-            recovery = error_recovery.handle_error("tool_failure", {"query": request.message})
+            logger.error("EasymartException: %s", e)
+            recovery = error_recovery.handle_error("tool_failure", {"query": user_message})
             return AssistantResponse(
                 session_id=session.session_id,
                 message=recovery.get("message"),
@@ -341,10 +544,8 @@ class EasymartAssistantHandler:
             )
         except Exception as e:
             analytics.track_error("internal_error", str(e))
-            import traceback
-            print(f"[ERROR] Exception in handler: {type(e).__name__}: {e}")
-            traceback.print_exc()
-            recovery = error_recovery.handle_error("tool_failure", {"query": request.message})
+            logger.exception("Exception in handler: %s: %s", type(e).__name__, e)
+            recovery = error_recovery.handle_error("tool_failure", {"query": user_message})
             return AssistantResponse(
                 session_id=session.session_id,
                 message=recovery.get("message"),
@@ -353,15 +554,92 @@ class EasymartAssistantHandler:
                 metadata={"intent": "error", "error": str(e)}
             )
 
+    async def handle_message_stream(self, request: AssistantRequest) -> AsyncIterator[Union[str, AssistantResponse]]:
+        """
+        Yield reply text deltas as the LLM generates them, then the complete AssistantResponse.
+        Its message is authoritative: post-processing can amend or replace the streamed text.
+        """
+        deltas: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.handle_message(request, on_token=deltas.put_nowait))
+        task.add_done_callback(lambda _: deltas.put_nowait(None))
+        try:
+            while (delta := await deltas.get()) is not None:
+                yield delta
+            yield task.result()
+        finally:
+            # No-op once finished; stops the turn if the client goes away mid-stream
+            task.cancel()
+
+    async def handle_messages_batch(self, requests: List[AssistantRequest]) -> List[AssistantResponse]:
+        """
+        Handle messages from different sessions concurrently, overlapping their LLM
+        round-trips (bounded by ASSISTANT_MAX_CONCURRENCY). Responses keep request order.
+        """
+        return list(await asyncio.gather(*(self.handle_message(request) for request in requests)))
+
+    @staticmethod
+    def _cache_intent_for(session, intent: str) -> Optional[str]:
+        """
+        Intent to key the response cache by, or None when this turn must not use it.
+        Before the first user turn (no history, brief or cart yet) the answer depends only
+        on the message, so repeated opening queries are served from the response cache.
+        """
+        if intent in CACHEABLE_INTENTS and not session.cart_items and not session.user_message_count:
+            return intent
+        return None
+
+    def _replay_cached_response(self, session, message: str, cached: Dict[str, Any], start_time: float) -> AssistantResponse:
+        """Apply a cached response to this session as if the turn had run"""
+        session.add_message("user", message)
+        session.add_message("assistant", cached["message"])
+        if cached.get("products"):
+            session.update_shown_products(cached["products"])
+        # Restore what the tools wrote, e.g. the bundle a later "add the bundle" adds
+        session.metadata.update(cached.pop("session_metadata", {}))
+
+        cached["metadata"].update({
+            "cached": True,
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        cached["session_id"] = session.session_id
+        cached["cart_summary"] = self._build_cart_summary(session)
+        return AssistantResponse(**cached)
+
+    async def warmup(self) -> None:
+        """
+        Open the pooled connection to the LLM API ahead of the first user turn, so that
+        turn does not also pay DNS, TCP and TLS setup. Listing models costs no tokens.
+        """
+        if self.settings.TEST_MODE or not self._llm_api_key:
+            return
+        try:
+            await self.llm.root_async_client.models.list()
+            logger.info("LLM connection warmed up")
+        except Exception as e:
+            logger.warning("LLM warmup failed (first request will connect): %s", e)
+
+    async def _get_session(self, session_id: Optional[str], user_id: Optional[str] = None):
+        """Fetch or create the session, off the event loop when the store does network I/O"""
+        if getattr(self.session_store, "blocking_io", False):
+            return await asyncio.to_thread(
+                self.session_store.get_or_create_session, session_id=session_id, user_id=user_id
+            )
+        return self.session_store.get_or_create_session(session_id=session_id, user_id=user_id)
+
+    async def close(self) -> None:
+        """Release pooled HTTP connections (tool-side Node backend client) on shutdown"""
+        await get_assistant_tools().close()
+
     async def get_greeting(self, session_id: Optional[str] = None) -> AssistantResponse:
-        session = self.session_store.get_or_create_session(session_id=session_id)
-        greeting = get_greeting_message()
-        session.add_message("assistant", greeting)
-        return AssistantResponse(
-            message=greeting,
-            session_id=session.session_id,
-            metadata={"type": "greeting"}
-        )
+        session = await self._get_session(session_id)
+        session.add_message("assistant", self._greeting_template.message)
+        return self._greeting_template.model_copy(update={
+            "session_id": session.session_id,
+            "metadata": {"type": "greeting"},
+            "products": [],
+            "actions": [],
+        })
 
     async def clear_session(self, session_id: str):
         self.session_store.delete_session(session_id)
@@ -421,16 +699,10 @@ class EasymartAssistantHandler:
     def _build_cart_summary(self, session) -> Optional[Dict[str, Any]]:
         if not session.cart_items:
             return None
-        total_price = 0.0
-        for item in session.cart_items:
-            price = item.get("price")
-            qty = item.get("quantity", 0)
-            if price is not None:
-                total_price += float(price) * qty
         return {
             "item_count": len(session.cart_items),
             "items": session.cart_items,
-            "total": total_price
+            "total": session.cart_total
         }
 
     def _summarize_bundle_feedback(self, steps) -> Optional[str]:
@@ -452,18 +724,12 @@ class EasymartAssistantHandler:
 
     def _needs_space_dimensions(self, message: str) -> bool:
         message_lower = message.lower()
-        has_space = any(phrase in message_lower for phrase in [
-            "small space", "limited space", "tight space", "small room", "compact space"
-        ])
-        wants_table = any(word in message_lower for word in ["table", "desk"])
-        has_dimensions = self._extract_space_dimensions(message) is not None
-        return has_space and wants_table and not has_dimensions
+        if not _SMALL_SPACE_RE.search(message_lower) or not _TABLE_WORD_RE.search(message_lower):
+            return False
+        return self._extract_space_dimensions(message) is None
 
     def _extract_space_dimensions(self, message: str) -> Optional[Dict[str, float]]:
-        match = re.search(
-            r'(\d+(?:\.\d+)?)\s*(?:cm)?\s*(?:x|by)\s*(\d+(?:\.\d+)?)\s*cm',
-            message.lower()
-        )
+        match = _SPACE_DIMENSIONS_RE.search(message.lower())
         if not match:
             return None
         return {"length": float(match.group(1)), "width": float(match.group(2))}
@@ -497,62 +763,39 @@ class EasymartAssistantHandler:
         if brief:
             session.metadata["shopping_brief"] = brief
 
-    def _maybe_apply_bundle_context(self, session, request: AssistantRequest) -> None:
+    def _maybe_apply_bundle_context(self, session, message: str) -> str:
+        """Prefix budget-only or refine follow-ups with the bundle's items"""
         brief = session.metadata.get("shopping_brief", {})
         bundle_items = brief.get("bundle_items")
         if not bundle_items:
-            return
+            return message
 
-        message_lower = request.message.lower()
-        has_budget = any(token in message_lower for token in ["under", "budget", "max", "maximum"])
-        has_item_words = any(word in message_lower for word in ["chair", "table", "desk", "sofa", "bed"])
-        if has_budget and not has_item_words:
+        message_lower = message.lower()
+        if _BUDGET_RE.search(message_lower) and not _ITEM_WORD_RE.search(message_lower):
             items_text = " and ".join(
                 f"{item['quantity']} {item['type']}" for item in bundle_items
             )
-            request.message = f"{items_text} {request.message}".strip()
+            message = f"{items_text} {message}".strip()
 
-        if self._is_bundle_refine_request(request.message):
+        if self._is_bundle_refine_request(message):
             items_text = " and ".join(
                 f"{item['quantity']} {item['type']}" for item in bundle_items
             )
-            request.message = f"{items_text} {request.message}".strip()
+            message = f"{items_text} {message}".strip()
+        return message
 
     def _is_add_bundle_request(self, message: str) -> bool:
-        message_lower = message.lower()
-        bundle_phrases = [
-            "add this bundle to cart",
-            "add bundle to cart",
-            "add the bundle to cart",
-            "add this bundle",
-            "add the bundle",
-            "add bundle",
-            "add all to cart",
-            "add all items",
-            # Handle common typos
-            "add this bundell",
-            "add this bundel",
-            "add the bundell",
-            "add the bundel",
-            "add bundell",
-            "add bundel",
-        ]
-        return any(phrase in message_lower for phrase in bundle_phrases)
+        return _ADD_BUNDLE_RE.search(message.lower()) is not None
 
     def _is_bundle_confirm_message(self, message: str) -> bool:
         return self._is_confirmation_response(message)
 
     def _is_confirmation_response(self, message: str) -> bool:
         message_lower = message.lower().strip()
-        yes_phrases = ["yes", "yep", "yeah", "confirm", "ok", "okay", "please do", "go ahead"]
-        no_phrases = ["no", "nope", "don't", "do not", "cancel", "stop"]
-        if any(phrase == message_lower for phrase in yes_phrases):
-            return True
-        if any(phrase == message_lower for phrase in no_phrases):
+        # An exact "no" wins; otherwise any yes phrase (exact or contained) confirms
+        if message_lower in _NO_REPLIES:
             return False
-        if any(phrase in message_lower for phrase in yes_phrases):
-            return True
-        return False
+        return _YES_RE.search(message_lower) is not None
 
     async def _handle_bundle_confirmation(self, session) -> Optional[AssistantResponse]:
         pending = session.get_pending_clarification()
@@ -623,13 +866,7 @@ class EasymartAssistantHandler:
         )
 
     def _is_bundle_refine_request(self, message: str) -> bool:
-        message_lower = message.lower()
-        refine_phrases = [
-            "make it", "prefer", "instead", "change to", "switch to",
-            "in red", "in blue", "in black", "in white", "red", "blue", "black", "white",
-            "more options", "another bundle", "different bundle", "new bundle"
-        ]
-        return any(phrase in message_lower for phrase in refine_phrases)
+        return _BUNDLE_REFINE_RE.search(message.lower()) is not None
 
     def _is_clarification_response(self, response_text: str) -> bool:
         """
@@ -735,7 +972,7 @@ class EasymartAssistantHandler:
         if hasattr(session, 'messages'):
             recent_conversation = [
                 {"role": msg.get("role"), "content": msg.get("content")}
-                for msg in session.messages[-6:]  # Last 3 exchanges
+                for msg in session.recent_messages(6)  # Last 3 exchanges
             ]
         
         # Use intelligent context handler to analyze
@@ -868,77 +1105,182 @@ class EasymartAssistantHandler:
         E.g., 'Dog Bed Small Washable' -> 'dog bed washable' 
         Then further normalize to catch 'dog bed' as the core type.
         """
-        import re
-        
-        name_lower = name.lower()
-        
-        # Remove quantity patterns like "200pcs", "400 pcs", "1 x", "2x", etc.
-        name_lower = re.sub(r'\b\d+\s*(?:pcs?|pieces?|pack|count|x|units?)\b', '', name_lower)
-        
-        # Remove size patterns like "small", "medium", "large", "xl", "xxl", etc.
-        name_lower = re.sub(r'\b(?:x?x?small|x?x?large|medium|mini|big|huge|tiny|xl|xxl|xs|xxs)\b', '', name_lower)
-        
-        # Remove standalone size letters only when they appear as size indicators
-        name_lower = re.sub(r'\b[sml]\b', '', name_lower)
-        
-        # Remove dimension patterns like "60x90cm", "100cm", etc.
-        name_lower = re.sub(r'\b\d+\s*x\s*\d+\s*(?:cm|mm|m|inch|in|ft)?\b', '', name_lower)
-        name_lower = re.sub(r'\b\d+\s*(?:cm|mm|m|inch|in|ft)\b', '', name_lower)
-        
-        # Remove variant descriptors that don't change the core product type
-        name_lower = re.sub(r'\b(?:orthopedic|washable|waterproof|foldable|portable|deluxe|premium|basic|standard|pro|plus)\b', '', name_lower)
-        
-        # Remove color patterns
-        name_lower = re.sub(r'\b(?:black|white|red|blue|green|yellow|pink|purple|grey|gray|brown|beige|orange|navy|cream)\b', '', name_lower)
-        
-        # Remove leading/trailing whitespace and normalize spaces
-        name_lower = re.sub(r'\s+', ' ', name_lower).strip()
-        
-        return name_lower
-
-    async def _run_tool_loop(self, message: str, history):
-        messages = [SystemMessage(content=self.system_prompt)] + history + [HumanMessage(content=message)]
+        # Same normalization search_products dedupes with; memoized there
+        return base_product_name(name)
+
+    async def _run_tool_loop(
+        self,
+        message: str,
+        history,
+        seed_calls: Optional[List[Dict[str, Any]]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        reply_template: Optional[Callable[[List[Any]], Optional[str]]] = None
+    ):
+        messages = [self._system_message, *history, HumanMessage(content=message)]
         tool_steps = []
 
+        if seed_calls:
+            # The tool is already known (product search): run it up front so the model's first
+            # call starts from its results instead of spending a round-trip choosing it
+            messages.append(AIMessage(content="", tool_calls=seed_calls))
+            await self._run_tool_round(seed_calls, messages, tool_steps)
+
+            # Plain result listings need no model-written intro: skip the LLM call entirely
+            templated = reply_template(tool_steps) if reply_template else None
+            if templated:
+                logger.debug("Templated search reply; final LLM call skipped")
+                if on_token is not None:
+                    on_token(templated)
+                return templated, tool_steps
+
         for _ in range(3):
-            ai_msg = await self.tool_llm.ainvoke(messages)
+            async with self._llm_semaphore:
+                if on_token is None:
+                    ai_msg = await self.tool_llm.ainvoke(messages)
+                else:
+                    ai_msg = await self._stream_llm(messages, on_token)
             messages.append(ai_msg)
 
             tool_calls = getattr(ai_msg, "tool_calls", None) or []
             if not tool_calls:
                 return ai_msg.content, tool_steps
 
-            for call in tool_calls:
-                call_name = call.get("name") or call.get("function", {}).get("name")
-                call_args = call.get("args") or call.get("function", {}).get("arguments") or {}
-                call_id = call.get("id") or call.get("tool_call_id") or call.get("function", {}).get("id") or call_name
+            await self._run_tool_round(tool_calls, messages, tool_steps)
 
-                if isinstance(call_args, str):
-                    try:
-                        call_args = json.loads(call_args)
-                    except json.JSONDecodeError:
-                        call_args = {}
+        return "", tool_steps
 
-                tool = self.tool_map.get(call_name)
-                if tool is None:
-                    result = {"error": f"Unknown tool: {call_name}"}
-                else:
-                    result = await tool.ainvoke(call_args)
+    @staticmethod
+    def _is_specific_search(message: str, entities: Dict[str, Any]) -> bool:
+        """Narrow request (attributes given, or results explicitly asked for): show results right away"""
+        return (any(entities.get(key) for key in _SPECIFIC_SEARCH_ENTITIES)
+                or bool(_SHOW_RESULTS_RE.search(message.lower())))
 
-                # DEBUG: Log tool results
-                print(f"[DEBUG] Tool '{call_name}' args: {call_args}")
-                if isinstance(result, dict):
-                    if result.get("no_color_match"):
-                        print(f"[DEBUG] no_color_match=True, available_colors={result.get('available_colors')}")
-                    elif result.get("products"):
-                        print(f"[DEBUG] Got {len(result['products'])} products")
-                    else:
-                        print(f"[DEBUG] Result keys: {result.keys()}")
+    @staticmethod
+    def _templated_search_reply(tool_steps) -> Optional[str]:
+        """Intro for a clean search_products listing, or None when the model should write the reply"""
+        if not tool_steps or any(name != "search_products" for name, _ in tool_steps):
+            return None
+        result = tool_steps[-1][1]
+        if not isinstance(result, dict) or result.get("no_color_match") or result.get("showing_out_of_stock"):
+            return None
+        products = result.get("products") or []
+        prices = [p["price"] for p in products
+                  if isinstance(p, dict) and isinstance(p.get("price"), (int, float)) and p["price"] > 0]
+        if not prices:
+            return None
+        low, high = min(prices), max(prices)
+        count = len(products)
+        noun = "option" if count == 1 else "options"
+        price_text = f"${low:,.2f}" if low == high else f"from ${low:,.2f} to ${high:,.2f}"
+        return (
+            f"I found {count} {noun} for you, priced {price_text}. "
+            "Let me know if you'd like to narrow them down by budget, colour or size."
+        )
 
-                tool_steps.append((call_name, result))
-                messages.append(ToolMessage(content=json.dumps(result), tool_call_id=call_id))
+    async def _stream_llm(self, messages, on_token: Callable[[str], None]):
+        """ainvoke equivalent that forwards reply text as it arrives"""
+        ai_msg = None
+        async for chunk in self.tool_llm.astream(messages):
+            # Tool-call rounds stream arguments, not text; only reply text is forwarded
+            if chunk.content and isinstance(chunk.content, str) and not chunk.tool_call_chunks:
+                on_token(chunk.content)
+            ai_msg = chunk if ai_msg is None else ai_msg + chunk
+        if ai_msg is None:
+            # Empty or filtered completion: nothing was streamed, so ask once more without streaming
+            logger.warning("LLM stream produced no chunks, retrying without streaming")
+            ai_msg = await self.tool_llm.ainvoke(messages)
+        return ai_msg
+
+    async def _run_tool_round(self, tool_calls, messages, tool_steps) -> None:
+        # The model sometimes repeats a call verbatim within a round: run each distinct call once
+        # and answer every tool_call_id with its shared result
+        unique_calls, slots, first_slot = [], [], {}
+        for call in tool_calls:
+            key = self._tool_call_key(call)
+            if key is not None and key in first_slot:
+                slots.append(first_slot[key])
+                continue
+            if key is not None:
+                first_slot[key] = len(unique_calls)
+            slots.append(len(unique_calls))
+            unique_calls.append(call)
+
+        # Read-only lookups (specs, availability, policy, ...) are independent I/O: overlap them
+        if len(unique_calls) > 1 and not any(self._tool_call_name(call) in SESSION_WRITING_TOOLS for call in unique_calls):
+            results = await asyncio.gather(*(self._invoke_tool_call(call) for call in unique_calls))
+        else:
+            results = [await self._invoke_tool_call(call) for call in unique_calls]
+
+        for call_name, _, result in results:
+            tool_steps.append((call_name, result))
+        contents = [_dump_tool_result(result) for _, _, result in results]
+        for call, slot in zip(tool_calls, slots):
+            messages.append(ToolMessage(content=contents[slot], tool_call_id=self._tool_call_id(call)))
+
+    def _direct_search_call(self, message: str, entities: Dict[str, Any]) -> Dict[str, Any]:
+        """search_products tool call built from the entities the intent detector extracted"""
+        args = {"query": entities.get("query") or message, "limit": self.settings.SEARCH_LIMIT_DEFAULT}
+        for key in ("category", "material", "style", "room_type", "color", "price_max"):
+            if entities.get(key) is not None:
+                args[key] = entities[key]
+        return {"name": "search_products", "args": args, "id": "direct_search", "type": "tool_call"}
+
+    @staticmethod
+    def _tool_call_name(call) -> Optional[str]:
+        return call.get("name") or call.get("function", {}).get("name")
+
+    @classmethod
+    def _tool_call_id(cls, call) -> Optional[str]:
+        return call.get("id") or call.get("tool_call_id") or call.get("function", {}).get("id") or cls._tool_call_name(call)
+
+    @staticmethod
+    def _tool_call_args(call) -> Dict[str, Any]:
+        call_args = call.get("args") or call.get("function", {}).get("arguments") or {}
+        if isinstance(call_args, str):
+            try:
+                call_args = json.loads(call_args)
+            except json.JSONDecodeError:
+                call_args = {}
+        return call_args
+
+    @classmethod
+    def _tool_call_key(cls, call) -> Optional[tuple]:
+        """Identity of a call for in-round dedup; None for tools that must run every time"""
+        call_name = cls._tool_call_name(call)
+        if call_name in NON_IDEMPOTENT_TOOLS:
+            return None
+        return call_name, json.dumps(cls._tool_call_args(call), sort_keys=True, default=str)
+
+    async def _invoke_tool_call(self, call):
+        call_name = self._tool_call_name(call)
+        call_args = self._tool_call_args(call)
+        call_id = self._tool_call_id(call)
+
+        started = time.perf_counter()
+        tool = self.tool_map.get(call_name)
+        if tool is None:
+            result = {"error": f"Unknown tool: {call_name}"}
+        else:
+            try:
+                result = await tool.ainvoke(call_args)
+            except Exception as e:
+                # A failed lookup becomes an error result, so calls running alongside it in the
+                # round still complete and the model can answer around it
+                logger.exception("Tool '%s' failed: %s", call_name, e)
+                result = {"error": f"{call_name} failed"}
+
+        # Tool tracing: formatted only when DEBUG logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Tool '%s' args: %s (%.1f ms)", call_name, call_args, (time.perf_counter() - started) * 1000)
+            if isinstance(result, dict):
+                if result.get("no_color_match"):
+                    logger.debug("no_color_match=True, available_colors=%s", result.get("available_colors"))
+                elif result.get("products"):
+                    logger.debug("Got %d products", len(result["products"]))
+                else:
+                    logger.debug("Result keys: %s", list(result.keys()))
 
-        return "", tool_steps
+        return call_name, call_id, result
 
     async def _fallback_search(self, message: str, session) -> List[Dict[str, Any]]:
         entities = self.intent_detector.extract_entities(message, IntentType.PRODUCT_SEARCH)
@@ -975,29 +1317,11 @@ class EasymartAssistantHandler:
         if not session.last_shown_products:
             return message
         
-        # Patterns to detect product references (in priority order)
-        patterns = [
-            # "option 1", "item 2", "product 3"
-            (r'\b(?:option|choice|item|product|number)\s+(\d+)', 'index'),
-            # "first one", "second chair"
-            (r'\b(first|second|third|fourth|fifth)\s+(?:one|option|choice|item|chair|table|desk|product)?', 'index'),
-            # "1st one", "2nd option"
-            (r'\b(1st|2nd|3rd|4th|5th)\s+(?:one|option|choice|item|chair|table|desk|product)?', 'index'),
-            # "the 2nd one"
-            (r'\b(?:the\s+)?(\d+)(?:st|nd|rd|th)\s+(?:one|option|chair|table|desk|product)?', 'index'),
-            # Standalone numbers in cart/add context: "add 2 and 3", "2 and 3 to cart"
-            # Match numbers that appear to be product references (not prices or quantities)
-            (r'\badd\s+(\d+)\b(?!\s*(?:to|x|items?|of))', 'index'),
-            (r'\b(\d+)\s+(?:and|,)\s*(\d+)\s+(?:option|to\s+cart|to\s+my\s+cart)', 'multi_index'),
-            # "2 option" (number before option)
-            (r'\b(\d+)\s+option', 'index'),
-        ]
-        
         # Find all matches with their positions and resolved values
         replacements = []
         
-        for pattern, ref_type in patterns:
-            for match in re.finditer(pattern, message, re.IGNORECASE):
+        for pattern, ref_type in _PRODUCT_REFERENCE_PATTERNS:
+            for match in pattern.finditer(message):
                 if ref_type == 'multi_index':
                     # Handle "2 and 3" pattern - resolve both numbers
                     ref1, ref2 = match.group(1), match.group(2)
@@ -1052,11 +1376,7 @@ class EasymartAssistantHandler:
         return resolved_message
 
 
-_handler: Optional[EasymartAssistantHandler] = None
-
-
+@lru_cache(maxsize=1)
 def get_assistant_handler() -> EasymartAssistantHandler:
-    global _handler
-    if _handler is None:
-        _handler = EasymartAssistantHandler()
-    return _handler
+    """Process-wide handler; startup warmup makes the first call before traffic is released"""
+    return EasymartAssistantHandler()
@@ -320,11 +320,10 @@ class HuggingFaceLLMClient:
     
     async def close(self):
         """Close HTTP client"""
-        # AsyncInferenceClient doesn't strictly need closing if used as context manager, 
-        # but we can't easily close the underlying session if we don't own it fully.
-        # However, it doesn't expose a close method directly in all versions.
-        # We'll just pass.
-        pass
+        # AsyncInferenceClient reuses one session per instance; older versions have no close()
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            await close()
     
     async def __aenter__(self):
         return self
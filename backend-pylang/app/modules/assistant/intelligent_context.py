@@ -6,8 +6,28 @@ Uses pattern matching instead of LLM calls for speed optimization.
 - Should previous context be applied to current query?
 """
 
+import re
 from typing import Dict, Any, Optional, List
 
+# Capitalized product names like "Artiss Office Chair" or "Fluval Canister Filter"
+_PRODUCT_NAME_RE = re.compile(r'[A-Z][a-zA-Z]+\s+(?:External|Canister|Filter|Pump|Chair|Sofa|Desk|Bed|Table|Recliner|Aquarium|Tank)')
+
+# Short replies that only make sense with the previous shopping context
+_SHORT_FOLLOW_UPS = frozenset([
+    "yes", "yeah", "yep", "sure", "ok", "okay", "go ahead",
+    "you choose", "you pick", "just pick", "pick for me",
+    "give me that", "i'll take it", "sounds good", "perfect",
+    "bundle", "give me bundle", "create bundle", "make bundle",
+    "go for it", "do it", "proceed", "continue"
+])
+_FOLLOW_UP_WORDS = ("bundle", "pick", "choose", "that")
+
+# Openers of a new product search (a tuple, so one str.startswith call tests them all)
+_INDEPENDENT_STARTERS = (
+    "show me", "find me", "search for", "look for", "i want", "i need",
+    "looking for", "can you find", "do you have", "what about"
+)
+
 
 class IntelligentContextHandler:
     """
@@ -45,15 +65,7 @@ class IntelligentContextHandler:
         message_lower = current_message.lower().strip()
         
         # FAST HEURISTIC 1: Short follow-up responses that CLEARLY need context
-        short_follow_ups = [
-            "yes", "yeah", "yep", "sure", "ok", "okay", "go ahead", 
-            "you choose", "you pick", "just pick", "pick for me",
-            "give me that", "i'll take it", "sounds good", "perfect",
-            "bundle", "give me bundle", "create bundle", "make bundle",
-            "go for it", "do it", "proceed", "continue"
-        ]
-        
-        if message_lower in short_follow_ups or len(message_lower.split()) <= 3 and any(word in message_lower for word in ["bundle", "pick", "choose", "that"]):
+        if message_lower in _SHORT_FOLLOW_UPS or len(message_lower.split()) <= 3 and any(word in message_lower for word in _FOLLOW_UP_WORDS):
             return {
                 "needs_context": True,
                 "combined_query": f"{previous_shopping_context}, {current_message}",
@@ -62,12 +74,7 @@ class IntelligentContextHandler:
         
         # FAST HEURISTIC 2: Independent queries that DON'T need context
         # These are clearly new product searches
-        independent_starters = [
-            "show me", "find me", "search for", "look for", "i want", "i need",
-            "looking for", "can you find", "do you have", "what about"
-        ]
-        
-        if any(message_lower.startswith(starter) for starter in independent_starters):
+        if message_lower.startswith(_INDEPENDENT_STARTERS):
             return {
                 "needs_context": False,
                 "combined_query": current_message,
@@ -127,8 +134,7 @@ class IntelligentContextHandler:
         has_price_symbols = "$" in assistant_response
         
         # Check for product name patterns (capitalized product names)
-        import re
-        has_product_names = bool(re.search(r'[A-Z][a-zA-Z]+\s+(?:External|Canister|Filter|Pump|Chair|Sofa|Desk|Bed|Table|Recliner|Aquarium|Tank)', assistant_response))
+        has_product_names = bool(_PRODUCT_NAME_RE.search(assistant_response))
         
         # Check for product structure patterns - indicating products are being shown
         has_product_structure = any(pattern in response_lower for pattern in [
@@ -6,10 +6,173 @@ Extended for Easymart furniture store with policy and contact intents.
 """
 
 import re
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from .intents import IntentType
 from .category_keywords import is_product_search_term
 
+# Value -> member; IntentType is a str enum, so members hash like their values and resolve here too
+_INTENT_BY_VALUE = {intent.value: intent for intent in IntentType}
+
+
+def _any_re(patterns) -> "re.Pattern[str]":
+    """One compiled alternation: matches exactly where any of the patterns would, in a single scan"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def _any_substring_re(words) -> "re.Pattern[str]":
+    """Compiled 'any of these substrings' check"""
+    return _any_re(re.escape(word) for word in words)
+
+
+# Out-of-scope queries: clearly not related to products we sell
+_OUT_OF_SCOPE_PATTERNS = (
+    # Programming & Tech
+    r'\b(python|java|javascript|code|programming|coding|function|script|algorithm)\b',
+    r'\b(html|css|react|vue|angular|node|npm|git|github)\b',
+    r'\b(sql|database|query|api|server|backend|frontend)\b',
+    # Vehicles & Transportation (NOT electric scooters)
+    r'\b(car|cars|vehicle|automobile|motorcycle|truck|van)\b',
+    # Electronics (non-products we sell)
+    r'\b(laptop|computer|pc|mac|tablet|ipad|iphone|smartphone|phone|mobile)\b',
+    r'\b(tv|television|camera|watch|headphone|speaker|gaming console)\b',
+    # Clothing & Fashion
+    r'\b(clothing|clothes|shirt|pants|dress|shoes|jacket|coat|hat)\b',
+    # Food & Drinks
+    r'\b(food|drink|recipe|cooking|restaurant|meal|dinner|lunch)\b',
+    # Health & Medical
+    r'\b(doctor|hospital|medicine|health|disease|symptom|treatment)\b',
+    # General Knowledge / Educational
+    r'\b(math|mathematics|physics|chemistry|biology|history|geography)\b',
+    r'\b(definition of|what is the capital|who invented|when did)\b',
+    # Entertainment
+    r'\b(movie|film|music|song|video game|tv show|netflix|joke)\b',
+    # Weather
+    r'\b(weather|temperature|forecast|rain|snow)\b',
+    # Travel
+    r'\b(flight|hotel|vacation|travel|tourist|trip)\b',
+)
+_OUT_OF_SCOPE_RE = _any_re(_OUT_OF_SCOPE_PATTERNS)
+
+_GREETING_EXACT = frozenset(['hi', 'hello', 'hey', "g'day", 'greetings',
+                            'good morning', 'good afternoon', 'good evening',
+                            'howdy', 'hi there', 'hello there', 'hey there'])
+
+# Broad product search patterns (catch vague queries)
+_BROAD_PRODUCT_PATTERNS = (
+    r'\b(show|find|search|looking for|want|need|get me)\b',  # Action verbs
+    r'\b(something|anything|items|products|furniture|equipment|gear|supplies)\b',     # Generic nouns
+    # Furniture products
+    r'\b(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?|bookcases?|wardrobes?|dressers?|mattress|ottoman)\s+(available|in stock|options|list)\b',
+    r'^(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?)\??$',
+    # Sports & Fitness products
+    r'\b(treadmill|treadmills|exercise bike|rowing machine|rower|elliptical)\b',
+    r'\b(dumbbell|dumbbells|kettlebell|kettlebells|barbell|barbells|weight plates?|olympic)\b',
+    r'\b(gym bench|weight bench|workout bench|squat rack|power rack|pull up bar)\b',
+    r'\b(boxing|mma|martial arts|muay thai|kickboxing|karate|taekwondo|judo|bjj)\b',
+    r'\b(boxing gloves?|punching bags?|heavy bags?|focus pads?|kick shields?)\b',
+    r'\b(yoga|yoga mat|pilates|foam roller|massage|relaxation|stretching)\b',
+    r'\b(trampoline|air track|gymnastics|fitness|gym|exercise|workout)\b',
+    r'\b(rugby|basketball|sports)\b',
+    # Pet products
+    r'\b(dog|cat|pet|puppy|kitten|bird|aquarium|fish tank)\b',
+    r'\b(dog kennel|dog cage|dog crate|cat tree|cat tower|bird cage)\b',
+    r'\b(pet supplies?|pet products?|pet accessories?)\b',
+    # Electric scooters
+    r'\b(electric scooter|e-scooter|escooter|scooter)\b',
+    # Context patterns
+    r'\bfor\s+(kids|children|baby|toddler|adult|teen|gaming|office|home|bedroom|living room|kitchen|dining|study|outdoor|gym|training)\b',
+    r'\bin\s+(black|white|red|blue|green|brown|grey|gray|wood|metal|leather|fabric)\b',
+    r'\bwith\s+(storage|drawers|wheels|cushion|armrest|padding)\b',
+    r'\b(cheap|affordable|expensive|best|good|quality|nice|premium|luxury|budget)\b',
+    r'\bunder\s+\$?\d+\b',
+    r'\b(small|large|big|compact|modern|classic|vintage|contemporary|professional)\b',
+    # Category + attribute combinations
+    r'\b(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?|storage|gloves?|bags?|mats?|benches?)\s+(black|white|red|blue|green|brown|grey|gray|yellow|pink|purple|orange|beige|navy|wood|wooden|metal|leather|fabric|glass|plastic|modern|classic|vintage|contemporary|small|large|compact)\b',
+    r'\b(black|white|red|blue|green|brown|grey|gray|yellow|pink|purple|orange|beige|navy|wood|wooden|metal|leather|fabric|glass|plastic|modern|classic|vintage|contemporary|small|large|compact)\s+(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?|storage|gloves?|bags?|mats?|benches?)\b',
+)
+_BROAD_PRODUCT_RE = _any_re(_BROAD_PRODUCT_PATTERNS)
+
+# Single words/short phrases that could refine a previous search
+_REFINEMENT_PATTERNS = (
+    # Rooms and contexts
+    r'^(bedroom|office|living room|dining room|kitchen|bathroom|hallway|garage|outdoor|patio|balcony)s?$',
+    # Colors
+    r'^(black|white|red|blue|green|yellow|brown|grey|gray|pink|purple|orange|beige|navy|teal|cream|ivory|silver|gold)$',
+    # Materials
+    r'^(wood|wooden|metal|leather|fabric|glass|plastic|rattan|wicker|bamboo|steel|iron|oak|pine|walnut|marble)$',
+    # Styles
+    r'^(modern|contemporary|classic|vintage|rustic|industrial|scandinavian|minimalist|traditional|bohemian|mid[\s-]?century)$',
+    # Sizes
+    r'^(small|large|big|compact|mini|tiny|huge|oversized|extra[\s-]?large|xl|medium)$',
+    # Age groups / target users
+    r'^(kids|children|adult|baby|toddler|teen|elderly|senior)s?$',
+    # Use cases
+    r'^(gaming|study|work|storage|dining|sleeping)$',
+)
+_REFINEMENT_RE = _any_re(_REFINEMENT_PATTERNS)
+
+# Context-dependent questions (referring to previously shown products)
+_CONTEXT_REFERENCE_PATTERNS = (
+    r'\btell me (about|more about)\s+(product|option|number|item)',  # "tell me about product 3"
+    r'\b(product|option|number|item)\s+\d+',  # "product 3", "option 1"
+    r'\b(this|that|the|it)\s+(one|chair|table|desk|sofa|bed|product|item)',
+    r'\b(first|second|third|last|option)\s+(one|chair|table|product)',
+    r'\b(the|this|that)\s+\$?\d+',
+    r'\bmore (info|information|details|about)\s+(this|that|the|it)',
+    r'\b(feature|spec|dimension|detail)s?\s+of\s+(this|that|the|it)',
+)
+_CONTEXT_REFERENCE_RE = _any_re(_CONTEXT_REFERENCE_PATTERNS)
+
+# Intent granularity keyword groups
+_BROAD_CATEGORY_RE = _any_substring_re(['furniture', 'equipment', 'gear', 'supplies', 'products', 'items', 'things', 'stuff'])
+_SPECIFIC_PRODUCTS = (
+    'bed', 'mattress', 'sofa', 'couch', 'chair', 'desk', 'table',
+    'wardrobe', 'cabinet', 'bookcase', 'drawer',
+    'treadmill', 'dumbbell', 'kettlebell', 'barbell', 'bench',
+    'boxing gloves', 'punching bag', 'yoga mat',
+    'dog kennel', 'cat tree', 'bird cage', 'aquarium',
+    'electric scooter', 'scooter'
+)
+_ATTRIBUTE_KEYWORD_RE = _any_substring_re(['wooden', 'metal', 'leather', 'black', 'white', 'blue', 'modern', 'small', 'large'])
+
+# Clarification reply keyword groups: (label, compiled alternation), first matching group wins
+_CLARIFICATION_CATEGORY_RES = tuple((cat, _any_substring_re(keywords)) for cat, keywords in {
+    "chair": ["chair", "chairs", "seating"],
+    "table": ["table", "tables"],
+    "desk": ["desk", "desks"],
+    "sofa": ["sofa", "sofas", "couch", "couches"],
+    "bed": ["bed", "beds", "mattress"],
+    "shelf": ["shelf", "shelves", "shelving", "bookcase"],
+    "stool": ["stool", "stools", "bar stool"],
+    "locker": ["locker", "lockers"],
+    "cabinet": ["cabinet", "cabinets"],
+    "storage": ["storage", "wardrobe", "dresser"],
+}.items())
+# Word boundaries keep "bedroom" from matching "bed"
+_CLARIFICATION_ROOM_RES = tuple((room, _any_re(patterns)) for room, patterns in {
+    "office": [r"\boffice\b", r"\bworkspace\b", r"\bstudy\b"],
+    "bedroom": [r"\bbedroom\b", r"\bbed room\b"],
+    "living_room": [r"\bliving room\b", r"\blounge\b"],
+    "dining_room": [r"\bdining room\b", r"\bdining\b"],
+    "outdoor": [r"\boutdoor\b", r"\bpatio\b", r"\bgarden\b", r"\bbackyard\b"],
+    "gym": [r"\bgym\b", r"\bfitness\b", r"\bexercise\b", r"\bworkout\b"],
+    "kids": [r"\bkids\b", r"\bchildren\b", r"\bchild\b", r"\bnursery\b"],
+    "school": [r"\bschool\b", r"\bclassroom\b", r"\bstudent\b"],
+    "industrial": [r"\bindustrial\b", r"\bwarehouse\b", r"\bfactory\b"],
+    "home": [r"\bhome\b", r"\bhouse\b", r"\bapartment\b"],
+}.items())
+_CLARIFICATION_USE_CASE_RES = tuple((use, _any_re(patterns)) for use, patterns in {
+    "gym": [r"\bgym\b", r"\bfitness\b", r"\bexercise\b", r"\bworkout\b", r"\bsports\b"],
+    "office": [r"\boffice\b", r"\bwork\b", r"\bworkspace\b"],
+    "school": [r"\bschool\b", r"\bstudent\b", r"\bclassroom\b"],
+    "storage": [r"\bstorage\b", r"\borganizing\b"],
+    "home": [r"\bhome\b", r"\bhouse\b", r"\bapartment\b"],
+}.items())
+_CLARIFICATION_COLORS = ("red", "blue", "green", "yellow", "black", "white", "brown", "gray", "grey",
+                         "orange", "purple", "pink", "beige", "cream", "navy", "silver", "gold")
+_CLARIFICATION_MATERIALS = ("wood", "metal", "leather", "fabric", "glass", "rattan", "plastic")
+
 
 class IntentDetector:
     """
@@ -193,6 +356,22 @@ class IntentDetector:
         ],
     }
     
+    def __init__(self):
+        # Detection is a pure function of the text (plus whether products are in context),
+        # and the handler runs it more than once per turn: memoize per detector
+        self._detect_cached = lru_cache(maxsize=4096)(self._detect)
+        self._extract_entities_cached = lru_cache(maxsize=4096)(self._extract_entities)
+        # Each intent's pattern list as one alternation, in PATTERNS order
+        self._pattern_res = {intent: _any_re(patterns) for intent, patterns in self.PATTERNS.items()}
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counts of the detection and entity memo caches"""
+        stats = {}
+        for name, cached in (("detect", self._detect_cached), ("entities", self._extract_entities_cached)):
+            info = cached.cache_info()
+            stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return stats
+    
     def detect(self, message: str, current_product=None, last_shown_products=None) -> IntentType:
         """
         Detect intent from user message.
@@ -211,170 +390,75 @@ class IntentDetector:
             >>> print(intent)
             IntentType.PRODUCT_SEARCH
         """
+        has_product_context = current_product is not None or bool(last_shown_products)
+        return self._detect_cached(message, has_product_context)
+    
+    def _detect(self, message: str, has_product_context: bool) -> IntentType:
         message_lower = message.lower().strip()
         
         # PRIORITY 0: Check for out-of-scope queries FIRST
         # These are clearly not related to products we sell and should not be forced into product search
-        out_of_scope_keywords = [
-            # Programming & Tech
-            r'\b(python|java|javascript|code|programming|coding|function|script|algorithm)\b',
-            r'\b(html|css|react|vue|angular|node|npm|git|github)\b',
-            r'\b(sql|database|query|api|server|backend|frontend)\b',
-            # Vehicles & Transportation (NOT electric scooters)
-            r'\b(car|cars|vehicle|automobile|motorcycle|truck|van)\b',
-            # Electronics (non-products we sell)
-            r'\b(laptop|computer|pc|mac|tablet|ipad|iphone|smartphone|phone|mobile)\b',
-            r'\b(tv|television|camera|watch|headphone|speaker|gaming console)\b',
-            # Clothing & Fashion
-            r'\b(clothing|clothes|shirt|pants|dress|shoes|jacket|coat|hat)\b',
-            # Food & Drinks
-            r'\b(food|drink|recipe|cooking|restaurant|meal|dinner|lunch)\b',
-            # Health & Medical
-            r'\b(doctor|hospital|medicine|health|disease|symptom|treatment)\b',
-            # General Knowledge / Educational
-            r'\b(math|mathematics|physics|chemistry|biology|history|geography)\b',
-            r'\b(definition of|what is the capital|who invented|when did)\b',
-            # Entertainment
-            r'\b(movie|film|music|song|video game|tv show|netflix|joke)\b',
-            # Weather
-            r'\b(weather|temperature|forecast|rain|snow)\b',
-            # Travel
-            r'\b(flight|hotel|vacation|travel|tourist|trip)\b',
-        ]
-        
         # If message matches any out-of-scope pattern, return OUT_OF_SCOPE immediately
-        if any(re.search(pattern, message_lower) for pattern in out_of_scope_keywords):
+        if _OUT_OF_SCOPE_RE.search(message_lower):
             return IntentType.OUT_OF_SCOPE
         
         # PRIORITY 1: Check greetings FIRST (exact matches before pattern matching)
         # This prevents "hi" from being caught by other patterns
-        greeting_exact = ['hi', 'hello', 'hey', "g'day", 'greetings', 
-                         'good morning', 'good afternoon', 'good evening', 
-                         'howdy', 'hi there', 'hello there', 'hey there']
-        if message_lower in greeting_exact:
+        if message_lower in _GREETING_EXACT:
             return IntentType.GREETING
         
         # PRIORITY 1.5: Check for FIND_SIMILAR intent BEFORE broad product search
         # This prevents "find similar" from being caught as generic product search
-        if IntentType.FIND_SIMILAR in self.PATTERNS:
-            for pattern in self.PATTERNS[IntentType.FIND_SIMILAR]:
-                if re.search(pattern, message_lower):
-                    return IntentType.FIND_SIMILAR
+        if IntentType.FIND_SIMILAR in self._pattern_res:
+            if self._pattern_res[IntentType.FIND_SIMILAR].search(message_lower):
+                return IntentType.FIND_SIMILAR
         
         # PRIORITY 1.55: Check for CART operations BEFORE PRODUCT_SPEC_QA
         # This prevents "add this product" from being caught as product spec inquiry
         # Check cart-related intents (add, remove, CLEAR before SHOW to avoid "clear my cart" matching "my cart")
         cart_intents = [IntentType.CART_ADD, IntentType.CART_REMOVE, IntentType.CART_CLEAR, IntentType.CART_SHOW]
         for cart_intent in cart_intents:
-            if cart_intent in self.PATTERNS:
-                for pattern in self.PATTERNS[cart_intent]:
-                    if re.search(pattern, message_lower):
-                        return cart_intent
+            if cart_intent in self._pattern_res:
+                if self._pattern_res[cart_intent].search(message_lower):
+                    return cart_intent
         
         # PRIORITY 1.6: Check for PRODUCT_SPEC_QA with product context
         # If user has shown products and asks attribute questions, treat as spec inquiry
         # This prevents "is this come in blue" from being caught as vague product search
-        has_product_context = (
-            current_product is not None or 
-            (last_shown_products and len(last_shown_products) > 0)
-        )
-        
-        if has_product_context and IntentType.PRODUCT_SPEC_QA in self.PATTERNS:
-            for pattern in self.PATTERNS[IntentType.PRODUCT_SPEC_QA]:
-                if re.search(pattern, message_lower):
-                    return IntentType.PRODUCT_SPEC_QA
+        if has_product_context and IntentType.PRODUCT_SPEC_QA in self._pattern_res:
+            if self._pattern_res[IntentType.PRODUCT_SPEC_QA].search(message_lower):
+                return IntentType.PRODUCT_SPEC_QA
         
         # PRIORITY 2: Check for BROAD product search patterns (catch vague queries)
         # This must come before specific patterns to catch "something for kids", etc.
-        broad_product_patterns = [
-            r'\b(show|find|search|looking for|want|need|get me)\b',  # Action verbs
-            r'\b(something|anything|items|products|furniture|equipment|gear|supplies)\b',     # Generic nouns
-            # Furniture products
-            r'\b(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?|bookcases?|wardrobes?|dressers?|mattress|ottoman)\s+(available|in stock|options|list)\b',
-            r'^(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?)\??$',
-            # Sports & Fitness products
-            r'\b(treadmill|treadmills|exercise bike|rowing machine|rower|elliptical)\b',
-            r'\b(dumbbell|dumbbells|kettlebell|kettlebells|barbell|barbells|weight plates?|olympic)\b',
-            r'\b(gym bench|weight bench|workout bench|squat rack|power rack|pull up bar)\b',
-            r'\b(boxing|mma|martial arts|muay thai|kickboxing|karate|taekwondo|judo|bjj)\b',
-            r'\b(boxing gloves?|punching bags?|heavy bags?|focus pads?|kick shields?)\b',
-            r'\b(yoga|yoga mat|pilates|foam roller|massage|relaxation|stretching)\b',
-            r'\b(trampoline|air track|gymnastics|fitness|gym|exercise|workout)\b',
-            r'\b(rugby|basketball|sports)\b',
-            # Pet products
-            r'\b(dog|cat|pet|puppy|kitten|bird|aquarium|fish tank)\b',
-            r'\b(dog kennel|dog cage|dog crate|cat tree|cat tower|bird cage)\b',
-            r'\b(pet supplies?|pet products?|pet accessories?)\b',
-            # Electric scooters
-            r'\b(electric scooter|e-scooter|escooter|scooter)\b',
-            # Context patterns
-            r'\bfor\s+(kids|children|baby|toddler|adult|teen|gaming|office|home|bedroom|living room|kitchen|dining|study|outdoor|gym|training)\b',
-            r'\bin\s+(black|white|red|blue|green|brown|grey|gray|wood|metal|leather|fabric)\b',
-            r'\bwith\s+(storage|drawers|wheels|cushion|armrest|padding)\b',
-            r'\b(cheap|affordable|expensive|best|good|quality|nice|premium|luxury|budget)\b',
-            r'\bunder\s+\$?\d+\b',
-            r'\b(small|large|big|compact|modern|classic|vintage|contemporary|professional)\b',
-            # Category + attribute combinations
-            r'\b(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?|storage|gloves?|bags?|mats?|benches?)\s+(black|white|red|blue|green|brown|grey|gray|yellow|pink|purple|orange|beige|navy|wood|wooden|metal|leather|fabric|glass|plastic|modern|classic|vintage|contemporary|small|large|compact)\b',
-            r'\b(black|white|red|blue|green|brown|grey|gray|yellow|pink|purple|orange|beige|navy|wood|wooden|metal|leather|fabric|glass|plastic|modern|classic|vintage|contemporary|small|large|compact)\s+(chairs?|tables?|desks?|sofas?|beds?|shelves|shelving|lockers?|stools?|cabinets?|storage|gloves?|bags?|mats?|benches?)\b',
-        ]
-        
         # If ANY broad pattern matches, assume PRODUCT_SEARCH
-        if any(re.search(pattern, message_lower) for pattern in broad_product_patterns):
+        if _BROAD_PRODUCT_RE.search(message_lower):
             return IntentType.PRODUCT_SEARCH
         
         # PRIORITY 2.5: Check for potential context refinement words
         # These are single words/short phrases that could refine a previous search
         # Examples: "bedroom", "office", "blue", "metal", "modern"
-        refinement_keywords = [
-            # Rooms and contexts
-            r'^(bedroom|office|living room|dining room|kitchen|bathroom|hallway|garage|outdoor|patio|balcony)s?$',
-            # Colors
-            r'^(black|white|red|blue|green|yellow|brown|grey|gray|pink|purple|orange|beige|navy|teal|cream|ivory|silver|gold)$',
-            # Materials
-            r'^(wood|wooden|metal|leather|fabric|glass|plastic|rattan|wicker|bamboo|steel|iron|oak|pine|walnut|marble)$',
-            # Styles
-            r'^(modern|contemporary|classic|vintage|rustic|industrial|scandinavian|minimalist|traditional|bohemian|mid[\s-]?century)$',
-            # Sizes
-            r'^(small|large|big|compact|mini|tiny|huge|oversized|extra[\s-]?large|xl|medium)$',
-            # Age groups / target users
-            r'^(kids|children|adult|baby|toddler|teen|elderly|senior)s?$',
-            # Use cases
-            r'^(gaming|study|work|storage|dining|sleeping)$',
-        ]
         
         # Check if message is a single refinement word
-        if any(re.search(pattern, message_lower) for pattern in refinement_keywords):
+        if _REFINEMENT_RE.search(message_lower):
             return IntentType.PRODUCT_SEARCH  # Treat as product search (will be refined via context)
         
         # PRIORITY 3: Check for context-dependent questions (referring to previously shown products)
         # These should be PRODUCT_SPEC_QA, not PRODUCT_SEARCH
-        context_references = [
-            r'\btell me (about|more about)\s+(product|option|number|item)',  # "tell me about product 3"
-            r'\b(product|option|number|item)\s+\d+',  # "product 3", "option 1"
-            r'\b(this|that|the|it)\s+(one|chair|table|desk|sofa|bed|product|item)',
-            r'\b(first|second|third|last|option)\s+(one|chair|table|product)',
-            r'\b(the|this|that)\s+\$?\d+',
-            r'\bmore (info|information|details|about)\s+(this|that|the|it)',
-            r'\b(feature|spec|dimension|detail)s?\s+of\s+(this|that|the|it)',
-        ]
-        for pattern in context_references:
-            if re.search(pattern, message_lower):
-                return IntentType.PRODUCT_SPEC_QA
+        if _CONTEXT_REFERENCE_RE.search(message_lower):
+            return IntentType.PRODUCT_SPEC_QA
         
         # PRIORITY 3: Check greeting patterns
-        if IntentType.GREETING in self.PATTERNS:
-            for pattern in self.PATTERNS[IntentType.GREETING]:
-                if re.search(pattern, message_lower):
-                    return IntentType.GREETING
+        if IntentType.GREETING in self._pattern_res:
+            if self._pattern_res[IntentType.GREETING].search(message_lower):
+                return IntentType.GREETING
         
         # PRIORITY 4: Check other intent patterns
-        for intent, patterns in self.PATTERNS.items():
+        for intent, pattern_re in self._pattern_res.items():
             if intent == IntentType.GREETING:  # Already checked
                 continue
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    return intent
+            if pattern_re.search(message_lower):
+                return intent
         
         # Default to general help if no specific intent matched
         if len(message.split()) > 3:
@@ -434,23 +518,13 @@ class IntentDetector:
                     return result
         
         # Check for category-level intent (too broad)
-        broad_categories = ['furniture', 'equipment', 'gear', 'supplies', 'products', 'items', 'things', 'stuff']
-        if any(cat in message_lower for cat in broad_categories) and len(message_lower.split()) <= 5:
+        if _BROAD_CATEGORY_RE.search(message_lower) and len(message_lower.split()) <= 5:
             result['granularity'] = 'category_level'
             result['needs_clarification'] = True
             return result
         
-        # Check for specific product mentions
-        specific_products = [
-            'bed', 'mattress', 'sofa', 'couch', 'chair', 'desk', 'table',
-            'wardrobe', 'cabinet', 'bookcase', 'drawer',
-            'treadmill', 'dumbbell', 'kettlebell', 'barbell', 'bench',
-            'boxing gloves', 'punching bag', 'yoga mat',
-            'dog kennel', 'cat tree', 'bird cage', 'aquarium',
-            'electric scooter', 'scooter'
-        ]
-        
-        for product in specific_products:
+        # Check for specific product mentions (list order decides which one wins)
+        for product in _SPECIFIC_PRODUCTS:
             if product in message_lower:
                 result['granularity'] = 'product_level'
                 result['category'] = product
@@ -458,8 +532,7 @@ class IntentDetector:
                 return result
         
         # Check for attribute-level (refinement)
-        attribute_keywords = ['wooden', 'metal', 'leather', 'black', 'white', 'blue', 'modern', 'small', 'large']
-        if any(attr in message_lower for attr in attribute_keywords) and len(message_lower.split()) <= 3:
+        if _ATTRIBUTE_KEYWORD_RE.search(message_lower) and len(message_lower.split()) <= 3:
             result['granularity'] = 'attribute_level'
             result['needs_clarification'] = False
             return result
@@ -475,8 +548,13 @@ class IntentDetector:
             intent: Detected intent
         
         Returns:
-            Dictionary of extracted entities
+            Dictionary of extracted entities (a fresh copy the caller may modify)
         """
+        # Entity values are scalars, so a shallow copy keeps the cached dict intact
+        resolved = _INTENT_BY_VALUE.get(intent) or IntentType(intent)
+        return dict(self._extract_entities_cached(message, resolved))
+    
+    def _extract_entities(self, message: str, intent: IntentType) -> Dict[str, Any]:
         entities = {}
         message_lower = message.lower()
         
@@ -708,6 +786,10 @@ class IntentDetector:
         
         return entities
     
+    def is_bare_greeting(self, message: str) -> bool:
+        """True for a message that is only a greeting ("hi", "hello there")"""
+        return message.lower().strip() in _GREETING_EXACT
+    
     def detect_vague_patterns(self, message: str) -> Optional[Dict[str, Any]]:
         """
         Detect vague query patterns that require clarification.
@@ -951,69 +1033,32 @@ class IntentDetector:
         
         # Extract category from clarification - BUT DON'T overwrite if already set
         if "category" not in merged:
-            categories = {
-                "chair": ["chair", "chairs", "seating"],
-                "table": ["table", "tables"],
-                "desk": ["desk", "desks"],
-                "sofa": ["sofa", "sofas", "couch", "couches"],
-                "bed": ["bed", "beds", "mattress"],
-                "shelf": ["shelf", "shelves", "shelving", "bookcase"],
-                "stool": ["stool", "stools", "bar stool"],
-                "locker": ["locker", "lockers"],
-                "cabinet": ["cabinet", "cabinets"],
-                "storage": ["storage", "wardrobe", "dresser"]
-            }
-            
-            for cat, keywords in categories.items():
-                if any(kw in clarification_lower for kw in keywords):
+            for cat, keywords_re in _CLARIFICATION_CATEGORY_RES:
+                if keywords_re.search(clarification_lower):
                     merged["category"] = cat
                     break
         
         # Extract room type - use word boundaries to avoid "bedroom" matching "bed"
-        rooms = {
-            "office": [r"\boffice\b", r"\bworkspace\b", r"\bstudy\b"],
-            "bedroom": [r"\bbedroom\b", r"\bbed room\b"],
-            "living_room": [r"\bliving room\b", r"\blounge\b"],
-            "dining_room": [r"\bdining room\b", r"\bdining\b"],
-            "outdoor": [r"\boutdoor\b", r"\bpatio\b", r"\bgarden\b", r"\bbackyard\b"],
-            "gym": [r"\bgym\b", r"\bfitness\b", r"\bexercise\b", r"\bworkout\b"],
-            "kids": [r"\bkids\b", r"\bchildren\b", r"\bchild\b", r"\bnursery\b"],
-            "school": [r"\bschool\b", r"\bclassroom\b", r"\bstudent\b"],
-            "industrial": [r"\bindustrial\b", r"\bwarehouse\b", r"\bfactory\b"],
-            "home": [r"\bhome\b", r"\bhouse\b", r"\bapartment\b"],
-        }
-        
-        for room, patterns in rooms.items():
-            if any(re.search(p, clarification_lower) for p in patterns):
+        for room, room_re in _CLARIFICATION_ROOM_RES:
+            if room_re.search(clarification_lower):
                 merged["room_type"] = room
                 break
         
         # Extract use case / purpose - only if not already set as room_type
         if "room_type" not in merged:
-            use_cases = {
-                "gym": [r"\bgym\b", r"\bfitness\b", r"\bexercise\b", r"\bworkout\b", r"\bsports\b"],
-                "office": [r"\boffice\b", r"\bwork\b", r"\bworkspace\b"],
-                "school": [r"\bschool\b", r"\bstudent\b", r"\bclassroom\b"],
-                "storage": [r"\bstorage\b", r"\borganizing\b"],
-                "home": [r"\bhome\b", r"\bhouse\b", r"\bapartment\b"],
-            }
-            
-            for use, patterns in use_cases.items():
-                if any(re.search(p, clarification_lower) for p in patterns):
+            for use, use_re in _CLARIFICATION_USE_CASE_RES:
+                if use_re.search(clarification_lower):
                     merged["use_case"] = use
                     break
         
         # Extract color from clarification
-        colors = ["red", "blue", "green", "yellow", "black", "white", "brown", "gray", "grey",
-                  "orange", "purple", "pink", "beige", "cream", "navy", "silver", "gold"]
-        for color in colors:
+        for color in _CLARIFICATION_COLORS:
             if color in clarification_lower:
                 merged["color"] = color
                 break
         
         # Extract material
-        materials = ["wood", "metal", "leather", "fabric", "glass", "rattan", "plastic"]
-        for material in materials:
+        for material in _CLARIFICATION_MATERIALS:
             if material in clarification_lower:
                 merged["material"] = material
                 break
@@ -74,6 +74,15 @@ def _create_provider_client(provider: str):
             timeout=settings.OPENAI_TIMEOUT
         )
     
+    if normalized in {"vllm", "tgi", "local"}:
+        # Self-hosted OpenAI-compatible server
+        return OpenAILLMClient(
+            api_key=settings.VLLM_API_KEY,
+            model=settings.VLLM_MODEL,
+            base_url=settings.VLLM_BASE_URL,
+            timeout=settings.OPENAI_TIMEOUT
+        )
+    
     if normalized in {"mistral", "huggingface", "hf"}:
         return HuggingFaceLLMClient(
             api_key=settings.HUGGINGFACE_API_KEY,
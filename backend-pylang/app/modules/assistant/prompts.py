@@ -5,6 +5,7 @@ Optimized for OpenAI GPT-4.1 with tool calling via LangChain.
 All enforcement/validation is handled in the backend.
 """
 
+from functools import lru_cache
 from typing import Dict, Any
 from .categories import CATEGORY_MAPPING
 
@@ -88,6 +89,7 @@ def _get_category_overview() -> str:
     return "\n".join(overview)
 
 
+@lru_cache(maxsize=1)
 def get_system_prompt() -> str:
     category_overview = _get_category_overview()
 
@@ -238,6 +240,7 @@ def get_contact_text() -> str:
     )
 
 
+@lru_cache(maxsize=1)
 def get_greeting_message() -> str:
     return (
         f"Welcome to {STORE_INFO['name']}!\n\n"
@@ -0,0 +1,155 @@
+"""
+Response Cache
+
+Process-wide cache of assistant responses for repeated opening queries
+("show me office chairs" from the landing page chips). Two tiers:
+- Exact: (intent, normalized message) in an LRU OrderedDict
+- Semantic: cosine similarity of query embeddings within the same intent, only for
+  store-info intents (product searches differing by colour or budget embed too closely)
+
+Entries expire after RESPONSE_CACHE_TTL_SECONDS so price and stock changes
+show up; the handler decides which turns are safe to cache.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, Optional, Tuple
+import asyncio
+import copy
+import logging
+import time
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.modules.assistant.intents import IntentType
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+# Intents whose answer is the same for any paraphrase: safe for near-duplicate hits
+SEMANTIC_INTENTS = frozenset({
+    IntentType.RETURN_POLICY.value,
+    IntentType.SHIPPING_INFO.value,
+    IntentType.PAYMENT_OPTIONS.value,
+    IntentType.WARRANTY_INFO.value,
+    IntentType.PROMOTIONS.value,
+    IntentType.CONTACT_INFO.value,
+    IntentType.STORE_HOURS.value,
+    IntentType.STORE_LOCATION.value,
+})
+
+
+class ResponseCache:
+    """LRU + TTL cache of serialized AssistantResponse dicts (without session_id)"""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        similarity: float,
+        embedding_model: str,
+        semantic_intents: FrozenSet[str] = SEMANTIC_INTENTS
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.embedding_model = embedding_model
+        self.semantic_intents = semantic_intents
+
+        # key -> (stored_at, response dict, unit embedding or None)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any], Optional[np.ndarray]]]" = OrderedDict()
+        self._semantic_enabled = similarity > 0
+
+    @staticmethod
+    def _normalize(message: str) -> str:
+        return " ".join(message.lower().split())
+
+    async def _embed_for(self, intent: str, text: str) -> Optional[np.ndarray]:
+        """Query embedding for semantic-tier intents, computed off the event loop"""
+        if not self._semantic_enabled or intent not in self.semantic_intents:
+            return None
+        # Encoding (and loading the model on first use) is blocking CPU/network work
+        return await asyncio.to_thread(self._embed, text)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if not self._semantic_enabled:
+            return None
+        try:
+            from app.modules.catalog_index.indexing.advanced_hybrid_search import get_global_encoder
+            return get_global_encoder(self.embedding_model).encode(text, normalize_embeddings=True)
+        except Exception as e:
+            # No encoder available: keep serving exact matches only
+            logger.warning(f"Response cache semantic tier disabled: {e}")
+            self._semantic_enabled = False
+            return None
+
+    async def get(self, intent: str, message: str) -> Optional[Dict[str, Any]]:
+        """Cached response for this intent/message (exact, then semantic), or None"""
+        if self.max_size <= 0:
+            return None
+
+        key = (intent, self._normalize(message))
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            del self._entries[key]
+
+        query_vector = await self._embed_for(intent, key[1])
+        if query_vector is None:
+            return None
+
+        now = time.monotonic()
+        best_key, best_score = None, self.similarity
+        for other_key, (stored_at, _, vector) in list(self._entries.items()):
+            if now - stored_at > self.ttl_seconds:
+                del self._entries[other_key]
+                continue
+            if other_key[0] != intent or vector is None:
+                continue
+            score = float(np.dot(query_vector, vector))
+            if score >= best_score:
+                best_key, best_score = other_key, score
+
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return copy.deepcopy(self._entries[best_key][1])
+
+    async def put(self, intent: str, message: str, response: Dict[str, Any]) -> None:
+        """Store a serialized response; session_id is dropped"""
+        if self.max_size <= 0:
+            return
+
+        key = (intent, self._normalize(message))
+        stored = copy.deepcopy(response)
+        stored.pop("session_id", None)
+        vector = await self._embed_for(intent, key[1])
+        self._entries[key] = (time.monotonic(), stored, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the global response cache"""
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        _response_cache = ResponseCache(
+            max_size=settings.RESPONSE_CACHE_SIZE,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            similarity=settings.RESPONSE_CACHE_SIMILARITY,
+            embedding_model=settings.EMBEDDING_MODEL,
+        )
+    return _response_cache
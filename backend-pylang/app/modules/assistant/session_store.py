@@ -5,10 +5,15 @@ Manages conversation state and context for each user session.
 Tracks shown products, cart items, filters, and conversation history.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from itertools import islice
+import asyncio
+from typing import Deque, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import uuid
+import os
 import pickle
 from pathlib import Path
 import logging
@@ -24,6 +29,42 @@ logger = logging.getLogger(__name__)
 # Session persistence
 SESSIONS_FILE = Path("data/sessions.pkl")
 
+# Messages kept per session: covers the LLM history window (10) with room to spare
+MAX_HISTORY_MESSAGES = 20
+
+# Rough characters per token for budgeting history (model-agnostic; no tokenizer round-trip)
+CHARS_PER_TOKEN = 4
+
+
+def _history_buffer(messages=()) -> Deque[Dict[str, str]]:
+    return deque(messages, maxlen=MAX_HISTORY_MESSAGES)
+
+
+@lru_cache(maxsize=2048)
+def _langchain_message(role: str, content: str):
+    """
+    LangChain message for a stored history entry (None for unknown roles).
+    Memoized: history is re-sent every turn and message models are never mutated after
+    construction, so consecutive turns share the same objects instead of re-validating them.
+    """
+    from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+
+    if role == "user":
+        return HumanMessage(content=content)
+    if role == "assistant":
+        return AIMessage(content=content)
+    if role == "system":
+        return SystemMessage(content=content)
+    return None
+
+
+def _line_total(item: Dict[str, Any]) -> float:
+    """Price x quantity for a cart line; unpriced lines count as zero"""
+    price = item.get("price")
+    if price is None:
+        return 0.0
+    return float(price) * item.get("quantity", 0)
+
 
 @dataclass
 class SessionContext:
@@ -41,8 +82,10 @@ class SessionContext:
     created_at: datetime = field(default_factory=datetime.now)
     last_activity: datetime = field(default_factory=datetime.now)
     
-    # Conversation history
-    messages: List[Dict[str, str]] = field(default_factory=list)
+    # Conversation history (bounded ring buffer; message_count keeps the total)
+    messages: Deque[Dict[str, str]] = field(default_factory=_history_buffer)
+    message_count: int = 0
+    user_message_count: int = 0
     
     # Product context (for references)
     last_shown_products: List[Dict[str, Any]] = field(default_factory=list)  # Up to 10
@@ -50,6 +93,7 @@ class SessionContext:
     
     # Cart state (if managing locally, otherwise from Node.js)
     cart_items: List[Dict[str, Any]] = field(default_factory=list)
+    cart_total: float = 0.0  # Running sum of price x quantity, kept in step by the cart methods
     
     # Search context
     last_query: Optional[str] = None
@@ -64,6 +108,18 @@ class SessionContext:
     # Metadata
     user_id: Optional[str] = None
     
+    def __setstate__(self, state: Dict[str, Any]):
+        """Upgrade sessions pickled before history became a bounded deque or counts/totals were kept"""
+        messages = state.get("messages", ())
+        state.setdefault("message_count", len(messages))
+        if "user_message_count" not in state:
+            state["user_message_count"] = sum(1 for msg in messages if msg.get("role") == "user")
+        if "cart_total" not in state:
+            state["cart_total"] = sum(_line_total(item) for item in state.get("cart_items", ()))
+        if not isinstance(messages, deque):
+            state["messages"] = _history_buffer(messages)
+        self.__dict__.update(state)
+    
     def add_message(self, role: str, content: str):
         """Add message to history"""
         self.messages.append({
@@ -71,27 +127,38 @@ class SessionContext:
             "content": content,
             "timestamp": datetime.now().isoformat()
         })
+        self.message_count += 1
+        if role == "user":
+            self.user_message_count += 1
         self.last_activity = datetime.now()
+    
+    def recent_messages(self, limit: int) -> List[Dict[str, str]]:
+        """Last `limit` messages, oldest first"""
+        return list(islice(self.messages, max(0, len(self.messages) - limit), None))
 
-    def to_langchain_messages(self, limit: int = 10):
+    def to_langchain_messages(self, limit: int = 10, token_budget: Optional[int] = None):
         """
         Convert stored messages to LangChain message objects.
 
         Args:
             limit: Max number of recent messages to include
+            token_budget: Approximate token cap; older messages are dropped first
+                (the newest message is always kept)
         """
-        from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+        recent = self.recent_messages(limit)
+        if token_budget is not None:
+            used = 0
+            for start in range(len(recent) - 1, -1, -1):
+                used += len(recent[start].get("content", "")) // CHARS_PER_TOKEN + 1
+                if used > token_budget and start < len(recent) - 1:
+                    recent = recent[start + 1:]
+                    break
 
         msgs = []
-        for msg in self.messages[-limit:]:
-            role = msg.get("role")
-            content = msg.get("content", "")
-            if role == "user":
-                msgs.append(HumanMessage(content=content))
-            elif role == "assistant":
-                msgs.append(AIMessage(content=content))
-            elif role == "system":
-                msgs.append(SystemMessage(content=content))
+        for msg in recent:
+            message = _langchain_message(msg.get("role"), msg.get("content", ""))
+            if message is not None:
+                msgs.append(message)
         return msgs
     
     def update_shown_products(self, products: List[Dict[str, Any]]):
@@ -205,9 +272,8 @@ class SessionContext:
         from datetime import datetime, timedelta
         logger = logging.getLogger(__name__)
         
-        logger.info(f"[SESSION.ADD_TO_CART] ======= ADDING TO SESSION CART =======")
-        logger.info(f"[SESSION.ADD_TO_CART] product_id={product_id}, quantity={quantity}, source={source}")
-        logger.info(f"[SESSION.ADD_TO_CART] Current cart BEFORE add: {self.cart_items}")
+        logger.debug("[SESSION.ADD_TO_CART] product_id=%s, quantity=%s, source=%s", product_id, quantity, source)
+        logger.debug("[SESSION.ADD_TO_CART] Current cart BEFORE add: %s", self.cart_items)
         
         # Check if already in cart
         for item in self.cart_items:
@@ -220,14 +286,14 @@ class SessionContext:
                         last_added_time = datetime.fromisoformat(last_added)
                         time_since_add = datetime.now() - last_added_time
                         if time_since_add < timedelta(seconds=5):
-                            logger.warning(f"[SESSION.ADD_TO_CART] DEBOUNCE: Skipping add - item was just added {time_since_add.total_seconds():.1f}s ago")
-                            logger.info(f"[SESSION.ADD_TO_CART] ======= END SESSION ADD (DEBOUNCED) =======")
+                            logger.warning("[SESSION.ADD_TO_CART] DEBOUNCE: Skipping add - item was just added %.1fs ago", time_since_add.total_seconds())
                             return
                     except (ValueError, TypeError) as e:
-                        logger.debug(f"Could not parse last_added timestamp: {e}")
+                        logger.debug("Could not parse last_added timestamp: %s", e)
                 
                 # Add to existing quantity
-                logger.info(f"[SESSION.ADD_TO_CART] Found existing item, adding {quantity} to current {item['quantity']}")
+                logger.debug("[SESSION.ADD_TO_CART] Found existing item, adding %s to current %s", quantity, item['quantity'])
+                self.cart_total -= _line_total(item)
                 item["quantity"] += quantity
                 if price is not None:
                     item["price"] = price
@@ -236,13 +302,13 @@ class SessionContext:
                 if image_url:
                     item["image_url"] = image_url
                 item["added_at"] = datetime.now().isoformat()  # Update timestamp
+                self.cart_total += _line_total(item)
                 self.last_activity = datetime.now()
-                logger.info(f"[SESSION.ADD_TO_CART] Updated cart AFTER add: {self.cart_items}")
-                logger.info(f"[SESSION.ADD_TO_CART] ======= END SESSION ADD =======")
+                logger.debug("[SESSION.ADD_TO_CART] Updated cart AFTER add: %s", self.cart_items)
                 return
         
         # Add new item
-        logger.info(f"[SESSION.ADD_TO_CART] Adding new item to cart")
+        logger.debug("[SESSION.ADD_TO_CART] Adding new item to cart")
         self.cart_items.append({
             "product_id": product_id,
             "id": product_id, # Store both for consistency
@@ -252,33 +318,38 @@ class SessionContext:
             "image_url": image_url,
             "added_at": datetime.now().isoformat()
         })
+        self.cart_total += _line_total(self.cart_items[-1])
         self.last_activity = datetime.now()
-        logger.info(f"[SESSION.ADD_TO_CART] Cart AFTER adding new item: {self.cart_items}")
-        logger.info(f"[SESSION.ADD_TO_CART] ======= END SESSION ADD =======")
+        logger.debug("[SESSION.ADD_TO_CART] Cart AFTER adding new item: %s", self.cart_items)
     
     def remove_from_cart(self, product_id: str):
         """Remove item from cart"""
         import logging
         logger = logging.getLogger(__name__)
-        logger.info(f"[REMOVE_FROM_CART] product_id={product_id}")
-        logger.info(f"[REMOVE_FROM_CART] Current cart_items: {self.cart_items}")
+        logger.debug("[REMOVE_FROM_CART] product_id=%s, current cart_items: %s", product_id, self.cart_items)
         
         original_count = len(self.cart_items)
-        self.cart_items = [
-            item for item in self.cart_items
-            if item["product_id"] != product_id and item.get("id") != product_id
-        ]
+        kept = []
+        for item in self.cart_items:
+            if item["product_id"] != product_id and item.get("id") != product_id:
+                kept.append(item)
+            else:
+                self.cart_total -= _line_total(item)
+        self.cart_items = kept
+        if not kept:
+            self.cart_total = 0.0  # Drop accumulated float drift once the cart is empty
         
         if len(self.cart_items) < original_count:
-            logger.info(f"[REMOVE_FROM_CART] Successfully removed item. New count: {len(self.cart_items)}")
+            logger.debug("[REMOVE_FROM_CART] Successfully removed item. New count: %d", len(self.cart_items))
         else:
-            logger.warning(f"[REMOVE_FROM_CART] Item not found in cart: {product_id}")
+            logger.warning("[REMOVE_FROM_CART] Item not found in cart: %s", product_id)
             
         self.last_activity = datetime.now()
     
     def clear_cart(self):
         """Clear cart"""
         self.cart_items = []
+        self.cart_total = 0.0
         self.last_activity = datetime.now()
     
     def is_expired(self, timeout_minutes: int = 30) -> bool:
@@ -342,6 +413,9 @@ class SessionStore:
     
     TODO: Migrate to Redis for production scalability and multi-instance support.
     """
+
+    # Lookups are dict reads; callers on the event loop can call them directly
+    blocking_io = False
     
     def __init__(self, session_timeout_minutes: int = 30):
         """
@@ -352,15 +426,47 @@ class SessionStore:
         """
         self.sessions: Dict[str, SessionContext] = {}
         self.session_timeout_minutes = session_timeout_minutes
+        self._save_pending = False
+        self._save_task: Optional[asyncio.Task] = None
         self._load_sessions()
     
     def _save_sessions(self):
-        """Persist sessions to disk to prevent data loss on restart"""
+        """
+        Persist sessions to disk to prevent data loss on restart.
+        
+        Inside the event loop the save runs as a background task so requests never
+        wait on it; saves requested while one is in flight coalesce into one more write.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_sessions_file(pickle.dumps(self.sessions))
+            return
+        
+        self._save_pending = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_in_background())
+    
+    async def _save_in_background(self):
+        while self._save_pending:
+            self._save_pending = False
+            # Snapshot on the loop thread (sessions are only mutated there), write off it
+            payload = pickle.dumps(self.sessions)
+            await asyncio.to_thread(self._write_sessions_file, payload)
+    
+    async def flush(self):
+        """Wait for the in-flight background save and any re-save queued behind it (shutdown)"""
+        while self._save_task is not None and not self._save_task.done():
+            await self._save_task
+    
+    def _write_sessions_file(self, payload: bytes):
         try:
             SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(SESSIONS_FILE, 'wb') as f:
-                pickle.dump(self.sessions, f)
-            logger.info(f"[SESSION_STORE] Saved {len(self.sessions)} sessions to disk")
+            # Write beside the file and swap it in, so an interrupted write never truncates it
+            tmp_file = SESSIONS_FILE.with_name(SESSIONS_FILE.name + ".tmp")
+            tmp_file.write_bytes(payload)
+            os.replace(tmp_file, SESSIONS_FILE)
+            logger.info("[SESSION_STORE] Saved sessions to disk (%d bytes)", len(payload))
         except Exception as e:
             logger.error(f"[SESSION_STORE] Failed to save sessions: {e}", exc_info=True)
     
@@ -413,7 +519,7 @@ class SessionStore:
                 metadata={"user_preferences": {}, "topic_history": []}
             )
             self.sessions[session_id] = session
-            logger.info(f"Created new session: {session_id}")
+            logger.info("Created new session: %s", session_id)
             
             # Save to disk for persistence
             self._save_sessions()
@@ -484,6 +590,9 @@ class RedisSessionStore:
     Stores SessionContext objects as pickled blobs with TTL.
     """
 
+    # Every lookup is a synchronous Redis round-trip; async callers should run it in a thread
+    blocking_io = True
+
     def __init__(self, redis_url: str, session_timeout_minutes: int = 30):
         if not redis:
             raise RuntimeError("redis package is required for RedisSessionStore")
@@ -494,6 +603,9 @@ class RedisSessionStore:
     def _make_key(self, session_id: str) -> str:
         return f"easymart:session:{session_id}"
 
+    async def flush(self):
+        """Saves are written through to Redis synchronously: nothing to wait for"""
+
     def _save_session(self, session: SessionContext):
         payload = pickle.dumps(session)
         self.client.setex(self._make_key(session.session_id), self.ttl_seconds, payload)
@@ -572,3 +684,9 @@ def get_session_store():
         else:
             _session_store = SessionStore(session_timeout_minutes=settings.SESSION_TIMEOUT_MINUTES)
     return _session_store
+
+
+async def flush_session_store():
+    """Finish pending session saves at shutdown (no-op if the store was never created)"""
+    if _session_store is not None:
+        await _session_store.flush()
@@ -6,6 +6,7 @@ import asyncio
 import logging
 import re
 from contextvars import ContextVar
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
 import httpx
@@ -117,45 +118,74 @@ class InterpretVagueQueryArgs(BaseModel):
     query: str = Field(..., description="The user's vague or indirect query to interpret")
 
 
+# base_product_name rewrites, applied in order
+_BASE_NAME_SUBS = tuple(re.compile(pattern) for pattern in (
+    # Quantity patterns like "200pcs", "400 pcs", "1 x", "2x", etc.
+    r'\b\d+\s*(?:pcs?|pieces?|pack|count|x|units?)\b',
+    # Size patterns like "small", "medium", "large", "xl", "xxl", etc.
+    r'\b(?:x?x?small|x?x?large|medium|mini|big|huge|tiny|xl|xxl|xs|xxs)\b',
+    # Standalone size letters only when they appear as size indicators
+    r'\b[sml]\b',
+    # Dimension patterns like "60x90cm", "100cm", etc.
+    r'\b\d+\s*x\s*\d+\s*(?:cm|mm|m|inch|in|ft)?\b',
+    r'\b\d+\s*(?:cm|mm|m|inch|in|ft)\b',
+    # Variant descriptors that don't change the core product type
+    r'\b(?:orthopedic|washable|waterproof|foldable|portable|deluxe|premium|basic|standard|pro|plus)\b',
+    # Colors
+    r'\b(?:black|white|red|blue|green|yellow|pink|purple|grey|gray|brown|beige|orange|navy|cream)\b',
+))
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_OPTION_REF_RE = re.compile(r'^(?:option|item|product|choice|number)\s*(\d+)$', re.IGNORECASE)
+_ORDINAL_REFS = frozenset(['first', 'second', 'third', 'fourth', 'fifth', '1st', '2nd', '3rd', '4th', '5th'])
+
+# Spec-text footprints: "120cm x 60cm" (optionally "x 75cm")
+_DIMENSIONS_2D_RE = re.compile(r'(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm')
+_DIMENSIONS_3D_RE = re.compile(r'(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm')
+
+
+@lru_cache(maxsize=4096)
+def base_product_name(name: str) -> str:
+    """
+    Extract base product name by removing quantity/size/variant variations.
+    E.g., '200pcs Puppy Dog Training Pads' -> 'puppy dog training pads'
+    E.g., 'Dog Bed Large Orthopedic' -> 'dog bed'
+    Used for deduplicating similar products in search results; memoized because the
+    same catalog names come back search after search.
+    """
+    name_lower = name.lower()
+    for pattern in _BASE_NAME_SUBS:
+        name_lower = pattern.sub('', name_lower)
+    
+    # Normalize whitespace
+    return _WHITESPACE_RE.sub(' ', name_lower).strip()
+
+
 class EasymartAssistantTools:
     def __init__(self):
         self.product_searcher = ProductSearcher()
         self.spec_searcher = SpecSearcher()
         self.settings = get_settings()
         self.bundle_planner = BundlePlanner(self.product_searcher)
+        self._node_client: Optional[httpx.AsyncClient] = None
+
+    def _get_node_client(self) -> httpx.AsyncClient:
+        """Pooled client for Node backend calls; created on first use so it binds to the serving loop"""
+        if self._node_client is None or self._node_client.is_closed:
+            self._node_client = httpx.AsyncClient(
+                timeout=self.settings.API_TIMEOUT,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
+        return self._node_client
+
+    async def close(self) -> None:
+        """Close the pooled Node backend client"""
+        if self._node_client is not None:
+            await self._node_client.aclose()
+            self._node_client = None
 
     def _get_base_product_name(self, name: str) -> str:
-        """
-        Extract base product name by removing quantity/size/variant variations.
-        E.g., '200pcs Puppy Dog Training Pads' -> 'puppy dog training pads'
-        E.g., 'Dog Bed Large Orthopedic' -> 'dog bed'
-        Used for deduplicating similar products in search results.
-        """
-        name_lower = name.lower()
-        
-        # Remove quantity patterns like "200pcs", "400 pcs", "1 x", "2x", etc.
-        name_lower = re.sub(r'\b\d+\s*(?:pcs?|pieces?|pack|count|x|units?)\b', '', name_lower)
-        
-        # Remove size patterns like "small", "medium", "large", "xl", "xxl", etc.
-        name_lower = re.sub(r'\b(?:x?x?small|x?x?large|medium|mini|big|huge|tiny|xl|xxl|xs|xxs)\b', '', name_lower)
-        
-        # Remove standalone size letters only when they appear as size indicators
-        name_lower = re.sub(r'\b[sml]\b', '', name_lower)
-        
-        # Remove dimension patterns like "60x90cm", "100cm", etc.
-        name_lower = re.sub(r'\b\d+\s*x\s*\d+\s*(?:cm|mm|m|inch|in|ft)?\b', '', name_lower)
-        name_lower = re.sub(r'\b\d+\s*(?:cm|mm|m|inch|in|ft)\b', '', name_lower)
-        
-        # Remove variant descriptors that don't change the core product type
-        name_lower = re.sub(r'\b(?:orthopedic|washable|waterproof|foldable|portable|deluxe|premium|basic|standard|pro|plus)\b', '', name_lower)
-        
-        # Remove color patterns
-        name_lower = re.sub(r'\b(?:black|white|red|blue|green|yellow|pink|purple|grey|gray|brown|beige|orange|navy|cream)\b', '', name_lower)
-        
-        # Normalize whitespace
-        name_lower = re.sub(r'\s+', ' ', name_lower).strip()
-        
-        return name_lower
+        return base_product_name(name)
 
     def _resolve_product_id_reference(self, session, product_id: str) -> Optional[str]:
         """
@@ -179,8 +209,8 @@ class EasymartAssistantTools:
         
         # Check if this looks like a product reference (numeric or "option X")
         is_numeric_ref = product_id_str.isdigit()
-        is_option_ref = re.match(r'^(?:option|item|product|choice|number)\s*(\d+)$', product_id_str, re.IGNORECASE)
-        is_ordinal_ref = product_id_str.lower() in ['first', 'second', 'third', 'fourth', 'fifth', '1st', '2nd', '3rd', '4th', '5th']
+        is_option_ref = _OPTION_REF_RE.match(product_id_str)
+        is_ordinal_ref = product_id_str.lower() in _ORDINAL_REFS
         
         if not (is_numeric_ref or is_option_ref or is_ordinal_ref):
             # Doesn't look like a reference, return as-is (it's probably a real SKU)
@@ -199,7 +229,7 @@ class EasymartAssistantTools:
             for product in session.last_shown_products:
                 pid = product.get("id") or product.get("sku") or product.get("product_id")
                 if pid == resolved:
-                    logger.info(f"Resolved product reference '{product_id}' to SKU '{resolved}' ({product.get('name', 'Unknown')})")
+                    logger.debug("Resolved product reference '%s' to SKU '%s' (%s)", product_id, resolved, product.get('name', 'Unknown'))
                     return resolved
         
         logger.warning(f"Could not resolve product reference '{product_id}' to a valid SKU")
@@ -305,13 +335,14 @@ class EasymartAssistantTools:
         formatted = []
         seen_base_names = set()
         for idx, product in enumerate(results):
-            if not product.get("name") or product.get("name").startswith("product_"):
-                product["name"] = product.get("title") or product.get("description", f"Product {idx + 1}")
+            name = product.get("name")
+            if not name or name.startswith("product_"):
+                name = product["name"] = product.get("title") or product.get("description", f"Product {idx + 1}")
             product["id"] = product.get("sku") or product.get("id")
             product["price"] = product.get("price", 0.0)
             
             # Deduplicate: Skip products with very similar names (e.g., 200pcs vs 400pcs of same item)
-            base_name = self._get_base_product_name(product.get("name", ""))
+            base_name = base_product_name(name)
             if base_name in seen_base_names:
                 continue  # Skip duplicate
             seen_base_names.add(base_name)
@@ -372,7 +403,7 @@ class EasymartAssistantTools:
                 tags = []
         for tag in tags:
             tag_lower = str(tag).lower()
-            if tag_lower.startswith("color_") or tag_lower.startswith("colour_"):
+            if tag_lower.startswith(("color_", "colour_")):
                 available_colors.append(tag_lower.split("_", 1)[1].title())
         available_colors = sorted(list(set(available_colors)))
 
@@ -471,7 +502,7 @@ class EasymartAssistantTools:
         if product_id:
             resolved_product_id = self._resolve_product_id_reference(session, product_id)
             if resolved_product_id and resolved_product_id != product_id:
-                logger.info(f"Resolved product reference '{product_id}' -> '{resolved_product_id}'")
+                logger.debug("Resolved product reference '%s' -> '%s'", product_id, resolved_product_id)
                 product_id = resolved_product_id
 
         async def _get_cart_state():
@@ -533,23 +564,22 @@ class EasymartAssistantTools:
             if skip_sync:
                 return None
             try:
-                async with httpx.AsyncClient() as client:
-                    payload = {
-                        "action": action_val,
-                        "session_id": session_id,
-                        "from_assistant": True
-                    }
-                    if pid:
-                        payload["product_id"] = pid
-                    if qty is not None:
-                        payload["quantity"] = qty
-                    response = await client.post(
-                        f"{self.settings.NODE_BACKEND_URL}/api/cart/add",
-                        json=payload,
-                        timeout=self.settings.API_TIMEOUT
-                    )
-                    if response.status_code == 200:
-                        return response.json()
+                payload = {
+                    "action": action_val,
+                    "session_id": session_id,
+                    "from_assistant": True
+                }
+                if pid:
+                    payload["product_id"] = pid
+                if qty is not None:
+                    payload["quantity"] = qty
+                response = await self._get_node_client().post(
+                    f"{self.settings.NODE_BACKEND_URL}/api/cart/add",
+                    json=payload,
+                    timeout=self.settings.API_TIMEOUT
+                )
+                if response.status_code == 200:
+                    return response.json()
             except Exception as sync_e:
                 logger.error(f"Cart sync failed: {sync_e}")
             return None
@@ -819,7 +849,7 @@ class EasymartAssistantTools:
             return {"error": "No specs available to determine fit", "product_id": product_id}
 
         text = " ".join([s.get("spec_text", "") for s in specs]).lower()
-        dim_match = re.search(r'(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm', text)
+        dim_match = _DIMENSIONS_2D_RE.search(text)
 
         if not dim_match:
             return {
@@ -868,9 +898,9 @@ class EasymartAssistantTools:
                 continue
 
             text = " ".join([s.get("spec_text", "") for s in specs]).lower()
-            dim_match = re.search(r'(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm', text)
+            dim_match = _DIMENSIONS_2D_RE.search(text)
             if not dim_match:
-                dim_match = re.search(r'(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm\s*[xX]\s*(\d+(?:\.\d+)?)\s*cm', text)
+                dim_match = _DIMENSIONS_3D_RE.search(text)
 
             if not dim_match:
                 continue
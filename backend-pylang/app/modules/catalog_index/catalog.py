@@ -167,7 +167,7 @@ class CatalogIndexer:
     
     # Index Building Methods (for manual rebuilds)
     
-    def addProducts(self, products: List[Dict[str, Any]]) -> None:
+    def addProducts(self, products: List[Dict[str, Any]], batch_size: Optional[int] = None) -> None:
         """
         Add products to the index
         
@@ -176,6 +176,7 @@ class CatalogIndexer:
                 - sku (required)
                 - title (required)
                 - handle, price, currency, vendor, tags, image_url, description
+            batch_size: Documents per vector upsert (defaults to INDEX_BATCH_SIZE)
         """
         # Deduplicate products by SKU before indexing
         seen_skus = set()
@@ -215,11 +216,11 @@ class CatalogIndexer:
         self.products_bm25.add_documents(documents)
         self.products_bm25.save()
         
-        self.products_vector.add_documents(documents)
+        self.products_vector.add_documents(documents, batch_size=batch_size or get_settings().INDEX_BATCH_SIZE)
         
         print(f"[Catalog] Added {len(documents)} products to index")
     
-    def addSpecs(self, specs: List[Dict[str, Any]]) -> None:
+    def addSpecs(self, specs: List[Dict[str, Any]], batch_size: Optional[int] = None) -> None:
         """
         Add product specifications to the index
         
@@ -229,6 +230,7 @@ class CatalogIndexer:
                 - section (required)
                 - spec_text (required)
                 - attributes (optional)
+            batch_size: Documents per vector upsert (defaults to INDEX_BATCH_SIZE)
         """
         documents = []
         for idx, spec in enumerate(specs):
@@ -246,7 +248,7 @@ class CatalogIndexer:
         self.specs_bm25.add_documents(documents)
         self.specs_bm25.save()
         
-        self.specs_vector.add_documents(documents)
+        self.specs_vector.add_documents(documents, batch_size=batch_size or get_settings().INDEX_BATCH_SIZE)
         
         print(f"[Catalog] Added {len(documents)} specs to index")
     
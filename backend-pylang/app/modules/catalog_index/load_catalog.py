@@ -11,7 +11,7 @@ import sys
 import requests
 import pandas as pd
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add the parent directory to sys.path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
@@ -292,7 +292,8 @@ def extract_specs_from_products(products: List[Dict[str, Any]]) -> List[Dict[str
     
     return all_specs
 
-async def load_all_products(allow_csv_fallback: bool = True):
+async def load_all_products(allow_csv_fallback: bool = True, batch_size: Optional[int] = None):
+    batch_size = batch_size or settings.INDEX_BATCH_SIZE
     indexer = CatalogIndexer()
     
     # 1. Try API first
@@ -309,13 +310,13 @@ async def load_all_products(allow_csv_fallback: bool = True):
 
     # 3. Index the products
     print(f"[Catalog] Starting indexing for {len(products)} products...")
-    await asyncio.to_thread(indexer.addProducts, products)
+    await asyncio.to_thread(indexer.addProducts, products, batch_size)
     
     # 4. Extract and index specs
     specs = extract_specs_from_products(products)
     if specs:
         print(f"[Catalog] Indexing {len(specs)} specifications...")
-        await asyncio.to_thread(indexer.addSpecs, specs)
+        await asyncio.to_thread(indexer.addSpecs, specs, batch_size)
     else:
         print("[Catalog] No specifications found to index")
     
@@ -82,17 +82,16 @@ class EventTracker:
             "properties": properties or {}
         }
         
-        # Log to file (async)
+        # Log to file and console (in a thread, so neither write blocks the event loop)
         await asyncio.to_thread(self._write_log, event)
-
-        # Log to console
-        print(f"[EVENT] {json.dumps(event)}")
     
     def _write_log(self, event: Dict[str, Any]) -> None:
-        """Write event to log file synchronously (run in thread)"""
+        """Write event to log file and console synchronously (run in thread)"""
+        line = json.dumps(event)
+        print(f"[EVENT] {line}")
         try:
             with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(event) + "\n")
+                f.write(line + "\n")
         except Exception as e:
             print(f"Error writing event to file: {e}")
 
@@ -10,7 +10,7 @@ High-level interface for product search with additional features:
 
 import asyncio
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from app.modules.catalog_index import CatalogIndexer
 from app.modules.observability.logging_config import get_logger
 
@@ -26,6 +26,18 @@ PRICE_PATTERNS = [
     re.compile(r'maximum\s+\$?(\d+)', re.IGNORECASE),
 ]
 
+# Keyword groups used by _apply_filters (hoisted so the per-product loop allocates nothing)
+_KID_TERMS = ("kid", "kids", "child", "children")
+_WORK_QUERY_TERMS = ("office", "gaming", "desk", "table", "chair")
+_OFFICE_INDICATORS = ("office", "executive", "ergonomic", "desk chair", "task chair", "computer chair")
+_OFFICE_CHAIR_TAGS = ("type_office chairs", "type_office chair", "category_office")
+_PRIMARY_TYPES = (
+    "chair", "desk", "table", "sofa", "bed", "shelf", "cabinet",
+    "locker", "stool", "workstation"
+)
+_CATEGORY_STOPWORDS = frozenset({"home", "and", "the", "a", "for"})
+_TAG_SEPARATOR = "\x1f"
+
 # Subjective price term mappings (convert to actual price ranges)
 SUBJECTIVE_PRICE_MAP = {
     'cheap': 200,
@@ -82,12 +94,46 @@ class ProductSearcher:
         # Create cache key
         cache_key = f"{query}:{limit}:{str(filters)}:{str(preferences)}"
         if cache_key in self._cache:
-            logger.info(f"[SEARCH] Cache hit for: {query}")
+            logger.debug("[SEARCH] Cache hit for: %s", query)
             return self._cache[cache_key]
         
+        # Retrieval plus the format/filter/rank pass over up to 100 candidates is CPU work:
+        # run it in a worker thread so other requests on the event loop keep moving
+        final_results, requested_color, available_colors = await asyncio.to_thread(
+            self._search_sync, query, limit, filters, preferences
+        )
+        
+        # Update cache
+        if len(self._cache) >= self._cache_max_size:
+            # Simple eviction: clear oldest (dictionary insertion order in 3.7+)
+            first_key = next(iter(self._cache))
+            del self._cache[first_key]
+        
+        self._cache[cache_key] = final_results
+        
+        # If color filter applied but no results, return available colors info
+        if requested_color and len(final_results) == 0 and available_colors:
+            return {
+                "products": [],
+                "total": 0,
+                "requested_color": requested_color,
+                "available_colors": sorted(list(available_colors)),
+                "no_color_match": True
+            }
+        
+        return final_results
+    
+    def _search_sync(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        preferences: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Set[str]]:
+        """Catalog retrieval, filtering and ranking (blocking; called via asyncio.to_thread)"""
         # Get raw search results from catalog (increased multiplier for large catalogs)
         search_limit = min(limit * 8, 100)  # Get more candidates but cap at 100
-        results = await asyncio.to_thread(self.catalog.searchProducts, query, limit=search_limit)
+        results = self.catalog.searchProducts(query, limit=search_limit)
         
         # Format results properly
         formatted_results = []
@@ -186,7 +232,7 @@ class ProductSearcher:
                 for term, max_price in SUBJECTIVE_PRICE_MAP.items():
                     if re.search(r'\b' + term + r'\b', query_lower):
                         filters["price_max"] = max_price
-                        logger.info(f"[SEARCH] Converted '{term}' to price_max={max_price}")
+                        logger.debug("[SEARCH] Converted '%s' to price_max=%s", term, max_price)
                         break
         
         # Track available colors before filtering (for "no color match" feedback)
@@ -220,26 +266,7 @@ class ProductSearcher:
             formatted_results = self._apply_preference_ranking(formatted_results, preferences)
 
         final_results = formatted_results[:limit]
-        
-        # Update cache
-        if len(self._cache) >= self._cache_max_size:
-            # Simple eviction: clear oldest (dictionary insertion order in 3.7+)
-            first_key = next(iter(self._cache))
-            del self._cache[first_key]
-        
-        self._cache[cache_key] = final_results
-        
-        # If color filter applied but no results, return available colors info
-        if requested_color and len(final_results) == 0 and available_colors:
-            return {
-                "products": [],
-                "total": 0,
-                "requested_color": requested_color,
-                "available_colors": sorted(list(available_colors)),
-                "no_color_match": True
-            }
-        
-        return final_results
+        return final_results, requested_color, available_colors
     
     def _parse_tags(self, tags) -> List[str]:
         """Parse tags - handle both list and JSON string formats"""
@@ -263,18 +290,47 @@ class ProductSearcher:
         Enhanced with room-aware category filtering.
         """
         filtered = []
-        
+        if not results:
+            return filtered
+
+        # Everything derived from the filters alone is computed once, not per product
+        query_text = (filters.get("query_text") or "").lower()
+        exclude_kids = bool(query_text) and not any(tok in query_text for tok in _KID_TERMS) \
+            and any(tok in query_text for tok in _WORK_QUERY_TERMS)
+        is_recliner_query = "recliner" in query_text
+        needs_primary_type = bool(query_text) and any(t in query_text for t in _PRIMARY_TYPES)
+        target_vendor = filters["vendor"].lower() if "vendor" in filters else None
+
         # Get room-to-category mapping if room_type is specified
         room_categories = None
         if "room_type" in filters:
             from app.modules.assistant.intent_detector import ROOM_CATEGORY_MAP
             room = filters["room_type"].lower().replace(" ", "_")
-            room_categories = ROOM_CATEGORY_MAP.get(room, [])
-        
+            room_categories = [c.lower() for c in ROOM_CATEGORY_MAP.get(room, [])]
+        is_office_room = filters.get("room_type") == "office"
+
+        allowed_cats = [c.lower() for c in filters["categories"]] if "categories" in filters else None
+
+        if "category" in filters:
+            target_cat = filters["category"].lower()
+            # Split target into words for flexible matching
+            # More flexible: check if ANY significant word matches
+            significant_words = set(target_cat.replace("_", " ").split()) - _CATEGORY_STOPWORDS
+            title_words = [w for w in significant_words if len(w) > 3]
+            category_tag = f"category_{target_cat}"
+
+        target_color = filters["color"].lower() if "color" in filters else None
+        if "material" in filters:
+            target_mat = filters["material"].lower()
+            material_tag = f"material_{target_mat}"
+        if "style" in filters:
+            target_style = filters["style"].lower()
+            style_tag = f"style_{target_style}"
+        filter_tags = {tag.lower() for tag in filters["tags"]} if "tags" in filters else None
+
         for result in results:
             # FIX: Use result directly (not nested under 'content')
             product = result
-            query_text = (filters.get("query_text") or "").lower()
             
             # Price filter
             if "price_min" in filters:
@@ -286,39 +342,35 @@ class ProductSearcher:
                     continue
             
             # Vendor filter
-            if "vendor" in filters:
-                if product.get("vendor", "").lower() != filters["vendor"].lower():
+            if target_vendor is not None:
+                if product.get("vendor", "").lower() != target_vendor:
                     continue
             
             # Parse tags once for all tag-based filters
-            prod_tags = self._parse_tags(product.get("tags", []))
-            prod_tags_lower = [t.lower() for t in prod_tags]
+            prod_tags_lower = frozenset(t.lower() for t in self._parse_tags(product.get("tags", [])))
+            # One C-level substring scan replaces per-tag generators ("grey" in any tag);
+            # the separator keeps a match from spanning two tags
+            prod_tags_text = _TAG_SEPARATOR.join(prod_tags_lower)
             prod_title = (product.get("name") or "").lower()
             prod_desc = (product.get("description") or "").lower()
 
-            if query_text and not any(tok in query_text for tok in ["kid", "kids", "child", "children"]):
-                if any(tok in prod_title or tok in prod_desc for tok in ["kid", "kids", "child", "children"]):
-                    if any(tok in query_text for tok in ["office", "gaming", "desk", "table", "chair"]):
-                        continue
+            if exclude_kids and any(tok in prod_title or tok in prod_desc for tok in _KID_TERMS):
+                continue
 
             # RECLINER FIX: Exclude office chairs when searching for recliners
-            if "recliner" in query_text:
+            if is_recliner_query:
                 # Skip if product has office/executive/ergonomic indicators
-                office_indicators = ["office", "executive", "ergonomic", "desk chair", "task chair", "computer chair"]
-                if any(indicator in prod_title or indicator in prod_desc for indicator in office_indicators):
+                if any(indicator in prod_title or indicator in prod_desc for indicator in _OFFICE_INDICATORS):
                     continue
                 # Skip if tags explicitly mark it as office furniture
-                if any(tag in prod_tags_lower for tag in ["type_office chairs", "type_office chair", "category_office"]):
+                if not prod_tags_lower.isdisjoint(_OFFICE_CHAIR_TAGS):
                     continue
             
-            primary_types = [
-                "chair", "desk", "table", "sofa", "bed", "shelf", "cabinet",
-                "locker", "stool", "workstation"
-            ]
-            if query_text and any(t in query_text for t in primary_types):
+            if needs_primary_type:
+                prod_category = (product.get("category") or "").lower()
                 if not any(
-                    t in prod_title or t in prod_desc or t in prod_tags_lower or t in (product.get("category") or "").lower()
-                    for t in primary_types
+                    t in prod_title or t in prod_desc or t in prod_tags_lower or t in prod_category
+                    for t in _PRIMARY_TYPES
                 ):
                     continue
             
@@ -327,23 +379,22 @@ class ProductSearcher:
             if room_categories:
                 prod_cat = (product.get("category") or "").lower()
                 prod_type = (product.get("type") or "").lower()
-                if filters.get("room_type") == "office":
+                if is_office_room:
                     if (
                         "kid" in prod_cat or
                         "kid" in prod_type or
                         "kid" in prod_title or
                         "kid" in prod_desc or
-                        any("kid" in tag for tag in prod_tags_lower)
+                        "kid" in prod_tags_text
                     ):
                         continue
                 
                 # Check if product's category matches any valid room categories
                 is_valid_for_room = False
-                for valid_cat in room_categories:
-                    valid_cat_lower = valid_cat.lower()
+                for valid_cat_lower in room_categories:
                     if (valid_cat_lower in prod_cat or 
                         valid_cat_lower in prod_type or
-                        any(valid_cat_lower in tag for tag in prod_tags_lower)):
+                        valid_cat_lower in prod_tags_text):
                         is_valid_for_room = True
                         break
                 
@@ -351,8 +402,7 @@ class ProductSearcher:
                     continue  # Skip products not valid for specified room
             
             # Categories list filter (for bundle context filtering)
-            if "categories" in filters:
-                allowed_cats = [c.lower() for c in filters["categories"]]
+            if allowed_cats is not None:
                 prod_cat = (product.get("category") or "").lower()
                 prod_type = (product.get("product_type") or "").lower()
                 
@@ -367,20 +417,14 @@ class ProductSearcher:
             
             # Category filter (flexible matching)
             if "category" in filters:
-                target_cat = filters["category"].lower()
                 prod_cat = (product.get("category") or "").lower()
                 prod_type = (product.get("type") or "").lower() # Sometimes stored as type
                 prod_title = (product.get("name") or product.get("title") or "").lower()
                 
-                # Split target into words for flexible matching
-                target_words = set(target_cat.replace("_", " ").split())
                 cat_words = set(prod_cat.replace("_", " ").split())
                 type_words = set(prod_type.replace("_", " ").split())
                 
                 # Check category field, type field, tags, OR title
-                # More flexible: check if ANY significant word matches
-                significant_words = target_words - {"home", "and", "the", "a", "for"}
-                
                 found_cat = (
                     # Substring match in either direction
                     target_cat in prod_cat or
@@ -391,26 +435,24 @@ class ProductSearcher:
                     bool(significant_words & cat_words) or
                     bool(significant_words & type_words) or
                     # Check if product title contains the product type from query
-                    any(w in prod_title for w in significant_words if len(w) > 3) or
+                    any(w in prod_title for w in title_words) or
                     # Tag-based check
-                    any(target_cat in tag for tag in prod_tags_lower) or
-                    f"category_{target_cat}" in prod_tags_lower
+                    target_cat in prod_tags_text or
+                    category_tag in prod_tags_lower
                 )
                 if not found_cat:
                     continue
             
             # Color filter
-            if "color" in filters:
-                target_color = filters["color"].lower()
+            if target_color is not None:
                 # Check tags for "Color_Red" format or simple "Red"
                 # Also check description for mentions of the color
-                prod_desc = (product.get("description") or "").lower()
                 prod_title = (product.get("name") or "").lower()
                 
                 # More flexible matching - check if color appears anywhere
                 # FIX: Check if target_color is a SUBSTRING of any tag (not exact match in list)
                 # e.g., "grey" should match "color_dark grey", "color_grey", "grey"
-                found_in_tags = any(target_color in tag for tag in prod_tags_lower)
+                found_in_tags = target_color in prod_tags_text
                 
                 found_color = (
                     found_in_tags or  # "grey" in any of ["color_dark grey", "color_grey", etc.]
@@ -422,12 +464,9 @@ class ProductSearcher:
             
             # Material filter
             if "material" in filters:
-                target_mat = filters["material"].lower()
-                prod_desc = (product.get("description") or "").lower()
-                
                 found_mat = (
                     target_mat in prod_tags_lower or
-                    f"material_{target_mat}" in prod_tags_lower or
+                    material_tag in prod_tags_lower or
                     target_mat in prod_desc
                 )
                 if not found_mat:
@@ -435,22 +474,17 @@ class ProductSearcher:
             
             # Style filter
             if "style" in filters:
-                target_style = filters["style"].lower()
-                prod_desc = (product.get("description") or "").lower()
-                
                 found_style = (
                     target_style in prod_tags_lower or
-                    f"style_{target_style}" in prod_tags_lower or
+                    style_tag in prod_tags_lower or
                     target_style in prod_desc
                 )
                 if not found_style:
                     continue
 
             # Generic Tags filter (preserved)
-            if "tags" in filters:
-                product_tags_set = set(prod_tags_lower)
-                filter_tags = set(tag.lower() for tag in filters["tags"])
-                if not filter_tags.intersection(product_tags_set):
+            if filter_tags is not None:
+                if filter_tags.isdisjoint(prod_tags_lower):
                     continue
             
             # In Stock filter
@@ -1,6 +1,13 @@
+import asyncio
+import json
+
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api import assistant_api
 from app.core.config import get_settings
+from app.core.schemas import MessageResponse
+from app.modules.assistant import AssistantResponse, EasymartAssistantHandler
+from langchain_core.messages import AIMessage
 
 
 def test_assistant_message_smoke():
@@ -14,3 +21,79 @@ def test_assistant_message_smoke():
     body = resp.json()
     assert body["message"]
     assert body["session_id"] == "test-session"
+
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+class _StreamingHandler:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def handle_message_stream(self, request):
+        yield "Here are "
+        yield "some chairs"
+        if self.fail:
+            raise RuntimeError("LLM went away")
+        yield AssistantResponse(
+            message="Here are some chairs",
+            session_id=request.session_id,
+            metadata={"intent": "product_search", "function_calls_made": 1},
+        )
+
+
+def test_assistant_message_stream_framing(monkeypatch):
+    monkeypatch.setattr(assistant_api, "get_assistant_handler", lambda: _StreamingHandler())
+
+    client = TestClient(app)
+    resp = client.post("/assistant/message/stream", json={"session_id": "stream-session", "message": "chairs"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    events = _sse_events(resp.text)
+    assert [name for name, _ in events] == ["delta", "delta", "done"]
+    assert "".join(data["content"] for _, data in events[:-1]) == "Here are some chairs"
+
+    done = events[-1][1]
+    assert set(done) == set(MessageResponse.model_fields)
+    assert MessageResponse(**done).session_id == "stream-session"
+    assert done["message"] == "Here are some chairs"
+    assert done["intent"] == "product_search"
+
+
+def test_assistant_message_stream_error_event(monkeypatch):
+    monkeypatch.setattr(assistant_api, "get_assistant_handler", lambda: _StreamingHandler(fail=True))
+
+    client = TestClient(app)
+    resp = client.post("/assistant/message/stream", json={"session_id": "stream-session", "message": "chairs"})
+    assert resp.status_code == 200
+
+    events = _sse_events(resp.text)
+    assert [name for name, _ in events] == ["delta", "delta", "error"]
+    assert events[-1][1] == {"message": "An unexpected error occurred processing your message"}
+
+
+class _EmptyStreamLLM:
+    async def astream(self, messages):
+        return
+        yield
+
+    async def ainvoke(self, messages):
+        return AIMessage(content="Sorry, could you rephrase that?")
+
+
+def test_stream_llm_falls_back_when_stream_is_empty():
+    handler = EasymartAssistantHandler.__new__(EasymartAssistantHandler)
+    handler.tool_llm = _EmptyStreamLLM()
+    tokens = []
+
+    ai_msg = asyncio.run(handler._stream_llm([], tokens.append))
+
+    assert ai_msg.content == "Sorry, could you rephrase that?"
+    assert tokens == []
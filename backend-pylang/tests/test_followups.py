@@ -0,0 +1,21 @@
+from app.core.followups import get_followup_generator
+
+
+def test_category_extraction_follows_priority_order():
+    gen = get_followup_generator()
+    assert gen._extract_category_from_query("Show me office chairs") == "office chair"
+    assert gen._extract_category_from_query("chair and standing desk") == "standing desk"
+    assert gen._extract_category_from_query("aquarium chair") == "chair"
+    assert gen._extract_category_from_query("cheap desk CHAIRS boxing") == "boxing"
+    assert gen._extract_category_from_query("my bedroom category") is None
+
+
+def test_generate_followups_category_and_cart():
+    gen = get_followup_generator()
+    chips = gen.generate_followups("product_search", products_count=5, cart_count=2,
+                                   context={"query": "dog beds"})
+    assert chips == ["Show me large dog beds", "Show me washable dog beds", "View cart (2)"]
+
+    chips = gen.generate_followups("greeting")
+    assert len(chips) == 3
+    assert gen.generate_followups("greeting", context=None) == chips
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.modules.assistant.handler import AssistantRequest, AssistantResponse, EasymartAssistantHandler
+from app.modules.assistant.intent_detector import IntentDetector
+from app.modules.assistant.session_store import SessionContext
+
+
+class _NoLLM:
+    calls = 0
+
+    async def ainvoke(self, *args, **kwargs):
+        self.calls += 1
+        raise AssertionError("greeting fast path must not call the LLM")
+
+
+def _handler(session):
+    handler = EasymartAssistantHandler.__new__(EasymartAssistantHandler)
+    handler.settings = SimpleNamespace(GREETING_FAST_PATH=True)
+    handler.session_store = SimpleNamespace(get_or_create_session=lambda session_id, user_id=None: session)
+    handler.intent_detector = IntentDetector()
+    handler.llm = handler.tool_llm = _NoLLM()
+    handler._greeting_template = AssistantResponse(
+        message="Welcome to Easymart!", session_id="", metadata={"type": "greeting"}
+    )
+    return handler
+
+
+def test_bare_greeting_answers_without_llm_and_records_both_turns():
+    session = SessionContext(session_id="g1")
+    handler = _handler(session)
+
+    response = asyncio.run(handler.handle_message(AssistantRequest(message="hi", session_id="g1")))
+
+    assert response.message == "Welcome to Easymart!"
+    assert response.session_id == "g1"
+    assert response.metadata["intent"] == "greeting"
+    assert response.metadata["function_calls_made"] == 0
+    assert handler.llm.calls == 0
+    assert [m["role"] for m in session.messages] == ["user", "assistant"]
+    assert session.user_message_count == 1
+
+
+def test_bare_greeting_drops_pending_clarification():
+    session = SessionContext(session_id="g2")
+    session.set_pending_clarification(
+        vague_type="space_required",
+        partial_entities={"original_query": "a sofa for my lounge"},
+        original_query="a sofa for my lounge",
+    )
+    handler = _handler(session)
+
+    asyncio.run(handler.handle_message(AssistantRequest(message="hello", session_id="g2")))
+
+    assert session.get_pending_clarification() is None
+    assert handler.llm.calls == 0
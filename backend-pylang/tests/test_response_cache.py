@@ -0,0 +1,120 @@
+import asyncio
+
+import numpy as np
+
+from app.modules.assistant import handler as handler_module
+from app.modules.assistant import response_cache as rc
+from app.modules.assistant.handler import EasymartAssistantHandler
+from app.modules.assistant.session_store import SessionContext
+
+
+def _cache(similarity=0.0, ttl=60.0):
+    return rc.ResponseCache(max_size=8, ttl_seconds=ttl, similarity=similarity, embedding_model="unused")
+
+
+def _response(message="Here are some chairs", products=None):
+    return {"session_id": "s1", "message": message, "products": products or [], "metadata": {"intent": "product_search"}}
+
+
+def test_exact_hit_normalizes_message_and_drops_session_id():
+    cache = _cache()
+    asyncio.run(cache.put("product_search", "Show me  office chairs", _response()))
+
+    hit = asyncio.run(cache.get("product_search", "show me office chairs"))
+    assert hit["message"] == "Here are some chairs"
+    assert "session_id" not in hit
+    assert asyncio.run(cache.get("shipping_info", "show me office chairs")) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, "monotonic", lambda: now[0])
+    cache = _cache(ttl=10.0)
+    asyncio.run(cache.put("product_search", "sofas", _response()))
+
+    now[0] += 5
+    assert asyncio.run(cache.get("product_search", "sofas")) is not None
+    now[0] += 6
+    assert asyncio.run(cache.get("product_search", "sofas")) is None
+
+
+def test_replayed_response_does_not_leak_into_stored_entry():
+    cache = _cache()
+    asyncio.run(cache.put("product_search", "desks", _response(products=[{"id": "D1", "name": "Desk"}])))
+
+    handler = EasymartAssistantHandler.__new__(EasymartAssistantHandler)
+    session = SessionContext(session_id="s2")
+    cached = asyncio.run(cache.get("product_search", "desks"))
+    replayed = handler._replay_cached_response(session, "desks", cached, start_time=0.0)
+    replayed.products[0]["name"] = "Changed"
+
+    again = asyncio.run(cache.get("product_search", "desks"))
+    assert "session_id" not in again
+    assert "cached" not in again["metadata"]
+    assert again["products"][0]["name"] == "Desk"
+    assert session.user_message_count == 1
+
+
+def test_semantic_tier_only_serves_store_info_intents(monkeypatch):
+    cache = _cache(similarity=0.95)
+    embedded = []
+
+    def fake_embed(text):
+        embedded.append(text)
+        return np.array([1.0, 0.0])
+
+    monkeypatch.setattr(cache, "_embed", fake_embed)
+    asyncio.run(cache.put("product_search", "red office chairs", _response()))
+    asyncio.run(cache.put("shipping_info", "how much is shipping", _response("Shipping is free over $199")))
+
+    assert asyncio.run(cache.get("product_search", "black office chairs")) is None
+    hit = asyncio.run(cache.get("shipping_info", "what does delivery cost"))
+    assert hit["message"] == "Shipping is free over $199"
+    assert embedded == ["how much is shipping", "what does delivery cost"]
+
+
+def test_cache_only_used_before_first_user_turn_with_empty_cart():
+    session = SessionContext(session_id="s3")
+    assert EasymartAssistantHandler._cache_intent_for(session, "product_search") == "product_search"
+    assert EasymartAssistantHandler._cache_intent_for(session, "greeting") is None
+
+    session.add_message("user", "show me sofas")
+    assert EasymartAssistantHandler._cache_intent_for(session, "product_search") is None
+
+    fresh = SessionContext(session_id="s4")
+    fresh.add_to_cart("SKU-1", price=10.0)
+    assert EasymartAssistantHandler._cache_intent_for(fresh, "shipping_info") is None
+
+
+def test_replayed_bundle_opener_restores_bundle_for_add(monkeypatch):
+    added = []
+
+    class FakeTools:
+        async def update_cart(self, product_id, **kwargs):
+            added.append(product_id)
+            return {"success": True}
+
+    monkeypatch.setattr(handler_module, "get_assistant_tools", lambda: FakeTools())
+    handler = EasymartAssistantHandler.__new__(EasymartAssistantHandler)
+    bundle_items = [
+        {"product_id": "C1", "name": "Chair", "quantity": 1, "unit_price": 50.0},
+        {"product_id": "D1", "name": "Desk", "quantity": 1, "unit_price": 150.0},
+    ]
+    cached = _response("Here is a home office bundle")
+    cached["session_metadata"] = {
+        "last_bundle_request": {"request": "home office bundle"},
+        "last_bundle_items": bundle_items,
+        "last_bundle_total": 200.0,
+    }
+    cache = _cache()
+    asyncio.run(cache.put("product_search", "home office bundle", cached))
+
+    session = SessionContext(session_id="s5")
+    hit = asyncio.run(cache.get("product_search", "home office bundle"))
+    handler._replay_cached_response(session, "home office bundle", hit, start_time=0.0)
+
+    assert session.metadata["last_bundle_total"] == 200.0
+    assert handler._is_add_bundle_request("add the bundle")
+    reply = asyncio.run(handler._handle_bundle_add(session))
+    assert reply.metadata["intent"] == "cart_add_bundle"
+    assert added == ["C1", "D1"]
@@ -0,0 +1,58 @@
+import asyncio
+import pickle
+
+from app.modules.assistant import session_store as ss
+
+
+def test_flush_waits_for_background_saves(tmp_path, monkeypatch):
+    sessions_file = tmp_path / "sessions.pkl"
+    monkeypatch.setattr(ss, "SESSIONS_FILE", sessions_file)
+    store = ss.SessionStore()
+
+    async def create_sessions_and_flush():
+        store.get_or_create_session("first")
+        store.get_or_create_session("second")  # coalesces into a re-save behind the first write
+        assert not sessions_file.exists()  # saves run in the background
+        await store.flush()
+        return pickle.loads(sessions_file.read_bytes())
+
+    saved = asyncio.run(create_sessions_and_flush())
+
+    assert set(saved) == {"first", "second"}
+    assert not (tmp_path / "sessions.pkl.tmp").exists()
+
+
+def _pre_migration_pickle():
+    """A session pickled before history was a bounded deque and before counts/totals were kept"""
+    session = ss.SessionContext(session_id="legacy")
+    state = session.__dict__
+    state["messages"] = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}", "timestamp": ""}
+        for i in range(25)
+    ]
+    state["cart_items"] = [
+        {"product_id": "A", "id": "A", "quantity": 2, "price": 10.0},
+        {"product_id": "B", "id": "B", "quantity": 1, "price": None},
+    ]
+    for key in ("message_count", "user_message_count", "cart_total"):
+        del state[key]
+    return pickle.dumps(session)
+
+
+def test_setstate_migrates_legacy_sessions():
+    session = pickle.loads(_pre_migration_pickle())
+
+    assert isinstance(session.messages, ss.deque)
+    assert session.messages.maxlen == ss.MAX_HISTORY_MESSAGES == 20
+    assert [m["content"] for m in session.messages] == [f"m{i}" for i in range(5, 25)]
+    assert session.message_count == 25
+    assert session.user_message_count == 13
+    assert session.cart_total == 20.0
+
+    session.add_to_cart("C", quantity=3, price=5.0)
+    assert session.cart_total == 35.0
+    session.remove_from_cart("A")
+    assert session.cart_total == 15.0
+    session.clear_cart()
+    assert session.cart_total == 0.0
+    assert session.cart_items == []